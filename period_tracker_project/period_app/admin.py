@@ -1,5 +1,8 @@
 """
 This module registers the models for the period_app with the Django admin site.
+
+The string representations of the profile-related models go through ``user_profile.user``, so every
+changelist joins those tables instead of querying them once per row.
 """
 
 from django.contrib import admin
@@ -7,10 +10,97 @@ from period_app.models import (
     UserProfile,
     StatisticsCycleInfo,
     HealthAndCycleFormModel,
-    CustomUser
+    CustomUser,
+    CyclePrediction,
+    Cycle,
+    DailyLog,
+    HealthProfile,
 )
 
-admin.site.register(UserProfile)
-admin.site.register(HealthAndCycleFormModel)
-admin.site.register(StatisticsCycleInfo)
-admin.site.register(CustomUser)
+
+@admin.register(UserProfile)
+class UserProfileAdmin(admin.ModelAdmin):
+    """
+    Admin of user profiles.
+    """
+    list_display = ('__str__', 'data_version', 'data_changed_at')
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(HealthAndCycleFormModel)
+class HealthAndCycleFormModelAdmin(admin.ModelAdmin):
+    """
+    Admin of cycle entries.
+    """
+    list_display = ('__str__', 'date', 'event', 'menstruation_phase_start', 'average_pain_level', 'recorded_at')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username', 'event')
+    raw_id_fields = ('user_profile',)
+    date_hierarchy = 'date'
+
+
+@admin.register(StatisticsCycleInfo)
+class StatisticsCycleInfoAdmin(admin.ModelAdmin):
+    """
+    Admin of the cached latest cycle states.
+    """
+    list_display = ('__str__', 'menstruation_phase_start', 'cycle_length', 'period_length', 'predicted_next_period')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username',)
+    raw_id_fields = ('user_profile',)
+
+
+@admin.register(CyclePrediction)
+class CyclePredictionAdmin(admin.ModelAdmin):
+    """
+    Admin of the cycle predictions.
+    """
+    list_display = ('user_profile', 'last_period_start', 'cycle_count', 'next_period_start', 'updated_at')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username',)
+    raw_id_fields = ('user_profile',)
+
+
+@admin.register(Cycle)
+class CycleAdmin(admin.ModelAdmin):
+    """
+    Admin of the logged periods.
+    """
+    list_display = ('user_profile', 'start_date', 'end_date', 'cycle_length', 'period_length')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username',)
+    raw_id_fields = ('user_profile',)
+    date_hierarchy = 'start_date'
+
+
+@admin.register(DailyLog)
+class DailyLogAdmin(admin.ModelAdmin):
+    """
+    Admin of the daily symptom, mood and pain logs.
+    """
+    list_display = ('entry_id', 'user_profile', 'date', 'average_pain_level', 'recorded_at')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username',)
+    raw_id_fields = ('entry', 'user_profile')
+
+
+@admin.register(HealthProfile)
+class HealthProfileAdmin(admin.ModelAdmin):
+    """
+    Admin of the allergies, medications and health conditions of users.
+    """
+    list_display = ('user_profile', 'allergies', 'medications', 'health_condition', 'updated_at')
+    list_select_related = ('user_profile__user',)
+    search_fields = ('user_profile__user__username',)
+    raw_id_fields = ('user_profile',)
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(admin.ModelAdmin):
+    """
+    Admin of users.
+    """
+    list_display = ('username', 'email', 'is_staff', 'date_joined')
+    search_fields = ('username', 'email')
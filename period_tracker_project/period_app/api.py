@@ -0,0 +1,264 @@
+"""
+This module contains the versioned JSON API for cycle entries, statistics and predictions.
+
+Responses carry an ETag derived from the user's ``data_version`` and a Last-Modified header, so clients can
+revalidate with If-None-Match / If-Modified-Since and receive 304 Not Modified when nothing changed.
+"""
+
+from hashlib import md5
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .cycle_info import DEFAULT_PERIOD_LENGTH
+from .models import CyclePrediction, HealthAndCycleFormModel, HealthProfile
+from .predictions import cycle_length_stddev, predicted_cycle_length, predicted_period_length, update_forecast
+from .serializers import (
+    ENTRY_FIELDS,
+    HealthEntryRowSerializer,
+    HealthEntrySerializer,
+    HealthProfileSerializer,
+    PredictionSerializer,
+    StatisticsSerializer,
+    entry_rows,
+)
+from .stats import rollup_statistics, statistics_window
+from .sync import InvalidSyncToken, changes_since, parse_token
+from .utils import CyclePhaseClassifier
+
+
+def requested_fields(request):
+    """
+    Returns the entry fields listed in ``?fields=``, or None when the parameter is absent.
+    """
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = set(fields) - set(ENTRY_FIELDS)
+    if unknown:
+        raise ValidationError({'fields': [f"Unknown fields: {', '.join(sorted(unknown))}"]})
+    return fields
+
+
+class EntryCursorPagination(CursorPagination):
+    """
+    Cursor pagination over entry ids: pages stay stable while entries are being added.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified while the user's entries did not change.
+
+    Views whose response also depends on the current day (a cycle day, a window ending today) set
+    ``depends_on_today``: their tag includes the date and they send no Last-Modified.
+    """
+    depends_on_today = False
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handles GET requests, short-circuiting them when the client's copy is still current.
+        """
+        profile = getattr(request.user, 'userprofile', None)
+        if profile is None:
+            return super().get(request, *args, **kwargs)
+        # The query string is part of the tag, every page and field selection is a different representation.
+        query = md5(request.get_full_path().encode('utf-8'), usedforsecurity=False).hexdigest()[:16]
+        etag = f'{profile.pk}-{profile.data_version}-{query}'
+        last_modified = profile.data_changed_at.timestamp() if profile.data_changed_at else None
+        if self.depends_on_today:
+            etag = f'{etag}-{timezone.localdate().isoformat()}'
+            last_modified = None
+        etag = f'W/"{etag}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class EntryListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    API view listing the user's cycle entries and creating new ones.
+    """
+    serializer_class = HealthEntrySerializer
+    pagination_class = EntryCursorPagination
+
+    def get_queryset(self):
+        return HealthAndCycleFormModel.objects.filter(user_profile__user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a page of entries, limited to the fields given in ``?fields=``.
+        """
+        fields = requested_fields(request)
+        page = self.paginate_queryset(entry_rows(self.get_queryset(), fields or ENTRY_FIELDS))
+        serializer = HealthEntryRowSerializer(page, many=True, context={'fields': fields})
+        return self.get_paginated_response(serializer.data)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save(user_profile=self.request.user.userprofile, recorded_at=timezone.now())
+
+
+class EntryDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    API view reading, updating and deleting a single cycle entry.
+    """
+    serializer_class = HealthEntrySerializer
+
+    def get_queryset(self):
+        return HealthAndCycleFormModel.objects.filter(user_profile__user=self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = requested_fields(self.request)
+        return context
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
+
+class SyncAPIView(generics.GenericAPIView):
+    """
+    API view returning the entries changed and deleted since the client's last sync.
+
+    A reset is paginated like the entry list. Its ``next`` links carry the token of the first page in
+    ``?token=``, so the changes made while the client is paging are sent by the following sync.
+    """
+    pagination_class = EntryCursorPagination
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the changes since ``?since=<token>`` and the token to send with the next sync.
+        """
+        fields = requested_fields(request)
+        for name in ('since', 'token'):
+            value = request.query_params.get(name)
+            if value:
+                try:
+                    parse_token(value)
+                except InvalidSyncToken as e:
+                    raise ValidationError({name: [str(e)]}) from e
+        changes = changes_since(request.user.userprofile, request.query_params.get('since'))
+        rows = entry_rows(changes.changed, fields or ENTRY_FIELDS)
+        next_link = None
+        if changes.reset:
+            token = request.query_params.get('token') or changes.token
+            rows = self.paginate_queryset(rows)
+            next_link = self.paginator.get_next_link()
+            if next_link:
+                next_link = replace_query_param(next_link, 'token', token)
+        else:
+            token = changes.token
+            rows = rows.order_by('id')
+        return Response({
+            'token': token,
+            'reset': changes.reset,
+            'next': next_link,
+            'changed': HealthEntryRowSerializer(rows, many=True, context={'fields': fields}).data,
+            'deleted': changes.deleted,
+        })
+
+
+class HealthProfileAPIView(generics.RetrieveUpdateAPIView):
+    """
+    API view reading and updating the user's allergies, medications and health condition.
+
+    They are not part of the entries, so this view is not tied to the entries' data version.
+    """
+    serializer_class = HealthProfileSerializer
+
+    def get_object(self):
+        user_profile = self.request.user.userprofile
+        return (HealthProfile.objects.filter(user_profile=user_profile).first()
+                or HealthProfile(user_profile=user_profile))
+
+
+class StatisticsAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    API view returning the dates of recorded symptoms, moods and pain levels.
+    """
+    serializer_class = StatisticsSerializer
+    depends_on_today = True
+
+    def get_object(self):
+        """
+        Returns the statistics of a preset ``?window=30d|90d|1y`` or of the days from ``?since=YYYY-MM-DD`` to
+        ``?until=YYYY-MM-DD`` (today by default), both inclusive. Without parameters it covers the last year.
+        """
+        params = self.request.query_params
+        dates = {}
+        for name in ('since', 'until'):
+            value = params.get(name)
+            if value:
+                dates[name] = parse_date(value)
+                if dates[name] is None:
+                    raise ValidationError({name: ["Expected a date in the YYYY-MM-DD format."]})
+        try:
+            window = statistics_window(params.get('window') or None, **dates)
+        except ValueError as e:
+            raise ValidationError({'window': [str(e)]}) from e
+        return rollup_statistics(self.request.user.userprofile, window)
+
+
+class PredictionAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    API view returning the current cycle day, phase, the predicted next period and ovulation window.
+    """
+    serializer_class = PredictionSerializer
+    depends_on_today = True
+
+    def get_object(self):
+        """
+        Returns the prediction derived from the user's observed cycles, or from the latest entry without them.
+        """
+        prediction = CyclePrediction.objects.filter(user_profile__user=self.request.user).first()
+        data = dict.fromkeys(PredictionSerializer().fields)
+        data['observed_cycles'] = 0
+        if prediction is None or not prediction.last_period_start:
+            return data
+
+        today = timezone.localdate()
+        update_forecast(prediction, today)
+        cycle_length = predicted_cycle_length(prediction)
+        period_length = predicted_period_length(prediction) or DEFAULT_PERIOD_LENGTH
+        classifier = CyclePhaseClassifier(prediction.last_period_start, period_length, cycle_length)
+        phase = classifier.phase_for(today)
+        data.update({
+            'cycle_day': classifier.cycle_day(today),
+            'phase': phase.lower() if phase else None,
+            'cycle_length': cycle_length,
+            'period_length': period_length,
+            'last_period_start': prediction.last_period_start,
+            'next_period': prediction.next_period_start,
+            'next_period_earliest': prediction.next_period_earliest,
+            'next_period_latest': prediction.next_period_latest,
+            'ovulation_window_start': prediction.ovulation_window_start,
+            'ovulation_window_end': prediction.ovulation_window_end,
+            'observed_cycles': prediction.cycle_count,
+            'cycle_length_mean': prediction.cycle_length_mean if prediction.cycle_count else None,
+            'cycle_length_stddev': cycle_length_stddev(prediction) if prediction.cycle_count >= 2 else None,
+        })
+        return data
@@ -0,0 +1,19 @@
+"""
+This module contains the application configuration for period_app.
+"""
+
+from django.apps import AppConfig
+
+
+class PeriodAppConfig(AppConfig):
+    """
+    Application configuration that connects the period_app signal handlers.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'period_app'
+
+    def ready(self):
+        """
+        Import the signal handlers once the app registry is ready.
+        """
+        from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+"""
+This module contains the authentication backend of the period_app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class UserProfileBackend(ModelBackend):
+    """
+    ModelBackend loading the user together with their UserProfile in a single joined query.
+
+    Almost every view needs ``request.user.userprofile``; without the join it costs an extra query per request.
+    """
+
+    @staticmethod
+    def _users():
+        return UserModel._default_manager.select_related('userprofile')
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = self._users().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing difference between existing and
+            # nonexistent users, as ModelBackend does.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        try:
+            user = self._users().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,186 @@
+"""
+This module measures the latency, query count and peak memory of the main views for growing histories.
+
+It seeds one synthetic user per dataset size, replays the views through the Django test client and returns
+a JSON-serializable report; ``manage.py benchmark_views`` runs it against a throwaway database and writes
+the report to a file that can be diffed between commits.
+"""
+
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, time as dt_time, timedelta
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import CustomUser, HealthAndCycleFormModel, StatisticsReportJob, UserProfile
+from .signals import entries_bulk_changed
+
+BENCHMARK_SIZES = (1, 100, 10000)
+BENCHMARK_REPEAT = 5
+SEED_BATCH_SIZE = 1000
+SEED_CYCLE_LENGTH = 28
+SEED_PERIOD_LENGTH = 5
+
+
+def _synthetic_entries(user_profile, count, rng):
+    """
+    Yields ``count`` unsaved daily entries ending today, with a period starting every SEED_CYCLE_LENGTH days.
+    """
+    today = timezone.localdate()
+    first_day = today - timedelta(days=count - 1)
+    symptoms = [choice for choice, _ in HealthAndCycleFormModel.SYMPTOM_CHOICES]
+    moods = [choice for choice, _ in HealthAndCycleFormModel.MOOD_CHOICES]
+    for offset in range(count):
+        day = first_day + timedelta(days=offset)
+        cycle_day = offset % SEED_CYCLE_LENGTH
+        in_period = cycle_day < SEED_PERIOD_LENGTH
+        period_start = day - timedelta(days=cycle_day)
+        yield HealthAndCycleFormModel(
+            user_profile=user_profile,
+            date=day,
+            event=f'Wpis {offset}',
+            cycle_length=SEED_CYCLE_LENGTH if in_period else None,
+            period_length=SEED_PERIOD_LENGTH if in_period else None,
+            menstruation_phase_start=period_start if in_period else None,
+            menstruation_phase_end=period_start + timedelta(days=SEED_PERIOD_LENGTH - 1) if in_period else None,
+            daily_symptoms=rng.sample(symptoms, rng.randint(0, 3)),
+            daily_mood=rng.sample(moods, rng.randint(0, 2)),
+            average_pain_level=rng.randint(1, 10) if in_period else None,
+            recorded_at=timezone.make_aware(datetime.combine(day, dt_time(12))),
+        )
+
+
+def seed_user(entry_count, seed=0):
+    """
+    Creates a user with ``entry_count`` daily entries and the data derived from them, and returns the user.
+    """
+    rng = random.Random(seed)
+    user = CustomUser.objects.create_user(username=f'benchmark_{entry_count}_{seed}', password=None)
+    user_profile = UserProfile.objects.create(user=user)
+    batch = []
+    for entry in _synthetic_entries(user_profile, entry_count, rng):
+        batch.append(entry)
+        if len(batch) >= SEED_BATCH_SIZE:
+            HealthAndCycleFormModel.objects.bulk_create(batch)
+            batch = []
+    HealthAndCycleFormModel.objects.bulk_create(batch)
+    entries_bulk_changed.send(sender=HealthAndCycleFormModel, user_profile_ids=[user_profile.pk])
+    return user
+
+
+def _scenarios(user):
+    """
+    Returns ``(name, request, cleanup)`` triples; each request is a callable taking a logged in client.
+    """
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    xhr = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+    def post_form(client):
+        return client.post(reverse('form'), {
+            'date': today.isoformat(),
+            'event': 'Benchmark',
+            'daily_symptoms': ['Ból głowy'],
+        })
+
+    def delete_posted():
+        HealthAndCycleFormModel.objects.filter(user_profile=user.userprofile, event='Benchmark').delete()
+
+    def delete_reports():
+        StatisticsReportJob.objects.filter(user_profile=user.userprofile).delete()
+
+    return [
+        ('home', lambda client: client.get(reverse('home')), None),
+        ('calendar_events_month', lambda client: client.get(
+            reverse('calendar'),
+            {'start': month_start.isoformat(), 'end': (month_start + timedelta(days=42)).isoformat()},
+            **xhr
+        ), None),
+        ('calendar_events_all', lambda client: client.get(reverse('calendar'), **xhr), None),
+        ('calendar_day_colors_month', lambda client: client.get(
+            reverse('calendar_day_colors'),
+            {'start': month_start.isoformat(), 'end': (month_start + timedelta(days=42)).isoformat()}
+        ), None),
+        ('statistics', lambda client: client.get(reverse('statistics')), None),
+        ('export_statistics_pdf', lambda client: client.get(reverse('export_statistics_pdf')), delete_reports),
+        ('form_post', post_form, delete_posted),
+    ]
+
+
+def _consume(response):
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(request, client, repeat=BENCHMARK_REPEAT, cleanup=None) -> dict:
+    """
+    Times ``repeat`` cold runs of a request, then repeats it once more to count queries and trace memory.
+
+    The response cache is cleared before every run, so the numbers cover the actual work of the view.
+    """
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        response = _consume(request(client))
+        timings.append((time.perf_counter() - started) * 1000)
+        if cleanup:
+            cleanup()
+
+    cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            _consume(request(client))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if cleanup:
+        cleanup()
+
+    return {
+        'status': response.status_code,
+        'latency_ms': {
+            'median': round(statistics.median(timings), 3),
+            'min': round(min(timings), 3),
+            'max': round(max(timings), 3),
+        },
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, repeat=BENCHMARK_REPEAT, progress=None) -> dict:
+    """
+    Seeds one user per size, measures every scenario for them and returns the report.
+    """
+    results = []
+    for size in sizes:
+        user = seed_user(size)
+        client = Client()
+        client.force_login(user)
+        for name, request, cleanup in _scenarios(user):
+            result = {'view': name, 'entries': size, **measure(request, client, repeat, cleanup)}
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'sizes': list(sizes),
+        },
+        'results': results,
+    }
@@ -0,0 +1,38 @@
+"""
+This module caches the serialized calendar feed and statistics of every user.
+
+Keys contain the user's ``data_version``, which the signal handlers bump whenever an entry is saved or deleted,
+so a change makes the old payloads unreachable instead of having to delete them. They expire with the timeout.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'period'
+
+
+def _get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(kind, user_profile, *parts) -> str:
+    """
+    Builds the cache key of a payload of ``kind`` for the user's current data version.
+    """
+    key = f"{KEY_PREFIX}:{kind}:{user_profile.pk}:{user_profile.data_version}"
+    if parts:
+        key += ':' + ':'.join(str(part) for part in parts)
+    return key
+
+
+def get_or_compute(kind, user_profile, parts, compute):
+    """
+    Returns the cached payload for the user's current data, calling ``compute`` and storing its result on a miss.
+    """
+    cache = _get_cache()
+    key = user_cache_key(kind, user_profile, *parts)
+    payload = cache.get(key)
+    if payload is None:
+        payload = compute()
+        cache.set(key, payload, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60 * 60))
+    return payload
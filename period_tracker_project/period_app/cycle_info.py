@@ -0,0 +1,69 @@
+"""
+This module maintains StatisticsCycleInfo, the denormalized latest cycle state of every user.
+"""
+
+from django.utils import timezone
+
+from .models import HealthAndCycleFormModel, StatisticsCycleInfo
+from .utils import CyclePhaseClassifier
+
+DEFAULT_CYCLE_LENGTH = 28
+DEFAULT_PERIOD_LENGTH = 6
+
+EMPTY_CYCLE_STATE = {
+    'menstruation_phase_start': None,
+    'menstruation_phase_end': None,
+    'first_day_of_cycle': None,
+    'last_period_start': None,
+    'cycle_length': None,
+    'period_length': None,
+    'predicted_next_period': None,
+}
+
+
+def cycle_state_from_entry(entry, today=None) -> dict:
+    """
+    Builds the StatisticsCycleInfo field values from the latest entry with a menstruation start.
+    """
+    start = entry['menstruation_phase_start']
+    cycle_length = entry['cycle_length'] or DEFAULT_CYCLE_LENGTH
+    period_length = entry['period_length'] or DEFAULT_PERIOD_LENGTH
+    first_day = entry['first_day_of_cycle'] or start
+    classifier = CyclePhaseClassifier(first_day, period_length, cycle_length)
+    return {
+        'menstruation_phase_start': start,
+        'menstruation_phase_end': entry['menstruation_phase_end'],
+        'first_day_of_cycle': first_day,
+        'last_period_start': entry['last_period_start'],
+        'cycle_length': cycle_length,
+        'period_length': period_length,
+        'predicted_next_period': classifier.next_cycle_start(today or timezone.localdate()),
+    }
+
+
+def refresh_cycle_info(user_profile_id):
+    """
+    Recomputes the cached cycle state of a user from their latest menstruation entry.
+
+    Returns the StatisticsCycleInfo row, or None when the user has neither cycle data nor a cached row.
+    """
+    latest_entry = (HealthAndCycleFormModel.objects
+                    .filter(user_profile_id=user_profile_id, menstruation_phase_start__isnull=False)
+                    .order_by('-menstruation_phase_start')
+                    .values('menstruation_phase_start', 'menstruation_phase_end', 'first_day_of_cycle',
+                            'last_period_start', 'cycle_length', 'period_length')
+                    .first())
+
+    if latest_entry is None:
+        # Only clear an existing row: creating one here could resurrect a profile that is being deleted.
+        StatisticsCycleInfo.objects.filter(user_profile_id=user_profile_id).update(
+            recorded_at=timezone.now(),
+            **EMPTY_CYCLE_STATE
+        )
+        return StatisticsCycleInfo.objects.filter(user_profile_id=user_profile_id).first()
+
+    cycle_info, _ = StatisticsCycleInfo.objects.update_or_create(
+        user_profile_id=user_profile_id,
+        defaults={'recorded_at': timezone.now(), **cycle_state_from_entry(latest_entry)}
+    )
+    return cycle_info
@@ -0,0 +1,115 @@
+"""
+This module exports the raw history of cycle entries as CSV or NDJSON.
+
+Rows are read through a server-side cursor (``QuerySet.iterator``) and encoded chunk by chunk, so memory use
+does not depend on the number of entries. The columns match what ``importers`` accepts, so an export can be
+imported again as is; every row repeats the user's HealthProfile, which the import writes back once.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .importers import LIST_FIELDS, LIST_SEPARATOR
+from .models import HealthAndCycleFormModel
+from .normalization import HEALTH_PROFILE_FIELDS
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+EXPORT_FIELDS = (
+    'date', 'event', 'first_day_of_cycle', 'cycle_length', 'period_length',
+    'last_period_start', 'average_pain_level', 'menstruation_phase_start', 'menstruation_phase_end',
+    'allergies', 'medications', 'health_condition', 'daily_symptoms', 'daily_mood', 'recorded_at',
+)
+USERNAME_FIELD = 'username'
+# Export columns read from related tables rather than from the entry.
+RELATED_LOOKUPS = {
+    USERNAME_FIELD: 'user_profile__user__username',
+    **{field: f'user_profile__health_profile__{field}' for field in HEALTH_PROFILE_FIELDS},
+}
+
+
+class _Echo:
+    """
+    File-like object handing back whatever csv.writer writes, so rows can be yielded instead of buffered.
+    """
+    def write(self, value):
+        return value
+
+
+def export_queryset(user_profile=None):
+    """
+    Returns the entries to export, of one user or of everyone, in a stable order.
+    """
+    entries = HealthAndCycleFormModel.objects.all()
+    if user_profile is not None:
+        return entries.filter(user_profile=user_profile).order_by('date', 'id')
+    return entries.order_by('user_profile_id', 'date', 'id')
+
+
+def export_rows(entries, fields=EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the entries as dicts, fetching ``chunk_size`` rows at a time from a server-side cursor.
+    """
+    lookups = [RELATED_LOOKUPS.get(field, field) for field in fields]
+    for values in entries.values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield dict(zip(fields, values))
+
+
+def _csv_value(field, value):
+    if value is None:
+        return ''
+    if field in LIST_FIELDS:
+        return LIST_SEPARATOR.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows, fields=EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Encodes rows as CSV text, yielding the header and then one string per ``chunk_size`` rows.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([_csv_value(field, row[field]) for field in fields]))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def iter_ndjson(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Encodes rows as newline delimited JSON, yielding one string per ``chunk_size`` rows.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(row))
+        lines.append('\n')
+        if len(lines) >= 2 * chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def stream_export(entries, export_format, fields=EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Returns a generator of text chunks with the entries encoded in ``export_format``.
+    """
+    rows = export_rows(entries, fields, chunk_size)
+    if export_format == 'csv':
+        return iter_csv(rows, fields, chunk_size)
+    if export_format == 'ndjson':
+        return iter_ndjson(rows, chunk_size)
+    raise ValueError(f"Unknown export format: {export_format}")
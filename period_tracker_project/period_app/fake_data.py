@@ -0,0 +1,193 @@
+"""
+This module generates synthetic users with multi-year cycle histories for load testing.
+
+Every user gets their own typical cycle and period length and variability; entries are drawn from a random
+generator seeded by the global seed and the user's number, so the same arguments always produce the same data.
+Users are written in groups with bulk_create, one transaction per group, by a pool of processes; the derived data
+of every group is rebuilt through ``entries_bulk_changed`` like after an import.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time, timedelta
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import CustomUser, HealthAndCycleFormModel, UserProfile
+from .signals import entries_bulk_changed
+
+FAKE_USERNAME_PREFIX = 'fake_user_'
+FAKE_BATCH_SIZE = 5000
+FAKE_USERS_PER_TRANSACTION = 100
+FAKE_HISTORY_YEARS = 3
+# Share of the days on which a user logs an entry; the first day of every period is always logged.
+FAKE_LOGGING_RATE = 0.7
+MIN_FAKE_CYCLE_LENGTH = 21
+MAX_FAKE_CYCLE_LENGTH = 40
+
+SYMPTOMS = [choice for choice, _ in HealthAndCycleFormModel.SYMPTOM_CHOICES]
+PERIOD_SYMPTOMS = ['Ból brzucha', 'Ból pleców', 'Ból głowy', 'Wzdęcia', 'Zmęczenie', 'Wahania nastroju']
+MOODS = sorted({choice for choice, _ in HealthAndCycleFormModel.MOOD_CHOICES})
+
+
+class CycleHabits:
+    """
+    Cycle habits of a synthetic user.
+    """
+    __slots__ = ('cycle_length', 'cycle_stddev', 'period_length', 'logging_rate')
+
+    def __init__(self, rng, logging_rate):
+        self.cycle_length = min(max(rng.gauss(28, 2), 24), 34)
+        self.cycle_stddev = rng.uniform(0.5, 3.5)
+        self.period_length = rng.randint(3, 7)
+        self.logging_rate = min(max(rng.gauss(logging_rate, 0.1), 0.05), 1)
+
+    def next_cycle_length(self, rng) -> int:
+        length = round(rng.gauss(self.cycle_length, self.cycle_stddev))
+        return min(max(length, MIN_FAKE_CYCLE_LENGTH), MAX_FAKE_CYCLE_LENGTH)
+
+
+def user_rng(seed, number):
+    """
+    Returns the random generator of the ``number``-th user, independent of how users are grouped into batches.
+    """
+    return random.Random(f'{seed}:{number}')
+
+
+def _recorded_at(day, rng):
+    return timezone.make_aware(datetime.combine(day, time(rng.randint(7, 22), rng.randrange(60))))
+
+
+def fake_entries(user_profile, rng, first_day, last_day, logging_rate=FAKE_LOGGING_RATE):
+    """
+    Yields unsaved entries of a user between ``first_day`` and ``last_day``, oldest first.
+    """
+    habits = CycleHabits(rng, logging_rate)
+    stated_cycle_length = round(habits.cycle_length)
+    previous_start = None
+    # The history starts somewhere inside a cycle.
+    period_start = first_day - timedelta(days=rng.randrange(stated_cycle_length))
+
+    while period_start <= last_day:
+        cycle_length = habits.next_cycle_length(rng)
+        period_length = max(2, min(habits.period_length + rng.randint(-1, 1), cycle_length - 1))
+        period_end = period_start + timedelta(days=period_length - 1)
+
+        for cycle_day in range(cycle_length):
+            day = period_start + timedelta(days=cycle_day)
+            if day < first_day or day > last_day:
+                continue
+            in_period = cycle_day < period_length
+            if cycle_day and rng.random() > habits.logging_rate:
+                continue
+
+            if in_period:
+                symptoms = rng.sample(PERIOD_SYMPTOMS, rng.randint(1, 3))
+                pain_level = min(10, max(1, round(rng.gauss(7 - cycle_day, 1.5))))
+            else:
+                symptoms = rng.sample(SYMPTOMS, rng.choice((0, 0, 0, 1, 1, 2)))
+                pain_level = rng.randint(1, 3) if symptoms and rng.random() < 0.3 else None
+
+            entry = HealthAndCycleFormModel(
+                user_profile=user_profile,
+                date=day,
+                event='Wpis dzienny',
+                average_pain_level=pain_level,
+                daily_symptoms=symptoms,
+                daily_mood=rng.sample(MOODS, rng.choice((0, 1, 1, 2))),
+                recorded_at=_recorded_at(day, rng),
+            )
+            if cycle_day == 0:
+                entry.event = 'Początek okresu'
+                entry.first_day_of_cycle = period_start
+                entry.last_period_start = previous_start
+                entry.menstruation_phase_start = period_start
+                entry.menstruation_phase_end = period_end
+                entry.cycle_length = stated_cycle_length
+                entry.period_length = period_length
+            yield entry
+
+        previous_start = period_start
+        period_start += timedelta(days=cycle_length)
+
+
+def _create_users(numbers, username_prefix, password_hash):
+    users = CustomUser.objects.bulk_create([
+        CustomUser(username=f'{username_prefix}{number:07d}', email=f'{username_prefix}{number:07d}@example.com',
+                   password=password_hash)
+        for number in numbers
+    ])
+    return UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+
+
+def _generate_group(numbers, seed, first_day, last_day, logging_rate, batch_size, username_prefix,
+                    password_hash):
+    """
+    Creates the users numbered ``numbers`` with their histories in one transaction and returns the counts.
+    """
+    created_entries = 0
+    with transaction.atomic():
+        user_profiles = _create_users(numbers, username_prefix, password_hash)
+        batch = []
+        for number, user_profile in zip(numbers, user_profiles):
+            for entry in fake_entries(user_profile, user_rng(seed, number), first_day, last_day, logging_rate):
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    HealthAndCycleFormModel.objects.bulk_create(batch)
+                    created_entries += len(batch)
+                    batch = []
+        if batch:
+            HealthAndCycleFormModel.objects.bulk_create(batch)
+            created_entries += len(batch)
+        entries_bulk_changed.send(
+            sender=HealthAndCycleFormModel,
+            user_profile_ids=[user_profile.pk for user_profile in user_profiles]
+        )
+    return len(user_profiles), created_entries
+
+
+def generate_fake_cycles(user_count, seed=0, years=FAKE_HISTORY_YEARS, logging_rate=FAKE_LOGGING_RATE,
+                         batch_size=FAKE_BATCH_SIZE, users_per_transaction=FAKE_USERS_PER_TRANSACTION,
+                         username_prefix=FAKE_USERNAME_PREFIX, password=None, today=None, workers=None,
+                         progress=None):
+    """
+    Creates ``user_count`` users with ``years`` of history each and returns ``(users, entries)`` created.
+
+    Users are numbered from 1 and named ``username_prefix`` followed by their number. Without ``password`` they
+    cannot log in; the password is hashed once for all of them. Groups of ``users_per_transaction`` users are
+    written by a pool of ``workers`` processes (all CPUs by default, in this process with 0); ``progress`` is
+    called with the running totals after every committed group.
+    """
+    last_day = today or timezone.localdate()
+    first_day = last_day - timedelta(days=round(365.25 * years) - 1)
+    groups = [
+        range(group_start, min(group_start + users_per_transaction, user_count + 1))
+        for group_start in range(1, user_count + 1, users_per_transaction)
+    ]
+    arguments = (seed, first_day, last_day, logging_rate, batch_size, username_prefix, make_password(password))
+    created_users = created_entries = 0
+
+    def count(users, entries):
+        nonlocal created_users, created_entries
+        created_users += users
+        created_entries += entries
+        if progress:
+            progress(created_users, created_entries)
+
+    if workers == 0:
+        for numbers in groups:
+            count(*_generate_group(numbers, *arguments))
+        return created_users, created_entries
+
+    workers = workers or os.cpu_count() or 1
+    # Forked workers must open their own database connections instead of sharing the parent's socket.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        futures = [executor.submit(_generate_group, numbers, *arguments) for numbers in groups]
+        for future in as_completed(futures):
+            count(*future.result())
+    return created_users, created_entries
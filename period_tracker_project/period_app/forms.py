@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
 from .models import HealthAndCycleFormModel
+from .normalization import HEALTH_PROFILE_FIELDS
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -65,6 +66,9 @@ class UserLoginForm(forms.Form):
 class HealthAndCycleForm(forms.ModelForm):
     """
     Form for tracking health and menstrual cycle details.
+
+    Allergies, medications and the health condition belong to the user's HealthProfile rather than to the entry,
+    see ``health_profile_values``.
     """
     PAIN_LEVEL_CHOICES = [(i, str(i)) for i in range(1, 11)]
 
@@ -74,13 +78,20 @@ class HealthAndCycleForm(forms.ModelForm):
             'first_day_of_cycle', 'cycle_length', 'period_length',
             'last_period_start', 'average_pain_level',
             'menstruation_phase_start', 'menstruation_phase_end',
-            'allergies', 'medications', 'health_condition',
             'daily_symptoms', 'daily_mood', 'date', 'event'
         ]
         widgets = {
             'user_profile': forms.HiddenInput(),
         }
 
+    field_order = [
+        'first_day_of_cycle', 'cycle_length', 'period_length',
+        'last_period_start', 'average_pain_level',
+        'menstruation_phase_start', 'menstruation_phase_end',
+        *HEALTH_PROFILE_FIELDS,
+        'daily_symptoms', 'daily_mood', 'date', 'event'
+    ]
+
     date = forms.DateField(
         label="Data wydarzenia",
         required=True,
@@ -219,6 +230,19 @@ class HealthAndCycleForm(forms.ModelForm):
         kwargs["initial"]["date"] = initial_date
         super().__init__(*args, **kwargs)
 
+    def health_profile_values(self):
+        """
+        Returns the submitted HealthProfile fields; the ones missing from the submitted data are left out.
+        """
+        return {field: self.cleaned_data[field] for field in HEALTH_PROFILE_FIELDS if field in self.data}
+
+    def clean_average_pain_level(self):
+        """
+        Convert the selected pain level to an integer; an empty value means no pain level was given.
+        """
+        value = self.cleaned_data.get('average_pain_level')
+        return int(value) if value else None
+
     def clean(self):
         """
         Clean and validate the form data.
@@ -235,3 +259,30 @@ class HealthAndCycleForm(forms.ModelForm):
         if daily_mood:
             cleaned_data["daily_mood"] = list(daily_mood)
         return cleaned_data
+
+
+class BulkImportForm(forms.Form):
+    """
+    Form for uploading a CSV or JSON file with historical cycle entries.
+    """
+    FORMAT_CHOICES = [
+        ('', 'Wykryj z nazwy pliku'),
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+    ]
+
+    file = forms.FileField(
+        label="Plik z danymi",
+        help_text="Kolumny jak w formularzu cyklu; objawy i nastroje oddzielone średnikiem."
+    )
+
+    file_format = forms.ChoiceField(
+        label="Format",
+        required=False,
+        choices=FORMAT_CHOICES,
+    )
+
+    strict = forms.BooleanField(
+        label="Nie importuj niczego, jeśli którykolwiek wiersz jest błędny",
+        required=False,
+    )
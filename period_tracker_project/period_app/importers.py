@@ -0,0 +1,152 @@
+"""
+This module imports historical cycle entries in bulk from CSV or JSON files.
+
+Rows are validated with HealthAndCycleForm, so imported data follows the same rules as the cycle health form,
+and written with bulk_create in chunks inside a single transaction. The last non-empty allergies, medications
+and health condition of the rows are saved once, into the user's HealthProfile.
+"""
+
+import csv
+import json
+from datetime import datetime, time
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .forms import HealthAndCycleForm
+from .models import HealthAndCycleFormModel
+from .normalization import save_health_profile
+from .signals import entries_bulk_changed
+
+IMPORT_FORMATS = ('csv', 'json')
+IMPORT_BATCH_SIZE = 500
+LIST_FIELDS = ('daily_symptoms', 'daily_mood')
+LIST_SEPARATOR = ';'
+
+
+class ImportResult:
+    """
+    Outcome of an import: the number of created entries and the errors of rejected rows.
+    """
+    __slots__ = ('created', 'errors')
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        """
+        Records the validation errors of a row (numbered from 1, the CSV header is not counted).
+        """
+        self.errors.append((row_number, errors))
+
+
+class ImportFormatError(ValueError):
+    """Raised when the uploaded file cannot be parsed at all."""
+
+
+def _split_list(value):
+    if isinstance(value, list):
+        return value
+    value = (value or '').strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def read_rows(file, import_format):
+    """
+    Yields the rows of a text file as dicts of form field values.
+    """
+    if import_format == 'csv':
+        for row in csv.DictReader(file):
+            yield {key: value for key, value in row.items() if key is not None}
+    elif import_format == 'json':
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ImportFormatError(f"Invalid JSON: {e}") from e
+        if not isinstance(data, list):
+            raise ImportFormatError("The JSON file must contain a list of entries.")
+        yield from data
+    else:
+        raise ImportFormatError(f"Unknown import format: {import_format}")
+
+
+def _build_entry(row, user_profile):
+    """
+    Validates a row with HealthAndCycleForm and returns an unsaved entry with the row's HealthProfile values,
+    or the form errors.
+    """
+    if not isinstance(row, dict):
+        return None, None, {'__all__': ['Each entry must be an object.']}
+
+    data = dict(row)
+    try:
+        for field in LIST_FIELDS:
+            data[field] = _split_list(data.get(field))
+    except (json.JSONDecodeError, TypeError):
+        return None, None, {'__all__': ['Symptoms and moods must be lists.']}
+
+    form = HealthAndCycleForm(data=data)
+    if not form.is_valid():
+        return None, None, {field: list(messages) for field, messages in form.errors.items()}
+
+    entry = form.save(commit=False)
+    entry.user_profile = user_profile
+    try:
+        recorded_at = parse_datetime(str(row.get('recorded_at') or ''))
+    except ValueError:
+        # Well-formed but impossible values, e.g. 2025-02-30 10:00.
+        return None, None, {'recorded_at': ['Enter a valid date and time.']}
+    if recorded_at is None:
+        # Historical entries count in the statistics on the day they describe, not on the import day.
+        recorded_at = datetime.combine(entry.date, time.min)
+    if timezone.is_naive(recorded_at):
+        recorded_at = timezone.make_aware(recorded_at)
+    entry.recorded_at = recorded_at
+    return entry, form.health_profile_values(), None
+
+
+def import_entries(user_profile, rows, batch_size=IMPORT_BATCH_SIZE, strict=False) -> ImportResult:
+    """
+    Validates and saves rows for a user in chunks of ``batch_size`` inside one transaction.
+
+    Invalid rows are reported in the result and skipped; with ``strict`` nothing is saved when any row is invalid.
+    """
+    result = ImportResult()
+    batch = []
+    health_profile = {}
+    with transaction.atomic():
+        for row_number, row in enumerate(rows, start=1):
+            entry, health_profile_values, errors = _build_entry(row, user_profile)
+            if errors:
+                result.add_error(row_number, errors)
+                continue
+            batch.append(entry)
+            # Rows without a value do not clear what earlier rows gave.
+            health_profile.update((field, value) for field, value in health_profile_values.items() if value)
+            if len(batch) >= batch_size:
+                HealthAndCycleFormModel.objects.bulk_create(batch)
+                result.created += len(batch)
+                batch = []
+        if batch:
+            HealthAndCycleFormModel.objects.bulk_create(batch)
+            result.created += len(batch)
+
+        if strict and result.errors:
+            transaction.set_rollback(True)
+            result.created = 0
+        elif result.created:
+            save_health_profile(user_profile.pk, health_profile)
+            entries_bulk_changed.send(sender=HealthAndCycleFormModel, user_profile_ids=[user_profile.pk])
+    return result
+
+
+def detect_format(filename, default='csv'):
+    """
+    Guesses the import format from a file name.
+    """
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in IMPORT_FORMATS else default
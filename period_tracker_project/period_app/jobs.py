@@ -0,0 +1,210 @@
+"""
+This module contains the database-backed queue generating statistics PDF reports in the background.
+
+Jobs are rows of StatisticsReportJob. They are picked up by a small thread pool in the web process right
+after the enqueuing transaction commits, and ``manage.py run_report_worker`` drains whatever is left
+(for example after a restart), so no external broker is needed. A job still running REPORT_JOB_TIMEOUT seconds
+after it was claimed was abandoned by a worker that died, and is put back in the queue.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import StatisticsReportJob, UserProfile
+from .reports import build_statistics_pdf
+from .stats import StatisticsWindow, rollup_statistics
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'REPORT_WORKER_THREADS', 2),
+            thread_name_prefix='report-worker'
+        )
+    return _executor
+
+
+def _run_in_background(job_id):
+    try:
+        run_report_job(job_id)
+    finally:
+        connection.close()
+
+
+def _schedule(job_id):
+    # Scheduling a pending job again is harmless: only one worker can claim it.
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_background, job_id))
+
+
+def _stale_jobs(now=None):
+    timeout = timedelta(seconds=getattr(settings, 'REPORT_JOB_TIMEOUT', 600))
+    return StatisticsReportJob.objects.filter(
+        status=StatisticsReportJob.STATUS_RUNNING,
+        started_at__lt=(now or timezone.now()) - timeout
+    )
+
+
+def requeue_stale_jobs(now=None) -> int:
+    """
+    Puts the jobs abandoned by dead workers back in the queue and returns how many there were.
+    """
+    return _stale_jobs(now).update(status=StatisticsReportJob.STATUS_PENDING, started_at=None)
+
+
+def resume_stale_job(job, background=True, now=None) -> bool:
+    """
+    Puts ``job`` back in the queue (and schedules it) when a dead worker abandoned it; returns whether it did.
+    """
+    if job.status != StatisticsReportJob.STATUS_RUNNING:
+        return False
+    if not _stale_jobs(now).filter(pk=job.pk).update(status=StatisticsReportJob.STATUS_PENDING, started_at=None):
+        return False
+    job.status = StatisticsReportJob.STATUS_PENDING
+    job.started_at = None
+    if background:
+        _schedule(job.pk)
+    return True
+
+
+def find_report(user_profile, window):
+    """
+    Returns the finished report of a StatisticsWindow for the user's current data version, if there is one.
+    """
+    return (StatisticsReportJob.objects
+            .filter(user_profile=user_profile,
+                    data_version=user_profile.data_version,
+                    window_start=window.start,
+                    window_end=window.end,
+                    status=StatisticsReportJob.STATUS_DONE)
+            .order_by('-finished_at')
+            .first())
+
+
+def enqueue_report(user_profile, window=None, background=True):
+    """
+    Returns the report job for the user's current data and a StatisticsWindow (the last year by default),
+    creating and scheduling one when needed.
+
+    A pending, running or finished job for the same data version and window is reused, so repeated requests
+    do not generate the same document twice; a running one abandoned by a dead worker is queued again.
+    """
+    window = window or StatisticsWindow.preset()
+    job = (StatisticsReportJob.objects
+           .filter(user_profile=user_profile, data_version=user_profile.data_version,
+                   window_start=window.start, window_end=window.end)
+           .exclude(status=StatisticsReportJob.STATUS_FAILED)
+           .order_by('-created_at')
+           .first())
+    if job is None:
+        job = StatisticsReportJob.objects.create(
+            user_profile=user_profile,
+            data_version=user_profile.data_version,
+            window_start=window.start,
+            window_end=window.end
+        )
+    elif resume_stale_job(job, background):
+        return job
+    if background and job.status == StatisticsReportJob.STATUS_PENDING:
+        _schedule(job.pk)
+    return job
+
+
+def _delete_outdated_reports(user_profile_id, data_version):
+    """
+    Deletes the finished and failed reports of older data versions, which can never be served again.
+    """
+    (StatisticsReportJob.objects
+     .filter(user_profile_id=user_profile_id,
+             data_version__lt=data_version,
+             status__in=(StatisticsReportJob.STATUS_DONE, StatisticsReportJob.STATUS_FAILED))
+     .delete())
+
+
+def _claim(job_id):
+    with transaction.atomic():
+        job = (StatisticsReportJob.objects
+               .select_for_update(skip_locked=True)
+               .filter(pk=job_id, status=StatisticsReportJob.STATUS_PENDING)
+               .first())
+        if job is None:
+            return None
+        job.status = StatisticsReportJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_report_job(job_id):
+    """
+    Generates the PDF of a pending job and stores it on the job.
+
+    Returns the job, or None when it does not exist or another worker already claimed it.
+    """
+    job = _claim(job_id)
+    if job is None:
+        return None
+
+    try:
+        user_profile = UserProfile.objects.select_related('user').get(pk=job.user_profile_id)
+        if job.window_start is None:
+            window = StatisticsWindow.preset()
+        else:
+            window = StatisticsWindow(job.window_start, job.window_end)
+        job.pdf = build_statistics_pdf(user_profile.user.username, rollup_statistics(user_profile, window), window)
+        job.status = StatisticsReportJob.STATUS_DONE
+        job.error = ''
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.exception("Report job %s failed", job.pk)
+        job.status = StatisticsReportJob.STATUS_FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['pdf', 'status', 'error', 'finished_at'])
+
+    if job.status == StatisticsReportJob.STATUS_DONE:
+        _delete_outdated_reports(job.user_profile_id, job.data_version)
+    return job
+
+
+def store_report(user_profile, pdf, window):
+    """
+    Stores a report of a StatisticsWindow generated synchronously so later downloads can reuse it.
+    """
+    finished_at = timezone.now()
+    job = StatisticsReportJob.objects.create(
+        user_profile=user_profile,
+        data_version=user_profile.data_version,
+        window_start=window.start,
+        window_end=window.end,
+        status=StatisticsReportJob.STATUS_DONE,
+        pdf=pdf,
+        started_at=finished_at,
+        finished_at=finished_at
+    )
+    _delete_outdated_reports(user_profile.pk, user_profile.data_version)
+    return job
+
+
+def process_pending_jobs(limit=None):
+    """
+    Runs pending jobs in the current thread, oldest first, and returns how many were processed.
+
+    Jobs abandoned by dead workers are queued again first.
+    """
+    requeue_stale_jobs()
+    pending = (StatisticsReportJob.objects
+               .filter(status=StatisticsReportJob.STATUS_PENDING)
+               .order_by('created_at')
+               .values_list('pk', flat=True))
+    if limit:
+        pending = pending[:limit]
+    return sum(1 for job_id in list(pending) if run_report_job(job_id) is not None)
@@ -0,0 +1,52 @@
+"""
+Management command benchmarking the main views on synthetic histories of growing size.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from period_app.benchmarks import BENCHMARK_REPEAT, BENCHMARK_SIZES, run_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Seeds a throwaway test database, measures the views and writes a JSON report.
+    """
+    help = "Measure latency, query count and peak memory of the main views for 1, 100 and 10 000 entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=list(BENCHMARK_SIZES),
+                            help="Numbers of entries of the benchmarked users.")
+        parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT, help="Timed runs per view.")
+        parser.add_argument('--output', '-o', help="File to write the JSON report to; standard output by default.")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or min(options['sizes']) < 1:
+            raise CommandError("Sizes and the number of runs must be positive.")
+
+        def report(result):
+            self.stderr.write(
+                f"{result['view']:<24} {result['entries']:>7} entries  "
+                f"{result['latency_ms']['median']:>9.1f} ms  {result['queries']:>4} queries  "
+                f"{result['peak_memory_kb']:>9.1f} KiB"
+            )
+
+        setup_test_environment()
+        # The benchmark seeds users and entries, so it never runs against the real database.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_benchmarks(options['sizes'], options['repeat'], progress=report)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}."))
+        else:
+            self.stdout.write(output)
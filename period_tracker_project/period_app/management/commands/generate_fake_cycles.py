@@ -0,0 +1,79 @@
+"""
+Management command populating the database with synthetic users and cycle histories for load testing.
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from period_app.fake_data import (
+    FAKE_BATCH_SIZE,
+    FAKE_HISTORY_YEARS,
+    FAKE_LOGGING_RATE,
+    FAKE_USERNAME_PREFIX,
+    FAKE_USERS_PER_TRANSACTION,
+    generate_fake_cycles,
+)
+from period_app.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Creates users with plausible multi-year cycle histories, deterministically for a given seed.
+    """
+    help = "Generate N users with synthetic cycle histories for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('users', type=int, help="Number of users to create.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--years', type=float, default=FAKE_HISTORY_YEARS, help="Length of every history.")
+        parser.add_argument('--logging-rate', type=float, default=FAKE_LOGGING_RATE,
+                            help="Average share of days with an entry.")
+        parser.add_argument('--batch-size', type=int, default=FAKE_BATCH_SIZE)
+        parser.add_argument('--users-per-transaction', type=int, default=FAKE_USERS_PER_TRANSACTION)
+        parser.add_argument('--username-prefix', default=FAKE_USERNAME_PREFIX)
+        parser.add_argument('--password', help="Password of every generated user; they cannot log in without it.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes; all CPUs by default, 0 runs in this process.")
+        parser.add_argument('--today', help="Last day of the histories (YYYY-MM-DD) instead of today.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['today']:
+            try:
+                today = date.fromisoformat(options['today'])
+            except ValueError as e:
+                raise CommandError(f"Invalid date: {options['today']}") from e
+        if min(options['users'], options['batch_size'], options['users_per_transaction']) < 1:
+            raise CommandError("The number of users and the batch sizes must be positive.")
+        if options['years'] <= 0 or not 0 < options['logging_rate'] <= 1:
+            raise CommandError("The history must be longer than 0 years and the logging rate within (0, 1].")
+        if CustomUser.objects.filter(username__startswith=options['username_prefix']).exists():
+            raise CommandError(
+                f"Users named {options['username_prefix']}* already exist, choose another --username-prefix."
+            )
+
+        started = time.perf_counter()
+
+        def report(users, entries):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Created {users} users and {entries} entries ({entries / elapsed:.0f} entries/s).")
+
+        users, entries = generate_fake_cycles(
+            options['users'],
+            seed=options['seed'],
+            years=options['years'],
+            logging_rate=options['logging_rate'],
+            batch_size=options['batch_size'],
+            users_per_transaction=options['users_per_transaction'],
+            username_prefix=options['username_prefix'],
+            password=options['password'],
+            today=today,
+            workers=options['workers'],
+            progress=report if options['verbosity'] >= 1 else None
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {users} users with {entries} entries in {elapsed:.2f}s."
+        ))
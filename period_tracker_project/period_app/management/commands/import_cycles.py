@@ -0,0 +1,59 @@
+"""
+Management command importing historical cycle entries for a user from a CSV or JSON file.
+"""
+
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from period_app.importers import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    ImportFormatError,
+    detect_format,
+    import_entries,
+    read_rows,
+)
+from period_app.models import UserProfile
+
+
+class Command(BaseCommand):
+    """
+    Imports entries with the same validation as the cycle health form.
+    """
+    help = "Import cycle entries for a user from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--strict', action='store_true', help="Import nothing if any row is invalid.")
+
+    def handle(self, *args, **options):
+        try:
+            user_profile = UserProfile.objects.get(user__username=options['username'])
+        except UserProfile.DoesNotExist as e:
+            raise CommandError(f"User {options['username']} does not exist or has no profile.") from e
+
+        import_format = options['format'] or detect_format(options['path'])
+        started = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as file:
+                result = import_entries(
+                    user_profile,
+                    read_rows(file, import_format),
+                    batch_size=options['batch_size'],
+                    strict=options['strict']
+                )
+        except (OSError, ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(str(e)) from e
+        elapsed = time.perf_counter() - started
+
+        for row_number, errors in result.errors:
+            details = '; '.join(f"{field}: {', '.join(messages)}" for field, messages in errors.items())
+            self.stderr.write(f"Row {row_number}: {details}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} entries, rejected {len(result.errors)} rows in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,77 @@
+"""
+Management command maintaining the date partitions of the entry table.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+
+from period_app.partitioning import (
+    PARTITION_INTERVALS,
+    archive_partitions,
+    create_future_partitions,
+    existing_partitions,
+    is_partitioned,
+    partition_default_rows,
+    partition_table,
+    unpartition_table,
+)
+
+
+class Command(BaseCommand):
+    """
+    Partitioning is opted into once with --partition; afterwards the command is meant to run regularly
+    (e.g. monthly from cron).
+    """
+    help = ("Partition the entry table by year or month when asked to, create the partitions of the coming years "
+            "or months and of entries left in the default partition, and optionally detach old partitions into "
+            "archive tables.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partition', choices=PARTITION_INTERVALS,
+                            help="Convert the entry table into a table partitioned by year or month.")
+        parser.add_argument('--unpartition', action='store_true',
+                            help="Turn the partitioned entry table back into a plain table.")
+        parser.add_argument('--ahead', type=int,
+                            help="Number of future partitions to keep ready (ENTRY_PARTITIONS_AHEAD by default).")
+        parser.add_argument('--archive-before', metavar='YYYY-MM-DD',
+                            help="Detach the partitions ending on or before this day into archived_ tables.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Entry partitioning requires PostgreSQL.")
+        if options['partition'] and options['unpartition']:
+            raise CommandError("--partition and --unpartition cannot be combined.")
+        if options['ahead'] is not None and options['ahead'] < 0:
+            raise CommandError("--ahead cannot be negative.")
+        archive_before = None
+        if options['archive_before']:
+            archive_before = parse_date(options['archive_before'])
+            if archive_before is None:
+                raise CommandError("Expected --archive-before in the YYYY-MM-DD format.")
+
+        if options['unpartition']:
+            if is_partitioned():
+                unpartition_table()
+                self.stdout.write(self.style.SUCCESS("The entry table is no longer partitioned."))
+            return
+        if options['partition']:
+            if is_partitioned():
+                interval = existing_partitions()[1]
+                if interval != options['partition']:
+                    raise CommandError(f"The entry table is already partitioned by {interval}.")
+            else:
+                try:
+                    partition_table(options['partition'], ahead=options['ahead'])
+                except ValueError as e:
+                    raise CommandError(str(e)) from e
+                self.stdout.write(f"Partitioned the entry table by {options['partition']}.")
+        if not is_partitioned():
+            raise CommandError("The entry table is not partitioned; opt in with --partition year or --partition month.")
+
+        for name in partition_default_rows() + create_future_partitions(options['ahead']):
+            self.stdout.write(f"Created partition {name}.")
+        if archive_before:
+            for name in archive_partitions(archive_before):
+                self.stdout.write(f"Archived partition as {name}.")
+        self.stdout.write(self.style.SUCCESS("Entry partitions are up to date."))
@@ -0,0 +1,51 @@
+"""
+Management command refreshing the cycle predictions of every user.
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from period_app.predictions import BATCH_CHUNK_SIZE, predict_all_users
+
+
+class Command(BaseCommand):
+    """
+    Refits CyclePrediction for all users in chunks, fanning the computation out over a process pool.
+    """
+    help = "Recompute next-period and ovulation predictions for all users."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=BATCH_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes; all CPUs by default, 0 runs in this process.")
+        parser.add_argument('--today', help="Predict as of this date (YYYY-MM-DD) instead of today.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['today']:
+            try:
+                today = date.fromisoformat(options['today'])
+            except ValueError as e:
+                raise CommandError(f"Invalid date: {options['today']}") from e
+        if options['chunk_size'] < 1:
+            raise CommandError("The chunk size must be positive.")
+
+        started = time.perf_counter()
+
+        def report(processed):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Processed {processed} profiles ({processed / elapsed:.0f}/s).")
+
+        processed = predict_all_users(
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            today=today,
+            progress=report if options['verbosity'] >= 1 else None
+        )
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated predictions of {processed} profiles in {elapsed:.2f}s ({rate:.0f} profiles/s)."
+        ))
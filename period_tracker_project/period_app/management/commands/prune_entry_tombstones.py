@@ -0,0 +1,18 @@
+"""
+Management command deleting sync tombstones older than the retention period.
+"""
+
+from django.core.management.base import BaseCommand
+
+from period_app.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Keeps the tombstone table small; clients with older tokens are sent a full reset.
+    """
+    help = "Delete tombstones of deleted entries that are older than the sync retention period."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones."))
@@ -0,0 +1,35 @@
+"""
+Management command rebuilding the daily statistics rollups from the daily logs of the recorded entries.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from period_app.models import UserProfile
+from period_app.rollups import REBUILD_BATCH_SIZE, rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Backfills or rebuilds DailyStatisticsRollup for all users or the given usernames.
+    """
+    help = "Rebuild the daily statistics rollups from the DailyLog rows of the entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Only rebuild the rollups of these users.")
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        user_profile_ids = None
+        if options['usernames']:
+            user_profile_ids = list(UserProfile.objects
+                                    .filter(user__username__in=options['usernames'])
+                                    .values_list('id', flat=True))
+            if len(user_profile_ids) != len(set(options['usernames'])):
+                raise CommandError("Some of the given users do not exist or have no profile.")
+
+        started = time.perf_counter()
+        written = rebuild_rollups(user_profile_ids, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily rollups in {elapsed:.2f}s."))
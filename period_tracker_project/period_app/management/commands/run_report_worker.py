@@ -0,0 +1,30 @@
+"""
+Management command processing queued statistics PDF reports.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from period_app.jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+    """
+    Runs pending StatisticsReportJob rows, once or continuously.
+    """
+    help = "Generate queued statistics PDF reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process the pending jobs and exit.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls.")
+        parser.add_argument('--limit', type=int, default=None, help="Maximum number of jobs per poll.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending_jobs(limit=options['limit'])
+            if processed:
+                self.stdout.write(f"Processed {processed} report job(s).")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=models.Index(fields=['user_profile', 'date'], name='healthform_profile_date_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:09
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0002_healthandcycleformmodel_healthform_profile_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['daily_symptoms'], name='healthform_symptoms_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['daily_mood'], name='healthform_mood_gin'),
+        ),
+    ]
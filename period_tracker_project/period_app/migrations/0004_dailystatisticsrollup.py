@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0003_healthform_json_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatisticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('symptom_counts', models.JSONField(default=dict)),
+                ('mood_counts', models.JSONField(default=dict)),
+                ('pain_counts', models.JSONField(default=dict)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='period_app.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'day'), name='unique_rollup_profile_day')],
+            },
+        ),
+    ]
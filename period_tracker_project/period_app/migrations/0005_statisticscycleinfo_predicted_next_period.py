@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0004_dailystatisticsrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statisticscycleinfo',
+            name='predicted_next_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
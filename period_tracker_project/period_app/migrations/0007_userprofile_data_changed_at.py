@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0006_userprofile_data_version_statisticsreportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='data_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0007_userprofile_data_changed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthEntryTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='healthandcycleformmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=models.Index(fields=['user_profile', 'updated_at'], name='healthform_profile_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='healthentrytombstone',
+            name='user_profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_tombstones', to='period_app.userprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='healthentrytombstone',
+            index=models.Index(fields=['user_profile', 'deleted_at'], name='tombstone_profile_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0008_entry_updated_at_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CyclePrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_period_start', models.DateField(blank=True, null=True)),
+                ('cycle_count', models.PositiveIntegerField(default=0)),
+                ('cycle_length_mean', models.FloatField(default=0)),
+                ('cycle_length_m2', models.FloatField(default=0)),
+                ('recent_cycle_lengths', models.JSONField(default=list)),
+                ('recent_period_lengths', models.JSONField(default=list)),
+                ('stated_cycle_length', models.PositiveIntegerField(blank=True, null=True)),
+                ('next_period_start', models.DateField(blank=True, null=True)),
+                ('next_period_earliest', models.DateField(blank=True, null=True)),
+                ('next_period_latest', models.DateField(blank=True, null=True)),
+                ('ovulation_window_start', models.DateField(blank=True, null=True)),
+                ('ovulation_window_end', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cycle_prediction', to='period_app.userprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copies the existing entries into the normalized tables with the same rules as period_app.normalization.
+BACKFILL_SQL = [
+    """
+    INSERT INTO period_app_dailylog
+        (entry_id, user_profile_id, date, recorded_at, daily_symptoms, daily_mood, average_pain_level)
+    SELECT id, user_profile_id, date, recorded_at, daily_symptoms, daily_mood, average_pain_level
+    FROM period_app_healthandcycleformmodel
+    """,
+    """
+    INSERT INTO period_app_calendarevent (entry_id, user_profile_id, date, title)
+    SELECT id, user_profile_id, date, COALESCE(event, '')
+    FROM period_app_healthandcycleformmodel
+    WHERE date IS NOT NULL
+    """,
+    """
+    INSERT INTO period_app_cycle (user_profile_id, start_date, end_date, cycle_length, period_length)
+    SELECT user_profile_id, menstruation_phase_start, MAX(menstruation_phase_end), MAX(cycle_length),
+           MAX(period_length)
+    FROM period_app_healthandcycleformmodel
+    WHERE menstruation_phase_start IS NOT NULL
+    GROUP BY user_profile_id, menstruation_phase_start
+    """,
+    """
+    INSERT INTO period_app_healthprofile (user_profile_id, allergies, medications, health_condition, updated_at)
+    SELECT profile.id,
+           (SELECT allergies FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.allergies <> '' ORDER BY e.id DESC LIMIT 1),
+           (SELECT medications FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.medications <> '' ORDER BY e.id DESC LIMIT 1),
+           (SELECT health_condition FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.health_condition <> '' ORDER BY e.id DESC LIMIT 1),
+           NOW()
+    FROM period_app_userprofile profile
+    WHERE EXISTS (
+        SELECT 1 FROM period_app_healthandcycleformmodel e
+        WHERE e.user_profile_id = profile.id
+          AND (e.allergies <> '' OR e.medications <> '' OR e.health_condition <> '')
+    )
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0009_cycleprediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('allergies', models.TextField(blank=True, null=True)),
+                ('medications', models.TextField(blank=True, null=True)),
+                ('health_condition', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='health_profile', to='period_app.userprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CalendarEvent',
+            fields=[
+                ('entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendar_event', serialize=False, to='period_app.healthandcycleformmodel')),
+                ('date', models.DateField()),
+                ('title', models.TextField(blank=True, default='')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_events', to='period_app.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'date'], name='calendarevent_profile_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Cycle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('cycle_length', models.PositiveIntegerField(blank=True, null=True)),
+                ('period_length', models.PositiveIntegerField(blank=True, null=True)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cycles', to='period_app.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'start_date'), name='unique_cycle_profile_start')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyLog',
+            fields=[
+                ('entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='daily_log', serialize=False, to='period_app.healthandcycleformmodel')),
+                ('date', models.DateField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField(blank=True, null=True)),
+                ('daily_symptoms', models.JSONField(default=list)),
+                ('daily_mood', models.JSONField(default=list)),
+                ('average_pain_level', models.PositiveIntegerField(blank=True, choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6'), (7, '7'), (8, '8'), (9, '9'), (10, '10')], null=True)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_logs', to='period_app.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'recorded_at'], name='dailylog_profile_recorded_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
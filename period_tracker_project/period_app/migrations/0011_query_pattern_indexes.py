@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0010_normalized_entries'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='calendarevent',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_events', to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='cycle',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='cycles', to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='dailylog',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_logs', to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='dailystatisticsrollup',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='healthandcycleformmodel',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='healthentrytombstone',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entry_tombstones', to='period_app.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='statisticsreportjob',
+            name='user_profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='period_app.userprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=models.Index(condition=models.Q(('menstruation_phase_start__isnull', False)), fields=['user_profile', '-menstruation_phase_start'], name='healthform_profile_period_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+# Partitioning the entry table is an explicit opt-in, ``manage.py manage_entry_partitions --partition year|month``,
+# rather than a migration depending on settings (see period_app/partitioning.py). A table partitioned by an earlier
+# version of this migration gets its (id, date) primary key by running the command with --unpartition and then
+# --partition again.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0011_query_pattern_indexes'),
+    ]
+
+    operations = []
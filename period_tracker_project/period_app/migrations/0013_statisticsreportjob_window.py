@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0012_entry_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statisticsreportjob',
+            name='window_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='statisticsreportjob',
+            name='window_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0013_statisticsreportjob_window'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='healthprofile',
+            name='user_profile',
+        ),
+        migrations.DeleteModel(
+            name='CalendarEvent',
+        ),
+        migrations.DeleteModel(
+            name='HealthProfile',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0014_remove_calendarevent_healthprofile'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthandcycleformmodel',
+            name='healthform_symptoms_gin',
+        ),
+        migrations.RemoveIndex(
+            model_name='healthandcycleformmodel',
+            name='healthform_mood_gin',
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def stamp_existing_rows(apps, schema_editor):
+    # Rows written before sync versions existed are stamped with their owner's current version.
+    UserProfile = apps.get_model('period_app', 'UserProfile')
+    version = Subquery(UserProfile.objects.filter(pk=OuterRef('user_profile_id')).values('data_version')[:1])
+    for model_name in ('HealthAndCycleFormModel', 'HealthEntryTombstone'):
+        apps.get_model('period_app', model_name).objects.update(sync_version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0015_drop_healthform_json_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthandcycleformmodel',
+            name='healthform_profile_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='healthentrytombstone',
+            name='tombstone_profile_deleted_idx',
+        ),
+        migrations.AddField(
+            model_name='healthandcycleformmodel',
+            name='sync_version',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthentrytombstone',
+            name='sync_version',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='healthandcycleformmodel',
+            index=models.Index(fields=['user_profile', 'sync_version'], name='healthform_profile_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthentrytombstone',
+            index=models.Index(fields=['user_profile', 'sync_version'], name='tombstone_profile_sync_idx'),
+        ),
+        migrations.RunPython(stamp_existing_rows, migrations.RunPython.noop),
+    ]
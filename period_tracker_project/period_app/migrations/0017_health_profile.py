@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Keeps the latest non-empty allergies, medications and health condition each user logged with an entry.
+BACKFILL_SQL = """
+    INSERT INTO period_app_healthprofile (user_profile_id, allergies, medications, health_condition, updated_at)
+    SELECT profile.id,
+           (SELECT allergies FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.allergies <> '' ORDER BY e.id DESC LIMIT 1),
+           (SELECT medications FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.medications <> '' ORDER BY e.id DESC LIMIT 1),
+           (SELECT health_condition FROM period_app_healthandcycleformmodel e
+            WHERE e.user_profile_id = profile.id AND e.health_condition <> '' ORDER BY e.id DESC LIMIT 1),
+           NOW()
+    FROM period_app_userprofile profile
+    WHERE EXISTS (
+        SELECT 1 FROM period_app_healthandcycleformmodel e
+        WHERE e.user_profile_id = profile.id
+          AND (e.allergies <> '' OR e.medications <> '' OR e.health_condition <> '')
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('period_app', '0016_sync_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('allergies', models.TextField(blank=True, null=True)),
+                ('medications', models.TextField(blank=True, null=True)),
+                ('health_condition', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='health_profile', to='period_app.userprofile')),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.RemoveField(
+            model_name='healthandcycleformmodel',
+            name='allergies',
+        ),
+        migrations.RemoveField(
+            model_name='healthandcycleformmodel',
+            name='health_condition',
+        ),
+        migrations.RemoveField(
+            model_name='healthandcycleformmodel',
+            name='medications',
+        ),
+    ]
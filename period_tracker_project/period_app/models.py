@@ -25,6 +25,8 @@ class UserProfile(models.Model):
         on_delete=models.CASCADE,
         related_name='userprofile'
     )
+    data_version = models.PositiveBigIntegerField(default=0)
+    data_changed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self) -> str:
         return f"{self.user.username}'s profile" if self.user else "Unknown profile"
@@ -72,9 +74,11 @@ class HealthAndCycleFormModel(models.Model):
         ('Panika', 'Panika'),
     ]
 
+    # Every index of the model starts with user_profile, so the foreign key needs no index of its own.
     user_profile = models.ForeignKey(
         UserProfile,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     first_day_of_cycle = models.DateField(null=True, blank=True)
     cycle_length = models.PositiveIntegerField(null=True, blank=True)
@@ -93,9 +97,6 @@ class HealthAndCycleFormModel(models.Model):
     ovulation_phase_end = models.DateField(null=True, blank=True)
     luteal_phase_start = models.DateField(null=True, blank=True)
     luteal_phase_end = models.DateField(null=True, blank=True)
-    allergies = models.TextField(null=True, blank=True)
-    medications = models.TextField(null=True, blank=True)
-    health_condition = models.TextField(null=True, blank=True)
     pregnancy_start = models.DateField(null=True, blank=True)
     pregnancy_end = models.DateField(null=True, blank=True)
     current_cycle_day = models.PositiveIntegerField(null=True, blank=True)
@@ -109,6 +110,21 @@ class HealthAndCycleFormModel(models.Model):
         blank=True,
         verbose_name="Recorded At"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    # The owner's data_version the last change was committed under, None until it is (see period_app.sync).
+    sync_version = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_profile', 'date'], name='healthform_profile_date_idx'),
+            models.Index(fields=['user_profile', 'sync_version'], name='healthform_profile_sync_idx'),
+            # Latest periods first: the cycle state, predictions and cycle merging only read entries with a start.
+            models.Index(
+                fields=['user_profile', '-menstruation_phase_start'],
+                name='healthform_profile_period_idx',
+                condition=models.Q(menstruation_phase_start__isnull=False)
+            ),
+        ]
 
     def __str__(self) -> str:
         if self.user_profile and self.recorded_at:
@@ -116,6 +132,99 @@ class HealthAndCycleFormModel(models.Model):
         return "Incomplete form"
 
 
+class HealthEntryTombstone(models.Model):
+    """Record of a deleted HealthAndCycleFormModel, so sync clients can remove their copy."""
+    user_profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='entry_tombstones',
+        db_index=False
+    )
+    entry_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(db_index=True)
+    # Same as HealthAndCycleFormModel.sync_version, for the deletion.
+    sync_version = models.PositiveBigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_profile', 'sync_version'], name='tombstone_profile_sync_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Deleted entry {self.entry_id} of profile {self.user_profile_id}"
+
+
+class Cycle(models.Model):
+    """A logged period of a user, merged from all entries reporting the same menstruation start."""
+    user_profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='cycles',
+        db_index=False
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    cycle_length = models.PositiveIntegerField(null=True, blank=True)
+    period_length = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_profile', 'start_date'], name='unique_cycle_profile_start'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Cycle of profile {self.user_profile_id} - {self.start_date.strftime('%Y-%m-%d')}"
+
+
+class DailyLog(models.Model):
+    """Symptoms, mood and pain level of an entry, without its cycle and profile columns."""
+    entry = models.OneToOneField(
+        HealthAndCycleFormModel,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='daily_log'
+    )
+    user_profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='daily_logs',
+        db_index=False
+    )
+    date = models.DateField(null=True, blank=True)
+    recorded_at = models.DateTimeField(null=True, blank=True)
+    daily_symptoms = models.JSONField(default=list)
+    daily_mood = models.JSONField(default=list)
+    average_pain_level = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        choices=HealthAndCycleFormModel.PAIN_LEVEL_CHOICES
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_profile', 'recorded_at'], name='dailylog_profile_recorded_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Daily log of entry {self.entry_id}"
+
+
+class HealthProfile(models.Model):
+    """Slow-changing health information of a user, stored once instead of with every entry."""
+    user_profile = models.OneToOneField(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='health_profile'
+    )
+    allergies = models.TextField(null=True, blank=True)
+    medications = models.TextField(null=True, blank=True)
+    health_condition = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Health profile of profile {self.user_profile_id}"
+
+
 class StatisticsCycleInfo(models.Model):
     """Model for tracking and analyzing menstrual cycle statistics and health information."""
     user_profile = models.OneToOneField(
@@ -153,6 +262,7 @@ class StatisticsCycleInfo(models.Model):
     pregnancy_end = models.DateField(null=True, blank=True)
     date = models.DateField(null=True, blank=True)
     event = models.TextField(null=True, blank=True)
+    predicted_next_period = models.DateField(null=True, blank=True)
     recorded_at = models.DateTimeField(
         null=True,
         blank=True,
@@ -163,3 +273,91 @@ class StatisticsCycleInfo(models.Model):
         if self.user_profile and self.recorded_at:
             return f"{self.user_profile.user.username}'s cycle statistics - {self.recorded_at.strftime('%Y-%m-%d')}"
         return "Incomplete statistics"
+
+
+class CyclePrediction(models.Model):
+    """Cycle length statistics of a user, updated with every new period, and the predictions derived from them."""
+    user_profile = models.OneToOneField(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='cycle_prediction'
+    )
+    last_period_start = models.DateField(null=True, blank=True)
+    cycle_count = models.PositiveIntegerField(default=0)
+    cycle_length_mean = models.FloatField(default=0)
+    cycle_length_m2 = models.FloatField(default=0)
+    recent_cycle_lengths = models.JSONField(default=list)
+    recent_period_lengths = models.JSONField(default=list)
+    stated_cycle_length = models.PositiveIntegerField(null=True, blank=True)
+    next_period_start = models.DateField(null=True, blank=True)
+    next_period_earliest = models.DateField(null=True, blank=True)
+    next_period_latest = models.DateField(null=True, blank=True)
+    ovulation_window_start = models.DateField(null=True, blank=True)
+    ovulation_window_end = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Cycle prediction of profile {self.user_profile_id} - next period {self.next_period_start}"
+
+
+class DailyStatisticsRollup(models.Model):
+    """Per-user, per-day counts of symptoms, moods and pain levels, maintained from HealthAndCycleFormModel."""
+    user_profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups',
+        db_index=False
+    )
+    day = models.DateField()
+    entries = models.PositiveIntegerField(default=0)
+    symptom_counts = models.JSONField(default=dict)
+    mood_counts = models.JSONField(default=dict)
+    pain_counts = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_profile', 'day'], name='unique_rollup_profile_day'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Rollup of profile {self.user_profile_id} - {self.day.strftime('%Y-%m-%d')}"
+
+
+class StatisticsReportJob(models.Model):
+    """Background generation of a statistics PDF for a user at a given data version and statistics window."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user_profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='report_jobs',
+        db_index=False
+    )
+    data_version = models.PositiveBigIntegerField()
+    # Days [window_start, window_end) covered by the report, see period_app.stats.StatisticsWindow.
+    window_start = models.DateField(null=True, blank=True)
+    window_end = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    pdf = models.BinaryField(null=True, blank=True, editable=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_profile', 'data_version'], name='reportjob_profile_version_idx'),
+            models.Index(fields=['status', 'created_at'], name='reportjob_status_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Report job {self.pk} ({self.status}) - profile {self.user_profile_id} v{self.data_version}"
@@ -0,0 +1,125 @@
+"""
+This module maintains the normalized copies of HealthAndCycleFormModel: Cycle and DailyLog, and the HealthProfile.
+
+Entries stay the records written by the form, the API and imports. Every saved entry is copied into a narrow
+DailyLog (symptoms, mood, pain), read by the statistics rollups, and the periods reported by entries are merged
+into one Cycle per menstruation start, read by the calendar. Allergies, medications and the health condition are
+not stored with entries at all: the form and imports write them once per user into HealthProfile.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Cycle, DailyLog, HealthAndCycleFormModel, HealthProfile
+
+DAILY_LOG_FIELDS = ('date', 'recorded_at', 'daily_symptoms', 'daily_mood', 'average_pain_level')
+HEALTH_PROFILE_FIELDS = ('allergies', 'medications', 'health_condition')
+REBUILD_BATCH_SIZE = 1000
+
+
+def _daily_log(entry_id, user_profile_id, values):
+    return DailyLog(entry_id=entry_id, user_profile_id=user_profile_id, **dict(zip(DAILY_LOG_FIELDS, values)))
+
+
+def save_entry_rows(entry):
+    """
+    Writes the DailyLog of a saved entry in one upsert, moving it along when the entry moved to another user.
+    """
+    DailyLog.objects.bulk_create(
+        [_daily_log(entry.pk, entry.user_profile_id, [getattr(entry, field) for field in DAILY_LOG_FIELDS])],
+        update_conflicts=True,
+        unique_fields=['entry'],
+        update_fields=('user_profile',) + DAILY_LOG_FIELDS
+    )
+
+
+def save_health_profile(user_profile_id, values):
+    """
+    Writes the given HEALTH_PROFILE_FIELDS of a user in one upsert, leaving the others as they are.
+    """
+    fields = [field for field in HEALTH_PROFILE_FIELDS if field in values]
+    if not fields:
+        return
+    HealthProfile.objects.bulk_create(
+        [HealthProfile(user_profile_id=user_profile_id, **{field: values[field] for field in fields})],
+        update_conflicts=True,
+        unique_fields=['user_profile'],
+        update_fields=fields + ['updated_at']
+    )
+
+
+def _merged_cycles(entries):
+    return (entries
+            .filter(menstruation_phase_start__isnull=False)
+            .values('user_profile_id', 'menstruation_phase_start')
+            .annotate(
+                entries=Count('id'),
+                end_date=Max('menstruation_phase_end'),
+                cycle_length=Max('cycle_length'),
+                period_length=Max('period_length'),
+            )
+            .order_by('user_profile_id', 'menstruation_phase_start'))
+
+
+def _cycle(row):
+    return Cycle(
+        user_profile_id=row['user_profile_id'],
+        start_date=row['menstruation_phase_start'],
+        end_date=row['end_date'],
+        cycle_length=row['cycle_length'],
+        period_length=row['period_length'],
+    )
+
+
+def refresh_cycle(user_profile_id, start_date):
+    """
+    Recomputes the Cycle starting on ``start_date`` from the entries reporting that start.
+
+    The latest end and the longest stated lengths win; the cycle is removed when no entry reports it anymore.
+    """
+    row = _merged_cycles(HealthAndCycleFormModel.objects.filter(
+        user_profile_id=user_profile_id, menstruation_phase_start=start_date
+    )).first()
+    if row is None:
+        Cycle.objects.filter(user_profile_id=user_profile_id, start_date=start_date).delete()
+        return None
+    Cycle.objects.bulk_create(
+        [_cycle(row)],
+        update_conflicts=True,
+        unique_fields=['user_profile', 'start_date'],
+        update_fields=['end_date', 'cycle_length', 'period_length']
+    )
+    return row
+
+
+def rebuild_cycles(user_profile_ids):
+    """
+    Replaces the cycles of the given users with the ones merged from their entries.
+    """
+    rows = _merged_cycles(HealthAndCycleFormModel.objects.filter(user_profile_id__in=user_profile_ids))
+    with transaction.atomic():
+        Cycle.objects.filter(user_profile_id__in=user_profile_ids).delete()
+        Cycle.objects.bulk_create([_cycle(row) for row in rows], batch_size=REBUILD_BATCH_SIZE)
+
+
+def rebuild_normalized(user_profile_ids, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Rebuilds every normalized table of the given users from their entries in one streamed pass.
+    """
+    user_profile_ids = list(user_profile_ids)
+    rows = (HealthAndCycleFormModel.objects
+            .filter(user_profile_id__in=user_profile_ids)
+            .order_by('id')
+            .values_list('id', 'user_profile_id', *DAILY_LOG_FIELDS)
+            .iterator(chunk_size=batch_size))
+
+    with transaction.atomic():
+        DailyLog.objects.filter(user_profile_id__in=user_profile_ids).delete()
+        logs = []
+        for entry_id, user_profile_id, *values in rows:
+            logs.append(_daily_log(entry_id, user_profile_id, values))
+            if len(logs) >= batch_size:
+                DailyLog.objects.bulk_create(logs)
+                logs = []
+        DailyLog.objects.bulk_create(logs)
+        rebuild_cycles(user_profile_ids)
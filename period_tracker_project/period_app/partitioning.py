@@ -0,0 +1,388 @@
+"""
+This module manages the optional range partitioning of the entry table by ``date`` on PostgreSQL.
+
+Partitioning is an explicit opt-in: ``manage.py manage_entry_partitions --partition year|month`` converts the table
+into a declaratively partitioned table with one partition per year or month and a default partition for dates
+outside of them. Queries filtering on ``date``, like the calendar feed, are pruned to the partitions of their
+window.
+
+PostgreSQL requires the primary key of a partitioned table to contain the partition key, so the partitioned table
+has the composite primary key ``(id, date)``, ``id`` keeps coming from a sequence, and ``date`` becomes NOT NULL:
+the form, the API and imports always give one, undated entries written otherwise have to be dated before the
+conversion. For the same reason DailyLog references entries by ``(entry_id, date)``, following date changes with
+ON UPDATE CASCADE.
+"""
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import HealthAndCycleFormModel, HealthEntryTombstone
+from .signals import entries_bulk_changed
+
+PARTITION_INTERVALS = ('year', 'month')
+DEFAULT_PARTITIONS_AHEAD = 2
+PARTITION_KEY = 'date'
+ARCHIVE_PREFIX = 'archived_'
+
+# Partition names end with the first day of their range: _p2025 for a year, _p2025_06 for a month.
+PARTITION_SUFFIX_RE = re.compile(r'_p(\d{4})(?:_(\d{2}))?$')
+
+
+def interval_start(day, interval):
+    """
+    Returns the first day of the year or month containing ``day``.
+    """
+    return day.replace(month=1, day=1) if interval == 'year' else day.replace(day=1)
+
+
+def next_interval_start(start, interval):
+    """
+    Returns the first day of the year or month following the one starting on ``start``.
+    """
+    if interval == 'year':
+        return start.replace(year=start.year + 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(table, start, interval):
+    return f"{table}_p{start:%Y}" if interval == 'year' else f"{table}_p{start:%Y_%m}"
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _fetch_values(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def is_partitioned(model=HealthAndCycleFormModel):
+    """
+    Tells whether the table of ``model`` is a partitioned table.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [model._meta.db_table]
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(model=HealthAndCycleFormModel):
+    """
+    Returns ``{first day: partition name}`` of the attached range partitions, and the interval they use.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        names = _fetch_values(cursor, """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+        """, [table])
+
+    partitions, interval = {}, None
+    for name in names:
+        match = PARTITION_SUFFIX_RE.search(name)
+        if match is None or not name.startswith(table):
+            continue
+        year, month = match.groups()
+        interval = 'month' if month else 'year'
+        partitions[date(int(year), int(month or 1), 1)] = name
+    return partitions, interval
+
+
+def _create_partition(cursor, table, start, interval):
+    """
+    Creates and attaches the partition starting on ``start``, moving its rows out of the default partition.
+    """
+    end = next_interval_start(start, interval)
+    name = partition_name(table, start, interval)
+    cursor.execute(f"CREATE TABLE {_quote(name)} (LIKE {_quote(table)} INCLUDING CONSTRAINTS)")
+    cursor.execute(f"""
+        SELECT EXISTS (SELECT 1 FROM {_quote(table + '_default')} WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s)
+    """, [start, end])
+    incoming = _incoming_foreign_keys(cursor, table) if cursor.fetchone()[0] else []
+    # Attaching a range whose rows sit in the default partition fails, so they are moved first, without the foreign
+    # keys that would see them leave the table in between.
+    for referencing_table, constraint, _ in incoming:
+        cursor.execute(f"ALTER TABLE {_quote(referencing_table)} DROP CONSTRAINT {_quote(constraint)}")
+    if incoming:
+        cursor.execute(f"""
+            WITH moved AS (
+                DELETE FROM {_quote(table + '_default')}
+                WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s
+                RETURNING *
+            )
+            INSERT INTO {_quote(name)} SELECT * FROM moved
+        """, [start, end])
+    cursor.execute(
+        f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(name)} FOR VALUES FROM (%s) TO (%s)",
+        [start, end]
+    )
+    for referencing_table, constraint, definition in incoming:
+        cursor.execute(f"ALTER TABLE {_quote(referencing_table)} ADD CONSTRAINT {_quote(constraint)} {definition}")
+    return name
+
+
+def create_partitions(first_day, last_day, model=HealthAndCycleFormModel, interval=None):
+    """
+    Makes sure partitions cover every day from ``first_day`` to ``last_day`` and returns the names created.
+    """
+    existing, existing_interval = existing_partitions(model)
+    interval = existing_interval or interval or 'year'
+    table = model._meta.db_table
+    created = []
+    start = interval_start(first_day, interval)
+    with transaction.atomic(), connection.cursor() as cursor:
+        while start <= last_day:
+            if start not in existing:
+                created.append(_create_partition(cursor, table, start, interval))
+            start = next_interval_start(start, interval)
+    return created
+
+
+def create_future_partitions(ahead=None, model=HealthAndCycleFormModel, today=None):
+    """
+    Creates the partitions from the current one to ``ahead`` intervals in the future and returns the new names.
+    """
+    ahead = getattr(settings, 'ENTRY_PARTITIONS_AHEAD', DEFAULT_PARTITIONS_AHEAD) if ahead is None else ahead
+    _, interval = existing_partitions(model)
+    interval = interval or 'year'
+    first_day = interval_start(today or timezone.localdate(), interval)
+    last_day = first_day
+    for _ in range(ahead):
+        last_day = next_interval_start(last_day, interval)
+    return create_partitions(first_day, last_day, model, interval)
+
+
+def partition_default_rows(model=HealthAndCycleFormModel):
+    """
+    Creates the partitions for the dated entries that ended up in the default partition, e.g. imported history
+    older than the first partition, and returns the names created.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT MIN({PARTITION_KEY}), MAX({PARTITION_KEY}) FROM {_quote(table + '_default')}
+            WHERE {PARTITION_KEY} IS NOT NULL
+        """)
+        first_day, last_day = cursor.fetchone()
+    if first_day is None:
+        return []
+    return create_partitions(first_day, last_day, model)
+
+
+def _incoming_foreign_keys(cursor, table):
+    cursor.execute("""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = to_regclass(%s) AND conrelid <> confrelid
+    """, [table])
+    return cursor.fetchall()
+
+
+def _own_foreign_keys(cursor, table):
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid = to_regclass(%s)
+    """, [table])
+    return cursor.fetchall()
+
+
+def _index_definitions(cursor, table):
+    """
+    Returns ``{name: CREATE INDEX statement}`` of the secondary indexes of a table.
+    """
+    cursor.execute("""
+        SELECT index_class.relname, pg_get_indexdef(indexrelid)
+        FROM pg_index
+        JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+        WHERE indrelid = to_regclass(%s) AND NOT indisprimary
+    """, [table])
+    # Indexes of a partitioned table are defined ON ONLY the parent and attached to each partition.
+    return {name: definition.replace(' ON ONLY ', ' ON ', 1) for name, definition in cursor.fetchall()}
+
+
+def _entry_references(model):
+    """
+    Returns ``(model, table, column)`` of the foreign keys pointing at entries.
+    """
+    return [
+        (relation.related_model, relation.related_model._meta.db_table, relation.field.column)
+        for relation in model._meta.related_objects
+        if (relation.many_to_one or relation.one_to_one) and relation.field.db_constraint
+    ]
+
+
+def _last_id(cursor, table):
+    # Ids of deleted entries are never handed out again, sync tombstones refer to them.
+    cursor.execute(f"""
+        SELECT GREATEST(
+            (SELECT MAX(id) FROM {_quote(table)}),
+            (SELECT last_value FROM pg_sequences WHERE schemaname || '.' || sequencename
+                = pg_get_serial_sequence(%s, 'id') AND last_value IS NOT NULL)
+        )
+    """, [table])
+    return cursor.fetchone()[0]
+
+
+def partition_table(interval, model=HealthAndCycleFormModel, today=None, ahead=None):
+    """
+    Converts the table of ``model`` into a table partitioned by ``date`` every ``interval``, keyed by ``(id, date)``.
+
+    Partitions cover every existing entry and ``ahead`` intervals past today. Runs in one transaction holding
+    an exclusive lock on the table while the rows are copied. Raises ValueError when entries without a date exist
+    or a table referencing entries has no ``date`` column to reference them with.
+    """
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval}")
+    table = model._meta.db_table
+    old_table = f"{table}_unpartitioned"
+    sequence = f"{table}_id_seq"
+    today = today or timezone.localdate()
+    references = _entry_references(model)
+    for related_model, related_table, _ in references:
+        if not any(field.column == PARTITION_KEY for field in related_model._meta.concrete_fields):
+            raise ValueError(f"{related_table} references entries without a {PARTITION_KEY} column.")
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Deferred foreign key checks of rows written earlier in the transaction would block the ALTER TABLEs.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT COUNT(*) FROM {_quote(table)} WHERE {PARTITION_KEY} IS NULL")
+        undated = cursor.fetchone()[0]
+        if undated:
+            raise ValueError(f"{undated} entries have no {PARTITION_KEY}; date them before partitioning.")
+        indexes = _index_definitions(cursor, table)
+        foreign_keys = _own_foreign_keys(cursor, table)
+        for referencing_table, constraint, _ in _incoming_foreign_keys(cursor, table):
+            cursor.execute(f"ALTER TABLE {_quote(referencing_table)} DROP CONSTRAINT {_quote(constraint)}")
+        last_id = _last_id(cursor, table)
+        cursor.execute(f"SELECT MIN({PARTITION_KEY}), MAX({PARTITION_KEY}) FROM {_quote(table)}")
+        first_day, last_day = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {_quote(table)} RENAME TO {_quote(old_table)}")
+        cursor.execute(f"""
+            CREATE TABLE {_quote(table)} (LIKE {_quote(old_table)} INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE ({PARTITION_KEY})
+        """)
+        cursor.execute(f"ALTER TABLE {_quote(table)} ALTER COLUMN {PARTITION_KEY} SET NOT NULL")
+        cursor.execute(f"CREATE TABLE {_quote(table + '_default')} PARTITION OF {_quote(table)} DEFAULT")
+        create_partitions(first_day or today, max(last_day or today, today), model, interval)
+        create_future_partitions(ahead, model, today)
+
+        cursor.execute(f"INSERT INTO {_quote(table)} SELECT * FROM {_quote(old_table)}")
+        cursor.execute(f"DROP TABLE {_quote(old_table)}")
+        # Added once the old table and its primary key index are gone, so the new key can take their name.
+        cursor.execute(f"ALTER TABLE {_quote(table)} ADD PRIMARY KEY (id, {PARTITION_KEY})")
+        cursor.execute(f"CREATE SEQUENCE {_quote(sequence)} OWNED BY {_quote(table)}.id")
+        if last_id:
+            cursor.execute("SELECT setval(%s, %s)", [sequence, last_id])
+        cursor.execute(f"ALTER TABLE {_quote(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence])
+        # The definitions were read before the rename, so they already name the new table.
+        for definition in indexes.values():
+            cursor.execute(definition)
+        for constraint, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(constraint)} {definition}")
+        for _, related_table, column in references:
+            cursor.execute(f"""
+                UPDATE {_quote(related_table)} related SET {PARTITION_KEY} = entry.{PARTITION_KEY}
+                FROM {_quote(table)} entry
+                WHERE entry.id = related.{_quote(column)}
+                  AND related.{PARTITION_KEY} IS DISTINCT FROM entry.{PARTITION_KEY}
+            """)
+            cursor.execute(f"""
+                ALTER TABLE {_quote(related_table)}
+                ADD CONSTRAINT {_quote(f'{related_table}_{column}_fk_entry')}
+                FOREIGN KEY ({_quote(column)}, {PARTITION_KEY}) REFERENCES {_quote(table)} (id, {PARTITION_KEY})
+                ON UPDATE CASCADE DEFERRABLE INITIALLY DEFERRED
+            """)
+
+
+def unpartition_table(model=HealthAndCycleFormModel):
+    """
+    Turns the partitioned table of ``model`` back into a plain table with a primary key and incoming foreign keys.
+
+    Archived partitions are left alone, their rows are not copied back.
+    """
+    table = model._meta.db_table
+    old_table = f"{table}_partitioned"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Deferred foreign key checks of rows written earlier in the transaction would block the ALTER TABLEs.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE")
+        indexes = _index_definitions(cursor, table)
+        foreign_keys = _own_foreign_keys(cursor, table)
+        last_id = _last_id(cursor, table)
+
+        cursor.execute(f"ALTER TABLE {_quote(table)} RENAME TO {_quote(old_table)}")
+        cursor.execute(f"CREATE TABLE {_quote(table)} (LIKE {_quote(old_table)} INCLUDING CONSTRAINTS)")
+        cursor.execute(f"ALTER TABLE {_quote(table)} ALTER COLUMN {PARTITION_KEY} DROP NOT NULL")
+        cursor.execute(f"INSERT INTO {_quote(table)} SELECT * FROM {_quote(old_table)}")
+        # Drops the partitions, their indexes, the id sequence and the composite foreign keys to the table;
+        # archived tables only lose their id default.
+        cursor.execute(f"DROP TABLE {_quote(old_table)} CASCADE")
+        cursor.execute(f"ALTER TABLE {_quote(table)} ADD PRIMARY KEY (id)")
+        cursor.execute(
+            f"ALTER TABLE {_quote(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY "
+            f"(START WITH {int(last_id or 0) + 1})"
+        )
+        for definition in indexes.values():
+            cursor.execute(definition)
+        for constraint, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(constraint)} {definition}")
+        for _, related_table, column in _entry_references(model):
+            cursor.execute(f"""
+                ALTER TABLE {_quote(related_table)}
+                ADD CONSTRAINT {_quote(f'{related_table}_{column}_fk_entry')}
+                FOREIGN KEY ({_quote(column)}) REFERENCES {_quote(table)} (id) DEFERRABLE INITIALLY DEFERRED
+            """)
+
+
+def archive_partitions(before, model=HealthAndCycleFormModel):
+    """
+    Detaches the partitions ending on or before ``before`` and keeps them as standalone ``archived_`` tables.
+
+    Their entries leave the application like deleted ones: sync clients get their tombstones, the rows referencing
+    them are deleted, and the cycles, rollups and predictions of the affected users are rebuilt without them
+    through ``entries_bulk_changed``, which also outdates their cached responses and stored reports. Returns the
+    names of the archived tables.
+    """
+    partitions, interval = existing_partitions(model)
+    table = model._meta.db_table
+    tombstones = HealthEntryTombstone._meta.db_table
+    archived, user_profile_ids = [], set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Deferred foreign key checks of rows written earlier in the transaction would block the ALTER TABLEs.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for start, name in sorted(partitions.items()):
+            if next_interval_start(start, interval) > before:
+                continue
+            cursor.execute(f"""
+                INSERT INTO {_quote(tombstones)} (user_profile_id, entry_id, deleted_at)
+                SELECT user_profile_id, id, %s FROM {_quote(name)}
+            """, [timezone.now()])
+            user_profile_ids.update(_fetch_values(
+                cursor, f"SELECT DISTINCT user_profile_id FROM {_quote(name)}"
+            ))
+            for _, related_table, column in _entry_references(model):
+                cursor.execute(
+                    f"DELETE FROM {_quote(related_table)} WHERE {_quote(column)} IN (SELECT id FROM {_quote(name)})"
+                )
+            archive_name = ARCHIVE_PREFIX + name
+            cursor.execute(f"ALTER TABLE {_quote(table)} DETACH PARTITION {_quote(name)}")
+            cursor.execute(f"ALTER TABLE {_quote(name)} RENAME TO {_quote(archive_name)}")
+            archived.append(archive_name)
+        if user_profile_ids:
+            entries_bulk_changed.send(sender=model, user_profile_ids=sorted(user_profile_ids))
+    return archived
@@ -0,0 +1,327 @@
+"""
+This module predicts the next period and ovulation of a user from their observed cycle history.
+
+Cycle lengths are the gaps between consecutive menstruation starts. Their long-run mean and variance are kept with
+Welford's online algorithm and the last PREDICTION_WINDOW lengths are kept for the rolling median, so a new period
+updates the user's CyclePrediction in O(1). Editing or deleting older periods refits it from the history.
+"""
+
+import math
+import os
+import statistics
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+
+import django
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CyclePrediction, HealthAndCycleFormModel, UserProfile
+
+PREDICTION_WINDOW = 12
+MIN_CYCLE_LENGTH = 15
+# A longer gap means periods were not logged, it is not an observed cycle.
+MAX_CYCLE_LENGTH = 60
+DEFAULT_CYCLE_LENGTH = 28
+DEFAULT_CYCLE_STDDEV = 2.0
+# About 80% of cycles end within the predicted range when their lengths are normally distributed.
+CONFIDENCE_Z = 1.28
+LUTEAL_PHASE_DAYS = 14
+BATCH_CHUNK_SIZE = 2000
+FITTED_FIELDS = (
+    'last_period_start', 'cycle_count', 'cycle_length_mean', 'cycle_length_m2', 'recent_cycle_lengths',
+    'recent_period_lengths', 'stated_cycle_length', 'next_period_start', 'next_period_earliest',
+    'next_period_latest', 'ovulation_window_start', 'ovulation_window_end',
+)
+
+
+def _period_length(start, end):
+    return (end - start).days + 1 if end and end >= start else None
+
+
+def add_period(prediction, start, end=None) -> bool:
+    """
+    Folds a period into the statistics in O(1).
+
+    Returns False, leaving the statistics untouched, when ``start`` is older than the latest known period:
+    the history has to be refitted then.
+    """
+    last_start = prediction.last_period_start
+    period_length = _period_length(start, end)
+
+    if last_start is not None and start < last_start:
+        return False
+
+    if last_start is not None and start == last_start:
+        # Another entry of the latest period, the longest reported duration wins.
+        if period_length and prediction.recent_period_lengths:
+            known = prediction.recent_period_lengths[-1]
+            prediction.recent_period_lengths[-1] = max(known or 0, period_length)
+        return True
+
+    if last_start is not None:
+        cycle_length = (start - last_start).days
+        if MIN_CYCLE_LENGTH <= cycle_length <= MAX_CYCLE_LENGTH:
+            prediction.cycle_count += 1
+            delta = cycle_length - prediction.cycle_length_mean
+            prediction.cycle_length_mean += delta / prediction.cycle_count
+            prediction.cycle_length_m2 += delta * (cycle_length - prediction.cycle_length_mean)
+            prediction.recent_cycle_lengths = (prediction.recent_cycle_lengths + [cycle_length])[-PREDICTION_WINDOW:]
+
+    prediction.recent_period_lengths = (prediction.recent_period_lengths + [period_length])[-PREDICTION_WINDOW:]
+    prediction.last_period_start = start
+    return True
+
+
+def reset_statistics(prediction):
+    """
+    Forgets every observed period.
+    """
+    prediction.last_period_start = None
+    prediction.cycle_count = 0
+    prediction.cycle_length_mean = 0
+    prediction.cycle_length_m2 = 0
+    prediction.recent_cycle_lengths = []
+    prediction.recent_period_lengths = []
+
+
+def predicted_cycle_length(prediction) -> int:
+    """
+    Returns the rolling median of the observed cycle lengths, or the length stated by the user without them.
+    """
+    if prediction.recent_cycle_lengths:
+        return round(statistics.median(prediction.recent_cycle_lengths))
+    return prediction.stated_cycle_length or DEFAULT_CYCLE_LENGTH
+
+
+def predicted_period_length(prediction) -> int | None:
+    """
+    Returns the mean duration of the recent periods with a known end.
+    """
+    known = [length for length in prediction.recent_period_lengths if length]
+    return round(statistics.mean(known)) if known else None
+
+
+def cycle_length_stddev(prediction) -> float:
+    """
+    Returns the standard deviation of the recent cycle lengths, or of all of them when too few are recent.
+    """
+    if len(prediction.recent_cycle_lengths) >= 2:
+        return statistics.stdev(prediction.recent_cycle_lengths)
+    if prediction.cycle_count >= 2:
+        return math.sqrt(prediction.cycle_length_m2 / (prediction.cycle_count - 1))
+    return DEFAULT_CYCLE_STDDEV
+
+
+def update_forecast(prediction, today=None):
+    """
+    Recomputes the predicted next period and ovulation windows from the statistics.
+
+    When the predicted start has already passed without a logged period, whole cycles are added and
+    the range widens with the number of skipped cycles.
+    """
+    if prediction.last_period_start is None:
+        prediction.next_period_start = prediction.next_period_earliest = prediction.next_period_latest = None
+        prediction.ovulation_window_start = prediction.ovulation_window_end = None
+        return prediction
+
+    today = today or timezone.localdate()
+    cycle_length = predicted_cycle_length(prediction)
+    next_start = prediction.last_period_start + timedelta(days=cycle_length)
+    skipped = 0
+    if next_start < today:
+        skipped = -(-(today - next_start).days // cycle_length)
+        next_start += timedelta(days=skipped * cycle_length)
+
+    margin = timedelta(days=math.ceil(CONFIDENCE_Z * cycle_length_stddev(prediction) * math.sqrt(skipped + 1)))
+    luteal_phase = timedelta(days=LUTEAL_PHASE_DAYS)
+    prediction.next_period_start = next_start
+    prediction.next_period_earliest = next_start - margin
+    prediction.next_period_latest = next_start + margin
+    prediction.ovulation_window_start = prediction.next_period_earliest - luteal_phase
+    prediction.ovulation_window_end = prediction.next_period_latest - luteal_phase
+    return prediction
+
+
+def period_history(user_profile_id):
+    """
+    Returns the (start, end, cycle_length) values of the user's entries with a menstruation start, oldest first.
+    """
+    return (HealthAndCycleFormModel.objects
+            .filter(user_profile_id=user_profile_id, menstruation_phase_start__isnull=False)
+            .order_by('menstruation_phase_start', 'id')
+            .values_list('menstruation_phase_start', 'menstruation_phase_end', 'cycle_length'))
+
+
+def fit_prediction(prediction, history, today=None):
+    """
+    Rebuilds the statistics of a prediction from ``(start, end, cycle_length)`` rows sorted by start.
+    """
+    reset_statistics(prediction)
+    prediction.stated_cycle_length = None
+    for start, end, cycle_length in history:
+        add_period(prediction, start, end)
+        prediction.stated_cycle_length = cycle_length or prediction.stated_cycle_length
+    return update_forecast(prediction, today)
+
+
+def refit_prediction(user_profile_id, today=None):
+    """
+    Recomputes the prediction of a user from their whole history and saves it.
+    """
+    with transaction.atomic():
+        prediction, _ = CyclePrediction.objects.select_for_update().get_or_create(user_profile_id=user_profile_id)
+        fit_prediction(prediction, period_history(user_profile_id), today)
+        prediction.save()
+    return prediction
+
+
+def record_period(user_profile_id, start, end=None, cycle_length=None, today=None):
+    """
+    Updates the prediction of a user with a newly logged period in O(1), refitting only if it is not the latest.
+    """
+    with transaction.atomic():
+        prediction, _ = CyclePrediction.objects.select_for_update().get_or_create(user_profile_id=user_profile_id)
+        if not add_period(prediction, start, end):
+            fit_prediction(prediction, period_history(user_profile_id), today)
+        else:
+            prediction.stated_cycle_length = cycle_length or prediction.stated_cycle_length
+            update_forecast(prediction, today)
+        prediction.save()
+    return prediction
+
+
+def _profile_id_chunks(chunk_size):
+    """
+    Yields the ids of all user profiles in ascending chunks, paginating by key so each query stays cheap.
+    """
+    last_id = 0
+    while True:
+        chunk = list(UserProfile.objects
+                     .filter(pk__gt=last_id)
+                     .order_by('pk')
+                     .values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def load_prediction_states(user_profile_ids):
+    """
+    Returns the ``(updated_at, last_period_start)`` of the stored predictions of the given users.
+
+    Read before their histories, so save_forecasts can tell which predictions changed in the meantime.
+    """
+    return {
+        user_profile_id: (updated_at, last_period_start)
+        for user_profile_id, updated_at, last_period_start in (CyclePrediction.objects
+                                                              .filter(user_profile_id__in=user_profile_ids)
+                                                              .values_list('user_profile_id', 'updated_at',
+                                                                           'last_period_start'))
+    }
+
+
+def load_histories(user_profile_ids):
+    """
+    Returns ``(user_profile_id, history)`` pairs for the given users, reading all their periods in one query.
+    """
+    rows = (HealthAndCycleFormModel.objects
+            .filter(user_profile_id__in=user_profile_ids, menstruation_phase_start__isnull=False)
+            .order_by('user_profile_id', 'menstruation_phase_start', 'id')
+            .values_list('user_profile_id', 'menstruation_phase_start', 'menstruation_phase_end', 'cycle_length'))
+    histories = {user_profile_id: [] for user_profile_id in user_profile_ids}
+    for user_profile_id, group in groupby(rows, key=lambda row: row[0]):
+        histories[user_profile_id] = [row[1:] for row in group]
+    return list(histories.items())
+
+
+def forecast_histories(histories, today):
+    """
+    Fits the predictions of ``(user_profile_id, history)`` pairs and returns their field values.
+
+    Does not touch the database, so it can run in worker processes.
+    """
+    results = []
+    for user_profile_id, history in histories:
+        prediction = fit_prediction(CyclePrediction(), history, today)
+        results.append((user_profile_id, {field: getattr(prediction, field) for field in FITTED_FIELDS}))
+    return results
+
+
+def save_forecasts(results, loaded_states, batch_size=BATCH_CHUNK_SIZE) -> int:
+    """
+    Writes fitted predictions with one bulk_update and one bulk_create and returns how many users were processed.
+
+    ``loaded_states`` are the load_prediction_states of the chunk. The stored predictions are locked while they
+    are written and those updated since the chunk was loaded, e.g. by a period logged meanwhile, are left as
+    they are. Users without any logged period only get a row if they already had one.
+    """
+    now = timezone.now()
+    to_update, to_create = [], []
+    with transaction.atomic():
+        current = {
+            user_profile_id: (pk, (updated_at, last_period_start))
+            for user_profile_id, pk, updated_at, last_period_start in (
+                CyclePrediction.objects
+                .select_for_update()
+                .filter(user_profile_id__in=[user_profile_id for user_profile_id, _ in results])
+                .values_list('user_profile_id', 'pk', 'updated_at', 'last_period_start')
+            )
+        }
+        for user_profile_id, fields in results:
+            pk, state = current.get(user_profile_id, (None, None))
+            if state != loaded_states.get(user_profile_id):
+                continue
+            prediction = CyclePrediction(pk=pk, user_profile_id=user_profile_id, updated_at=now, **fields)
+            if prediction.pk is not None:
+                to_update.append(prediction)
+            elif prediction.last_period_start is not None:
+                to_create.append(prediction)
+
+        CyclePrediction.objects.bulk_update(to_update, FITTED_FIELDS + ('updated_at',), batch_size=batch_size)
+        # A prediction created by a period logged after the lock was taken is newer than this one.
+        CyclePrediction.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+    return len(results)
+
+
+def predict_all_users(chunk_size=BATCH_CHUNK_SIZE, workers=None, today=None, progress=None) -> int:
+    """
+    Refits and saves the predictions of every user and returns how many users were processed.
+
+    Profiles are read in chunks of ``chunk_size``; the fitting of each chunk runs in a pool of ``workers``
+    processes (all CPUs by default, in this process with 0) while the main process loads and saves the
+    others. ``progress`` is called with the running total after every saved chunk.
+    """
+    today = today or timezone.localdate()
+    processed = 0
+
+    def save(loaded_states, results):
+        nonlocal processed
+        processed += save_forecasts(results, loaded_states)
+        if progress:
+            progress(processed)
+
+    if workers == 0:
+        for chunk in _profile_id_chunks(chunk_size):
+            loaded_states = load_prediction_states(chunk)
+            save(loaded_states, forecast_histories(load_histories(chunk), today))
+        return processed
+
+    workers = workers or os.cpu_count() or 1
+    # Worker processes started with spawn or forkserver must configure Django before unpickling their tasks.
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        pending = deque()
+        for chunk in _profile_id_chunks(chunk_size):
+            loaded_states = load_prediction_states(chunk)
+            pending.append((loaded_states, executor.submit(forecast_histories, load_histories(chunk), today)))
+            # A couple of chunks per worker keeps them busy without holding every result in memory.
+            if len(pending) >= 2 * workers:
+                loaded_states, future = pending.popleft()
+                save(loaded_states, future.result())
+        while pending:
+            loaded_states, future = pending.popleft()
+            save(loaded_states, future.result())
+    return processed
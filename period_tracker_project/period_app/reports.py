@@ -0,0 +1,120 @@
+"""
+This module renders the statistics PDF report with ReportLab.
+"""
+
+from datetime import date
+from io import BytesIO
+
+from django.utils.timezone import now
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.units import inch
+
+# Style sheets are immutable once built, so they are created once for all reports.
+STYLES = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle( #tytul dokumentu
+    'CustomTitle',
+    parent=STYLES['Title'],
+    fontSize=24,
+    spaceAfter=30
+)
+TABLE_STYLE = TableStyle([ #style tabeli, kolor nagłówka, rozmiary czcionek i siatkę, zeby sie wszystko zmiscilo
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+TABLE_HEADER = ['Type', 'Number of occurrences', 'Dates']
+COLUMN_WIDTHS = [2 * inch, 2 * inch, 4 * inch]
+
+
+def compact_date_ranges(dates) -> str:
+    """
+    Collapses ``YYYY-MM-DD`` strings into comma separated runs of consecutive days.
+
+    For example 2025-01-01, 2025-01-02, 2025-01-03 and 2025-01-07 become "2025-01-01 – 2025-01-03, 2025-01-07".
+    """
+    ordinals = sorted({date.fromisoformat(value).toordinal() for value in dates})
+    runs = []
+    for ordinal in ordinals:
+        if runs and ordinal == runs[-1][1] + 1:
+            runs[-1][1] = ordinal
+        else:
+            runs.append([ordinal, ordinal])
+
+    parts = []
+    for first, last in runs:
+        first_str = date.fromordinal(first).isoformat()
+        parts.append(first_str if first == last else f"{first_str} – {date.fromordinal(last).isoformat()}")
+    return ', '.join(parts)
+
+
+def _create_table(data, title):
+    """
+    Creates a formatted table for the PDF report.
+    """
+    table_data = [TABLE_HEADER] #nagłowek kolumny, dodanie wierszy
+    for item, dates in data.items():
+        # Only the dates column can wrap, the short cells are plain strings.
+        table_data.append([
+            str(item),
+            str(len(dates)),
+            Paragraph(compact_date_ranges(dates), STYLES['Normal'])
+        ])
+
+    table = Table(table_data, colWidths=COLUMN_WIDTHS)
+    table.setStyle(TABLE_STYLE)
+
+    return [
+        Paragraph(title, STYLES['Heading1']), #nagłowek tabelki
+        Spacer(1, 0.2 * inch),
+        table,
+        Spacer(1, 0.3 * inch)
+    ]
+
+
+def render_statistics_pdf(username, statistics, output, window=None):
+    """
+    Writes a PDF report containing menstrual cycle statistics into the ``output`` file object.
+
+    The first and last day of the StatisticsWindow are printed under the title when it is given.
+    """
+    doc = SimpleDocTemplate( #uklad strony
+        output,
+        pagesize=letter,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch
+    )
+
+    elements = [
+        Paragraph(f"Statistics for user: {username}", TITLE_STYLE),
+        Paragraph(f"Date: {now().date().strftime('%Y-%m-%d')}", STYLES['Normal']),
+    ]
+    if window is not None:
+        elements.append(Paragraph(f"Period: {window.start.isoformat()} – {window.last_day.isoformat()}",
+                                  STYLES['Normal']))
+    elements.append(Spacer(1, 0.4 * inch))
+
+    elements.extend(_create_table(statistics.symptoms, "Symptoms"))
+    elements.extend(_create_table(statistics.moods, "Moods"))
+    elements.extend(_create_table(statistics.pain_levels, "Average pain day level"))
+
+    doc.build(elements) #generowanie PDF
+
+
+def build_statistics_pdf(username, statistics, window=None) -> bytes:
+    """
+    Generates a PDF report containing menstrual cycle statistics and returns its content.
+    """
+    buffer = BytesIO()
+    render_statistics_pdf(username, statistics, buffer, window)
+    return buffer.getvalue()
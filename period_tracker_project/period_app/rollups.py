@@ -0,0 +1,171 @@
+"""
+This module maintains DailyStatisticsRollup, the per-day symptom, mood and pain counts behind the statistics.
+
+The counts are read from the narrow DailyLog rows (see normalization.py) rather than from the entries.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DailyLog, DailyStatisticsRollup
+from .stats import timestamp_range
+
+BUCKET_PERIODS = ('day', 'week', 'month')
+REBUILD_BATCH_SIZE = 1000
+
+
+def _count_entries(rows):
+    """
+    Counts symptoms, moods and pain levels of (daily_symptoms, daily_mood, average_pain_level) rows.
+    """
+    symptoms, moods, pain_levels = Counter(), Counter(), Counter()
+    entries = 0
+    for daily_symptoms, daily_mood, average_pain_level in rows:
+        entries += 1
+        symptoms.update(daily_symptoms)
+        moods.update(daily_mood)
+        if average_pain_level:
+            pain_levels[str(int(average_pain_level))] += 1
+    return entries, symptoms, moods, pain_levels
+
+
+def refresh_daily_rollup(user_profile_id, day):
+    """
+    Recomputes the rollup of one user and day from the entries recorded on that day.
+
+    Called from the HealthAndCycleFormModel signal handlers, so it runs in the transaction that saved or
+    deleted the entry and only touches the rows of a single day.
+    """
+    start, end = timestamp_range(day, day + timedelta(days=1))
+    rows = (DailyLog.objects
+            .filter(user_profile_id=user_profile_id, recorded_at__gte=start, recorded_at__lt=end)
+            .values_list('daily_symptoms', 'daily_mood', 'average_pain_level'))
+    entries, symptoms, moods, pain_levels = _count_entries(rows)
+
+    if not entries:
+        DailyStatisticsRollup.objects.filter(user_profile_id=user_profile_id, day=day).delete()
+        return None
+
+    rollup, _ = DailyStatisticsRollup.objects.update_or_create(
+        user_profile_id=user_profile_id,
+        day=day,
+        defaults={
+            'entries': entries,
+            'symptom_counts': dict(symptoms),
+            'mood_counts': dict(moods),
+            'pain_counts': dict(pain_levels),
+        }
+    )
+    return rollup
+
+
+def _rollups_from_rows(rows):
+    """
+    Groups (user_profile_id, recorded_at, daily_symptoms, daily_mood, average_pain_level) rows
+    ordered by user and time into unsaved DailyStatisticsRollup objects.
+    """
+    current_key, current_rows = None, []
+    for user_profile_id, recorded_at, *values in rows:
+        key = (user_profile_id, timezone.localdate(recorded_at))
+        if key != current_key and current_rows:
+            yield _build_rollup(current_key, current_rows)
+            current_rows = []
+        current_key = key
+        current_rows.append(values)
+    if current_rows:
+        yield _build_rollup(current_key, current_rows)
+
+
+def _build_rollup(key, rows):
+    entries, symptoms, moods, pain_levels = _count_entries(rows)
+    return DailyStatisticsRollup(
+        user_profile_id=key[0],
+        day=key[1],
+        entries=entries,
+        symptom_counts=dict(symptoms),
+        mood_counts=dict(moods),
+        pain_counts=dict(pain_levels),
+    )
+
+
+def rebuild_rollups(user_profile_ids=None, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Rebuilds the rollups of the given users (all users by default) from scratch in one streamed pass.
+
+    Returns the number of rollup rows written.
+    """
+    logs = DailyLog.objects.filter(recorded_at__isnull=False)
+    rollups = DailyStatisticsRollup.objects.all()
+    if user_profile_ids is not None:
+        logs = logs.filter(user_profile_id__in=user_profile_ids)
+        rollups = rollups.filter(user_profile_id__in=user_profile_ids)
+
+    rows = (logs
+            .order_by('user_profile_id', 'recorded_at')
+            .values_list('user_profile_id', 'recorded_at', 'daily_symptoms', 'daily_mood', 'average_pain_level')
+            .iterator(chunk_size=batch_size))
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for rollup in _rollups_from_rows(rows):
+            batch.append(rollup)
+            if len(batch) >= batch_size:
+                DailyStatisticsRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            DailyStatisticsRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
+
+
+def bucket_start(day, period):
+    """
+    Returns the first day of the day, week (Monday) or month bucket containing ``day``.
+    """
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucket period: {period}")
+
+
+def rollup_buckets(user_profile, since, period='day'):
+    """
+    Returns the user's counts since the given day grouped by day, week or month.
+
+    Each bucket is a dict with ``start``, ``entries``, ``symptoms``, ``moods`` and ``pain_levels``.
+    The cost depends on the number of days with entries, not on the number of entries.
+    """
+    if period not in BUCKET_PERIODS:
+        raise ValueError(f"Unknown bucket period: {period}")
+
+    rows = (DailyStatisticsRollup.objects
+            .filter(user_profile=user_profile, day__gte=since)
+            .order_by('day')
+            .values_list('day', 'entries', 'symptom_counts', 'mood_counts', 'pain_counts'))
+
+    buckets = {}
+    for day, entries, symptom_counts, mood_counts, pain_counts in rows:
+        start = bucket_start(day, period)
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = {
+                'start': start,
+                'entries': 0,
+                'symptoms': Counter(),
+                'moods': Counter(),
+                'pain_levels': Counter(),
+            }
+        bucket['entries'] += entries
+        bucket['symptoms'].update(symptom_counts)
+        bucket['moods'].update(mood_counts)
+        bucket['pain_levels'].update(pain_counts)
+    return list(buckets.values())
@@ -0,0 +1,166 @@
+"""
+This module contains the serializers of the JSON API (see api.py).
+
+Entry lists are serialized from ``values()`` rows whose dates were already formatted by the database,
+so listing entries does not build model instances nor format dates in Python row by row.
+"""
+
+from datetime import timezone as dt_timezone
+
+from django.db.models import CharField, Func
+from rest_framework import serializers
+
+from .models import HealthAndCycleFormModel, HealthProfile
+from .normalization import HEALTH_PROFILE_FIELDS
+
+API_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+ENTRY_DATE_FIELDS = (
+    'date', 'first_day_of_cycle', 'last_period_start', 'menstruation_phase_start', 'menstruation_phase_end',
+)
+ENTRY_DATETIME_FIELDS = ('recorded_at',)
+ENTRY_FIELDS = (
+    'id', 'date', 'event', 'first_day_of_cycle', 'cycle_length', 'period_length', 'last_period_start',
+    'average_pain_level', 'menstruation_phase_start', 'menstruation_phase_end', 'daily_symptoms', 'daily_mood',
+    'recorded_at',
+)
+
+
+class ISODate(Func):
+    """
+    Formats a date column as ``YYYY-MM-DD`` in SQL.
+    """
+    template = "to_char(%(expressions)s, 'YYYY-MM-DD')"
+    output_field = CharField()
+
+
+class ISODateTime(Func):
+    """
+    Formats a timestamp column in UTC the same way as API_DATETIME_FORMAT.
+    """
+    template = "to_char(%(expressions)s AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US\"Z\"')"
+    output_field = CharField()
+
+
+def _formatted_alias(field):
+    return f'{field}_iso'
+
+
+def entry_rows(queryset, fields=ENTRY_FIELDS):
+    """
+    Returns ``values()`` rows of the requested entry fields with dates formatted by the database.
+
+    ``id`` is always selected because the cursor pagination orders by it.
+    """
+    plain = [field for field in fields if field not in ENTRY_DATE_FIELDS + ENTRY_DATETIME_FIELDS]
+    if 'id' not in plain:
+        plain.append('id')
+    formatted = {_formatted_alias(field): ISODate(field) for field in fields if field in ENTRY_DATE_FIELDS}
+    formatted.update(
+        {_formatted_alias(field): ISODateTime(field) for field in fields if field in ENTRY_DATETIME_FIELDS}
+    )
+    return queryset.values(*plain, **formatted)
+
+
+class SparseFieldsMixin:
+    """
+    Keeps only the fields listed in the ``fields`` serializer context (``?fields=id,date``), when given.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class HealthEntrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer creating, updating and returning a single cycle entry.
+    """
+    daily_symptoms = serializers.ListField(
+        child=serializers.ChoiceField(choices=HealthAndCycleFormModel.SYMPTOM_CHOICES),
+        required=False
+    )
+    daily_mood = serializers.ListField(
+        child=serializers.ChoiceField(choices=HealthAndCycleFormModel.MOOD_CHOICES),
+        required=False
+    )
+    recorded_at = serializers.DateTimeField(
+        read_only=True,
+        format=API_DATETIME_FORMAT,
+        default_timezone=dt_timezone.utc
+    )
+
+    class Meta:
+        model = HealthAndCycleFormModel
+        fields = ENTRY_FIELDS
+        extra_kwargs = {
+            'date': {'required': True, 'allow_null': False},
+            'event': {'required': True, 'allow_null': False, 'allow_blank': False},
+        }
+
+
+class HealthEntryRowSerializer(SparseFieldsMixin, serializers.Serializer):
+    """
+    Read-only serializer of the rows returned by ``entry_rows``.
+    """
+    # pylint: disable=abstract-method
+    id = serializers.IntegerField()
+    date = serializers.CharField(source='date_iso')
+    event = serializers.CharField()
+    first_day_of_cycle = serializers.CharField(source='first_day_of_cycle_iso')
+    cycle_length = serializers.IntegerField()
+    period_length = serializers.IntegerField()
+    last_period_start = serializers.CharField(source='last_period_start_iso')
+    average_pain_level = serializers.IntegerField()
+    menstruation_phase_start = serializers.CharField(source='menstruation_phase_start_iso')
+    menstruation_phase_end = serializers.CharField(source='menstruation_phase_end_iso')
+    daily_symptoms = serializers.ListField(child=serializers.CharField())
+    daily_mood = serializers.ListField(child=serializers.CharField())
+    recorded_at = serializers.CharField(source='recorded_at_iso')
+
+
+class HealthProfileSerializer(serializers.ModelSerializer):
+    """
+    Serializer reading and updating the allergies, medications and health condition of a user.
+    """
+    updated_at = serializers.DateTimeField(
+        read_only=True,
+        format=API_DATETIME_FORMAT,
+        default_timezone=dt_timezone.utc
+    )
+
+    class Meta:
+        model = HealthProfile
+        fields = HEALTH_PROFILE_FIELDS + ('updated_at',)
+
+
+class StatisticsSerializer(serializers.Serializer):
+    """
+    Read-only serializer of StatisticsResult: dates on which every symptom, mood and pain level was recorded.
+    """
+    # pylint: disable=abstract-method
+    symptoms = serializers.DictField(child=serializers.ListField(child=serializers.CharField()))
+    moods = serializers.DictField(child=serializers.ListField(child=serializers.CharField()))
+    pain_levels = serializers.DictField(child=serializers.ListField(child=serializers.CharField()))
+
+
+class PredictionSerializer(serializers.Serializer):
+    """
+    Read-only serializer of the cycle prediction of a user.
+    """
+    # pylint: disable=abstract-method
+    cycle_day = serializers.IntegerField(allow_null=True)
+    phase = serializers.CharField(allow_null=True)
+    cycle_length = serializers.IntegerField(allow_null=True)
+    period_length = serializers.IntegerField(allow_null=True)
+    last_period_start = serializers.DateField(allow_null=True)
+    next_period = serializers.DateField(allow_null=True)
+    next_period_earliest = serializers.DateField(allow_null=True)
+    next_period_latest = serializers.DateField(allow_null=True)
+    ovulation_window_start = serializers.DateField(allow_null=True)
+    ovulation_window_end = serializers.DateField(allow_null=True)
+    observed_cycles = serializers.IntegerField()
+    cycle_length_mean = serializers.FloatField(allow_null=True)
+    cycle_length_stddev = serializers.FloatField(allow_null=True)
@@ -0,0 +1,212 @@
+"""
+This module contains the signal handlers keeping data derived from HealthAndCycleFormModel up to date.
+"""
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .cycle_info import refresh_cycle_info
+from .models import HealthAndCycleFormModel, HealthEntryTombstone, UserProfile
+from .normalization import rebuild_cycles, rebuild_normalized, refresh_cycle, save_entry_rows
+from .predictions import record_period, refit_prediction
+from .rollups import rebuild_rollups, refresh_daily_rollup
+from .sync import record_deletion
+from .utils import phase_timeline_cache
+
+# Sent with ``user_profile_ids`` after entries were written in bulk (bulk_create does not send post_save).
+entries_bulk_changed = Signal()
+
+
+def _deleted_on_its_own(origin):
+    """
+    Tell whether an entry was deleted directly rather than together with its profile or user.
+    """
+    return getattr(origin, 'model', type(origin)) is HealthAndCycleFormModel
+
+
+def _mark_data_changed(user_profile_ids, stamped=(HealthAndCycleFormModel, HealthEntryTombstone)):
+    UserProfile.objects.filter(pk__in=user_profile_ids).update(
+        data_version=F('data_version') + 1,
+        data_changed_at=timezone.now()
+    )
+    # Stamped after the bump: it locks the profile row until commit, so writers of the same user commit in the
+    # order of the versions they stamp (see period_app.sync).
+    version = Subquery(UserProfile.objects.filter(pk=OuterRef('user_profile_id')).values('data_version')[:1])
+    for model in stamped:
+        model.objects.filter(user_profile_id__in=user_profile_ids, sync_version__isnull=True).update(
+            sync_version=version
+        )
+
+
+# Stored values of an edited entry that the handlers below compare with the saved ones.
+TRACKED_FIELDS = ('user_profile_id', 'recorded_at', 'menstruation_phase_start', 'menstruation_phase_end',
+                  'cycle_length', 'period_length')
+# Fields the cycle prediction is fitted from.
+PREDICTION_FIELDS = ('user_profile_id', 'menstruation_phase_start', 'menstruation_phase_end', 'cycle_length')
+# Fields merged into the Cycle of the entry's menstruation start.
+CYCLE_FIELDS = PREDICTION_FIELDS + ('period_length',)
+
+
+def current_values(instance):
+    """
+    Return the values of TRACKED_FIELDS the entry was saved with.
+    """
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS}
+
+
+def previous_values(instance):
+    """
+    Return the stored values of TRACKED_FIELDS from before the entry was saved, or None for a new entry.
+    """
+    return getattr(instance, '_previous_values', None)
+
+
+@receiver(pre_save, sender=HealthAndCycleFormModel)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    """
+    Read what an edited entry counted in before the save, so the old day, cycle and profile can be updated too.
+    """
+    instance._previous_values = None
+    # Until bump_data_version stamps it, the change is pending for sync clients.
+    instance.sync_version = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_values = (HealthAndCycleFormModel.objects
+                                 .filter(pk=instance.pk)
+                                 .values(*TRACKED_FIELDS)
+                                 .first())
+
+
+# Connected first: the handlers below read the normalized tables.
+@receiver(post_save, sender=HealthAndCycleFormModel)
+def normalize_entry(sender, instance, created, **kwargs):
+    """
+    Copy the saved entry into its daily log and merge the cycles it reports now and reported before an edit.
+    """
+    save_entry_rows(instance)
+    previous = previous_values(instance)
+    if not created and previous is None:
+        # Loaded from a fixture, the values before the save are unknown.
+        rebuild_cycles([instance.user_profile_id])
+        return
+    current = current_values(instance)
+    if previous and all(previous[field] == current[field] for field in CYCLE_FIELDS):
+        return
+    for values in {(values['user_profile_id'], values['menstruation_phase_start'])
+                   for values in (current, previous) if values and values['menstruation_phase_start']}:
+        refresh_cycle(*values)
+
+
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def normalize_deleted_entry(sender, instance, origin=None, **kwargs):
+    """
+    Merge the cycle again without the deleted entry; its daily log was deleted with it.
+    """
+    if _deleted_on_its_own(origin) and instance.menstruation_phase_start:
+        refresh_cycle(instance.user_profile_id, instance.menstruation_phase_start)
+
+
+@receiver(post_save, sender=HealthAndCycleFormModel)
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def evict_phase_timeline(sender, instance, **kwargs):
+    """
+    Drop the cached phase timelines of the cycles the entry reports now and reported before an edit.
+    """
+    for values in (current_values(instance), previous_values(instance)):
+        if values and values['menstruation_phase_start']:
+            phase_timeline_cache.discard(values['menstruation_phase_start'])
+
+
+@receiver(post_save, sender=HealthAndCycleFormModel)
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def update_daily_rollup(sender, instance, **kwargs):
+    """
+    Recompute the statistics rollup of the day the entry was recorded on, and of the day it was recorded on
+    before an edit moved it to another day or user.
+    """
+    days = set()
+    for values in (current_values(instance), previous_values(instance)):
+        if values and values['recorded_at']:
+            days.add((values['user_profile_id'], timezone.localdate(values['recorded_at'])))
+    for user_profile_id, day in days:
+        refresh_daily_rollup(user_profile_id, day)
+
+
+@receiver(post_save, sender=HealthAndCycleFormModel)
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def update_cycle_info(sender, instance, created=False, **kwargs):
+    """
+    Refresh the cached latest cycle state unless a new entry without cycle data was added.
+    """
+    if created and not instance.menstruation_phase_start:
+        return
+    refresh_cycle_info(instance.user_profile_id)
+
+
+@receiver(post_save, sender=HealthAndCycleFormModel)
+def update_cycle_prediction(sender, instance, created, **kwargs):
+    """
+    Fold a newly logged period into the cycle prediction, refit it after the period of an entry was edited.
+    """
+    if not created:
+        previous = previous_values(instance)
+        if previous is None:
+            refit_prediction(instance.user_profile_id)
+        elif any(previous[field] != getattr(instance, field) for field in PREDICTION_FIELDS):
+            for user_profile_id in {instance.user_profile_id, previous['user_profile_id']}:
+                refit_prediction(user_profile_id)
+    elif instance.menstruation_phase_start:
+        record_period(
+            instance.user_profile_id,
+            instance.menstruation_phase_start,
+            instance.menstruation_phase_end,
+            instance.cycle_length
+        )
+
+
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def refit_cycle_prediction(sender, instance, origin=None, **kwargs):
+    """
+    Refit the cycle prediction after a period was deleted.
+    """
+    if instance.menstruation_phase_start and _deleted_on_its_own(origin):
+        refit_prediction(instance.user_profile_id)
+
+
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def store_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Remember the deleted entry for sync clients, unless it goes away together with its profile.
+    """
+    if _deleted_on_its_own(origin):
+        record_deletion(instance)
+
+
+@receiver(post_save, sender=HealthAndCycleFormModel)
+@receiver(post_delete, sender=HealthAndCycleFormModel)
+def bump_data_version(sender, instance, signal=None, **kwargs):
+    """
+    Mark everything derived from the user's entries (such as stored PDF reports or API ETags) as outdated,
+    including that of the user an edited entry was moved away from, and stamp the change for sync clients.
+    """
+    previous = previous_values(instance)
+    _mark_data_changed(
+        {instance.user_profile_id, previous['user_profile_id'] if previous else None} - {None},
+        stamped=(HealthEntryTombstone,) if signal is post_delete else (HealthAndCycleFormModel,)
+    )
+
+
+@receiver(entries_bulk_changed)
+def refresh_after_bulk_change(sender, user_profile_ids, **kwargs):
+    """
+    Rebuild everything derived from the entries of users whose entries were written in bulk.
+    """
+    user_profile_ids = list(user_profile_ids)
+    rebuild_normalized(user_profile_ids)
+    rebuild_rollups(user_profile_ids)
+    for user_profile_id in user_profile_ids:
+        refresh_cycle_info(user_profile_id)
+        refit_prediction(user_profile_id)
+    _mark_data_changed(user_profile_ids)
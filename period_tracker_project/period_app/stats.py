@@ -0,0 +1,145 @@
+"""
+This module aggregates the symptom, mood and pain statistics shared by the statistics page, the API and the PDF
+export.
+
+The statistics of a window are built in one pass over the DailyStatisticsRollup rows of its days (see
+rollups.py), formatting every date once, into a StatisticsResult that the charts and the PDF consume alike.
+The entries themselves are only read when a day's rollup is refreshed.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import DailyStatisticsRollup
+
+# Preset statistics windows: the number of days ending with today.
+STATISTICS_WINDOWS = {
+    '30d': 30,
+    '90d': 90,
+    '1y': 365,
+}
+DEFAULT_STATISTICS_WINDOW = '1y'
+CUSTOM_STATISTICS_WINDOW = 'custom'
+
+
+def day_start(day) -> datetime:
+    """
+    Returns the aware timestamp at which ``day`` begins in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def timestamp_range(start, end):
+    """
+    Returns the half-open ``[start, end)`` timestamp range covering the days from ``start`` to ``end`` (exclusive).
+
+    Comparing ``recorded_at`` with the two bounds lets PostgreSQL range-scan an index on the column, which a
+    ``recorded_at__date`` lookup prevents by casting every row.
+    """
+    return day_start(start), day_start(end)
+
+
+class StatisticsWindow:
+    """
+    The days ``[start, end)`` the statistics are collected from.
+    """
+    __slots__ = ('name', 'start', 'end')
+
+    def __init__(self, start, end, name=CUSTOM_STATISTICS_WINDOW):
+        if start >= end:
+            raise ValueError("The statistics window must end after it starts.")
+        self.name = name
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def preset(cls, name=DEFAULT_STATISTICS_WINDOW, today=None):
+        """
+        Returns the named preset window ending with today.
+        """
+        if name not in STATISTICS_WINDOWS:
+            raise ValueError(f"Unknown statistics window: {name}")
+        end = (today or timezone.localdate()) + timedelta(days=1)
+        return cls(end - timedelta(days=STATISTICS_WINDOWS[name]), end, name)
+
+    @property
+    def last_day(self):
+        return self.end - timedelta(days=1)
+
+    def timestamp_range(self):
+        return timestamp_range(self.start, self.end)
+
+    def __repr__(self):
+        return f"StatisticsWindow({self.start}, {self.end}, {self.name!r})"
+
+
+def statistics_window(name=None, since=None, until=None, today=None) -> StatisticsWindow:
+    """
+    Returns the window selected by a preset ``name`` or by the ``since`` and ``until`` days (both inclusive).
+
+    Custom windows end with today without ``until`` and span a year without ``since``. Raises ValueError for
+    unknown presets and empty ranges.
+    """
+    if name != CUSTOM_STATISTICS_WINDOW and since is None and until is None:
+        return StatisticsWindow.preset(name or DEFAULT_STATISTICS_WINDOW, today)
+    if name not in (None, '', CUSTOM_STATISTICS_WINDOW):
+        raise ValueError("A preset window cannot be combined with custom dates.")
+    until = until or today or timezone.localdate()
+    if since is None:
+        since = until - timedelta(days=STATISTICS_WINDOWS[DEFAULT_STATISTICS_WINDOW] - 1)
+    return StatisticsWindow(since, until + timedelta(days=1))
+
+
+class StatisticsResult:
+    """
+    Dates (as ``YYYY-MM-DD`` strings) on which every symptom, mood and pain level was recorded.
+    """
+    __slots__ = ('symptoms', 'moods', 'pain_levels')
+
+    def __init__(self):
+        self.symptoms = defaultdict(list)
+        self.moods = defaultdict(list)
+        self.pain_levels = defaultdict(list)
+
+    @staticmethod
+    def _series(data):
+        return {
+            'labels': [str(key) for key in data],
+            'data': [len(dates) for dates in data.values()],
+            'dates': list(data.values())
+        }
+
+    def chart_data(self) -> dict:
+        """
+        Returns the structure consumed by the charts in statistics.html.
+        """
+        return {
+            'symptoms': self._series(self.symptoms),
+            'moods': self._series(self.moods),
+            'pain_levels': self._series(self.pain_levels),
+        }
+
+
+def rollup_statistics(user_profile, window=None) -> StatisticsResult:
+    """
+    Builds the statistics of a user within a StatisticsWindow (the last year by default) from the daily rollups,
+    reading one row per day with entries.
+    """
+    window = window or StatisticsWindow.preset()
+    rows = (DailyStatisticsRollup.objects
+            .filter(user_profile=user_profile, day__gte=window.start, day__lt=window.end)
+            .order_by('day')
+            .values_list('day', 'symptom_counts', 'mood_counts', 'pain_counts'))
+
+    result = StatisticsResult()
+    for day, symptom_counts, mood_counts, pain_counts in rows:
+        date_str = day.isoformat()
+        for symptom, count in symptom_counts.items():
+            result.symptoms[symptom].extend([date_str] * count)
+        for mood, count in mood_counts.items():
+            result.moods[mood].extend([date_str] * count)
+        for pain_level, count in pain_counts.items():
+            result.pain_levels[int(pain_level)].extend([date_str] * count)
+    return result
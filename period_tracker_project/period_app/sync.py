@@ -0,0 +1,112 @@
+"""
+This module implements the incremental sync of cycle entries.
+
+A client keeps the ``token`` of its last sync and sends it back as ``since``. The server answers with the entries
+created or updated after it and the ids of the entries deleted after it (tombstones), so a refresh costs bytes
+proportional to what changed rather than to the whole history.
+
+The cursor is the user's ``data_version`` rather than a timestamp. Every write stamps the changed rows with the
+version it bumped the profile to (``sync_version``), and the bump locks the profile row until the transaction
+commits, so the versions of one user are committed in order however long a writer (a bulk import, a partition
+archive) runs. Rows whose stamp is not committed yet (``sync_version`` is None) are always sent. Clients apply
+changes idempotently, re-sent rows are harmless.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import HealthAndCycleFormModel, HealthEntryTombstone, UserProfile
+
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+class InvalidSyncToken(ValueError):
+    """Raised when a client sends a token the server did not issue."""
+
+
+def make_token(version: int, moment: datetime) -> str:
+    """
+    Encodes a data version and the moment it was read as an opaque sync token.
+    """
+    return f"{version}.{int(moment.timestamp() * 1_000_000)}"
+
+
+def parse_token(token: str) -> tuple[int | None, datetime]:
+    """
+    Decodes a sync token produced by ``make_token`` into its version and moment.
+
+    Tokens issued before sync versions existed hold only the moment, their version is None.
+    """
+    version, _, microseconds = str(token).rpartition('.')
+    try:
+        version = int(version) if version else None
+        microseconds = int(microseconds)
+    except ValueError as e:
+        raise InvalidSyncToken(f"Invalid sync token: {token}") from e
+    if microseconds < 0 or (version is not None and version < 0):
+        raise InvalidSyncToken(f"Invalid sync token: {token}")
+    return version, datetime.fromtimestamp(microseconds / 1_000_000, tz=dt_timezone.utc)
+
+
+class SyncChanges:
+    """
+    Entries changed and ids deleted since a token, plus the token for the next sync.
+
+    ``reset`` means the client must drop its copy and replace it with ``changed``, which then holds every entry
+    (first sync, a token older than the tombstone retention, or one issued before sync versions existed).
+    """
+    __slots__ = ('changed', 'deleted', 'token', 'reset')
+
+    def __init__(self, changed, deleted, token, reset):
+        self.changed = changed
+        self.deleted = deleted
+        self.token = token
+        self.reset = reset
+
+
+def changes_since(user_profile, since=None, now=None) -> SyncChanges:
+    """
+    Returns the entries of a user changed since the ``since`` token (or all of them without a token).
+    """
+    now = now or timezone.now()
+    # Read before the entries: whatever commits in between is sent again by the next sync.
+    version = UserProfile.objects.values_list('data_version', flat=True).get(pk=user_profile.pk)
+    token = make_token(version, now)
+    entries = HealthAndCycleFormModel.objects.filter(user_profile=user_profile)
+    if not since:
+        return SyncChanges(entries, [], token, reset=True)
+
+    since_version, issued_at = parse_token(since)
+    if since_version is None or issued_at < now - TOMBSTONE_RETENTION:
+        return SyncChanges(entries, [], token, reset=True)
+
+    changed = Q(sync_version__gt=since_version) | Q(sync_version__isnull=True)
+    deleted = (HealthEntryTombstone.objects
+               .filter(changed, user_profile=user_profile)
+               .values_list('entry_id', flat=True)
+               .distinct())
+    return SyncChanges(entries.filter(changed), list(deleted), token, reset=False)
+
+
+def record_deletion(entry):
+    """
+    Stores the tombstone of a deleted entry.
+    """
+    return HealthEntryTombstone.objects.create(
+        user_profile_id=entry.user_profile_id,
+        entry_id=entry.pk,
+        deleted_at=timezone.now()
+    )
+
+
+def prune_tombstones(now=None) -> int:
+    """
+    Deletes tombstones older than the retention period and returns how many were removed.
+
+    Clients whose token is older than that get a full reset instead, so no deletion is ever missed.
+    """
+    cutoff = (now or timezone.now()) - TOMBSTONE_RETENTION
+    deleted, _ = HealthEntryTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
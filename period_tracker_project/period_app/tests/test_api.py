@@ -0,0 +1,218 @@
+"""
+This file contains the tests for the JSON API.
+"""
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, HealthProfile
+
+
+def api_url(name, **kwargs):
+    return reverse(name, kwargs={'version': 'v1', **kwargs})
+
+
+@pytest.mark.django_db
+class TestEntryAPI:
+    """
+    Tests for the cycle entry endpoints.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        user_profile = UserProfile.objects.create(user=user)
+        for day in (1, 2, 3):
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user_profile,
+                date=date(2024, 1, day),
+                event=f'Dzień {day}',
+                daily_symptoms=['Ból brzucha'],
+                recorded_at=datetime(2024, 1, day, 8, 30, tzinfo=dt_timezone.utc),
+            )
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    def test_list_pages_and_sparse_fields(self, authenticated_client):
+        """
+        Test that entries are paginated by cursor and limited to the requested fields.
+        """
+        client, _ = authenticated_client
+
+        response = client.get(api_url('api_entries'), {'fields': 'date,recorded_at', 'page_size': 2})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['results'] == [
+            {'date': '2024-01-01', 'recorded_at': '2024-01-01T08:30:00.000000Z'},
+            {'date': '2024-01-02', 'recorded_at': '2024-01-02T08:30:00.000000Z'},
+        ]
+        second_page = client.get(data['next']).json()
+        assert [entry['date'] for entry in second_page['results']] == ['2024-01-03']
+        assert second_page['next'] is None
+
+    def test_unknown_field(self, authenticated_client):
+        """
+        Test that unknown sparse fields are rejected.
+        """
+        client, _ = authenticated_client
+        response = client.get(api_url('api_entries'), {'fields': 'date,user_profile'})
+        assert response.status_code == 400
+
+    def test_conditional_get(self, authenticated_client):
+        """
+        Test that an unchanged list is answered with 304 and a change produces a new ETag.
+        """
+        client, user = authenticated_client
+        first = client.get(api_url('api_entries'))
+        etag = first['ETag']
+
+        assert client.get(api_url('api_entries'), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        HealthAndCycleFormModel.objects.create(user_profile=user.userprofile, date=date(2024, 1, 4), event='Nowy')
+        changed = client.get(api_url('api_entries'), HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert changed['ETag'] != etag
+        assert changed['Last-Modified']
+
+    def test_create_update_and_delete(self, authenticated_client):
+        """
+        Test writing entries through the API with the same validation as the form.
+        """
+        client, user = authenticated_client
+
+        invalid = client.post(
+            api_url('api_entries'),
+            {'date': '2024-02-01', 'event': 'Okres', 'daily_symptoms': ['Katar']},
+            content_type='application/json'
+        )
+        assert invalid.status_code == 400
+
+        created = client.post(
+            api_url('api_entries'),
+            {'date': '2024-02-01', 'event': 'Okres', 'menstruation_phase_start': '2024-02-01',
+             'daily_symptoms': ['Ból głowy'], 'average_pain_level': 3},
+            content_type='application/json'
+        )
+        assert created.status_code == 201
+        entry_id = created.json()['id']
+        assert user.userprofile.cycle_info.menstruation_phase_start == date(2024, 2, 1)
+
+        updated = client.patch(api_url('api_entry', pk=entry_id), {'event': 'Okres 2'}, content_type='application/json')
+        assert updated.json()['event'] == 'Okres 2'
+
+        assert client.delete(api_url('api_entry', pk=entry_id)).status_code == 204
+        assert not HealthAndCycleFormModel.objects.filter(pk=entry_id).exists()
+
+    def test_other_users_entry(self, authenticated_client):
+        """
+        Test that entries of other users are not visible.
+        """
+        client, _ = authenticated_client
+        other = UserProfile.objects.create(user=CustomUser.objects.create_user(username='other', password='x'))
+        entry = HealthAndCycleFormModel.objects.create(user_profile=other, date=date(2024, 1, 1), event='Obcy')
+
+        assert client.get(api_url('api_entry', pk=entry.pk)).status_code == 404
+
+    def test_requires_authentication(self):
+        """
+        Test that anonymous requests are rejected.
+        """
+        assert Client().get(api_url('api_entries')).status_code == 403
+
+    def test_health_profile(self, authenticated_client):
+        """
+        Test that the health profile is read and written once per user, apart from the entries.
+        """
+        client, user = authenticated_client
+        url = api_url('api_health_profile')
+
+        assert client.get(url).json()['allergies'] is None
+        updated = client.patch(url, {'allergies': 'Pyłki'}, content_type='application/json')
+        assert updated.status_code == 200
+        client.patch(url, {'medications': 'Ibuprofen'}, content_type='application/json')
+
+        assert list(HealthProfile.objects.values_list('user_profile_id', 'allergies', 'medications')) == [
+            (user.userprofile.pk, 'Pyłki', 'Ibuprofen')
+        ]
+        assert 'allergies' not in client.get(api_url('api_entries')).json()['results'][0]
+
+
+@pytest.mark.django_db
+class TestStatisticsAndPredictionAPI:
+    """
+    Tests for the statistics and prediction endpoints.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        UserProfile.objects.create(user=user)
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    def test_statistics(self, authenticated_client):
+        """
+        Test that statistics list the dates of every symptom.
+        """
+        client, user = authenticated_client
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user.userprofile,
+            date=date(2024, 1, 1),
+            daily_symptoms=['Ból brzucha'],
+            average_pain_level=5,
+            recorded_at=datetime(2024, 1, 1, tzinfo=dt_timezone.utc),
+        )
+
+        response = client.get(api_url('api_statistics'), {'since': '2023-12-01'})
+
+        assert response.json()['symptoms'] == {'Ból brzucha': ['2024-01-01']}
+        assert response.json()['pain_levels'] == {'5': ['2024-01-01']}
+        assert client.get(api_url('api_statistics'), {'since': 'wczoraj'}).status_code == 400
+        response = client.get(api_url('api_statistics'), {'since': '2023-12-01', 'until': '2023-12-31'})
+        assert response.json()['symptoms'] == {}
+        assert client.get(api_url('api_statistics'), {'window': '30d'}).json()['symptoms'] == {}
+        assert client.get(api_url('api_statistics'), {'window': '2w'}).status_code == 400
+        assert client.get(api_url('api_statistics'), {'until': 'jutro'}).status_code == 400
+
+    def test_predictions(self, authenticated_client):
+        """
+        Test that predictions are empty without cycle data and filled in once there is some.
+        """
+        client, user = authenticated_client
+        assert client.get(api_url('api_predictions')).json()['next_period'] is None
+
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user.userprofile,
+            date=date(2024, 1, 1),
+            menstruation_phase_start=date(2024, 1, 1),
+            menstruation_phase_end=date(2024, 1, 5),
+            cycle_length=28,
+            period_length=5,
+        )
+
+        data = client.get(api_url('api_predictions')).json()
+        assert data['last_period_start'] == '2024-01-01'
+        assert data['cycle_length'] == 28
+        assert date.fromisoformat(data['next_period']) > date.today()
+
+    @pytest.mark.parametrize('url_name', ['api_predictions', 'api_statistics'])
+    def test_date_dependent_views_are_revalidated_the_next_day(self, authenticated_client, monkeypatch, url_name):
+        """
+        Test that the cycle day and rolling windows are not served from a client's copy of yesterday.
+        """
+        client, _ = authenticated_client
+        response = client.get(api_url(url_name))
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified')
+        assert client.get(api_url(url_name), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        monkeypatch.setattr(timezone, 'localdate', lambda *args, **kwargs: tomorrow)
+        response = client.get(api_url(url_name), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
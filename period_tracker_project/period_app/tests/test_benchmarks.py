@@ -0,0 +1,40 @@
+"""
+This file contains the tests for the view benchmark runner.
+"""
+
+import json
+
+import pytest
+
+from period_app.benchmarks import _scenarios, run_benchmarks, seed_user
+from period_app.models import CyclePrediction, HealthAndCycleFormModel
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+    """
+    Tests for seeding benchmark users and measuring the views.
+    """
+    def test_seed_user(self):
+        user = seed_user(60)
+        entries = HealthAndCycleFormModel.objects.filter(user_profile=user.userprofile)
+        assert entries.count() == 60
+        assert entries.filter(menstruation_phase_start__isnull=False).values('menstruation_phase_start') \
+            .distinct().count() == 3
+        assert CyclePrediction.objects.get(user_profile=user.userprofile).cycle_count == 2
+
+    def test_report(self):
+        progress = []
+        report = run_benchmarks(sizes=(1, 30), repeat=1, progress=progress.append)
+
+        assert report['meta']['sizes'] == [1, 30]
+        assert len(report['results']) == 2 * len(_scenarios(None))
+        assert progress == report['results']
+        for result in report['results']:
+            assert result['status'] in (200, 302), result['view']
+            assert result['queries'] > 0
+            assert result['peak_memory_kb'] > 0
+        # The reports are compared between commits, so they must serialize as plain JSON.
+        json.dumps(report)
+        # Every run cleaned up after itself.
+        assert not HealthAndCycleFormModel.objects.filter(event='Benchmark').exists()
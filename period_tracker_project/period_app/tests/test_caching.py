@@ -0,0 +1,74 @@
+"""
+This file contains the tests for the per-user cache of calendar feeds and statistics.
+"""
+
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """
+    Tests for caching keyed by the user's data version.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        cache.clear()
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        UserProfile.objects.create(user=user)
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    @staticmethod
+    def get_calendar(client, **params):
+        return client.get(reverse('calendar'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_calendar_feed_is_cached_until_entries_change(self, authenticated_client, django_assert_num_queries):
+        """
+        Test that a repeated calendar fetch skips the entry query and a saved entry shows up right away.
+        """
+        client, user = authenticated_client
+        HealthAndCycleFormModel.objects.create(user_profile=user.userprofile, date=date(2025, 1, 10), event='Pierwszy')
+        first = self.get_calendar(client, start='2025-01-01', end='2025-02-01')
+
+        # Session and user (joined with the profile) lookups only.
+        with django_assert_num_queries(2):
+            cached = self.get_calendar(client, start='2025-01-01', end='2025-02-01')
+        assert cached.content == first.content
+
+        HealthAndCycleFormModel.objects.create(user_profile=user.userprofile, date=date(2025, 1, 11), event='Drugi')
+        refreshed = self.get_calendar(client, start='2025-01-01', end='2025-02-01')
+        assert [event['title'] for event in refreshed.json()] == ['Pierwszy', 'Drugi']
+
+    def test_windows_are_cached_separately(self, authenticated_client):
+        """
+        Test that different windows do not share a cache entry.
+        """
+        client, user = authenticated_client
+        HealthAndCycleFormModel.objects.create(user_profile=user.userprofile, date=date(2025, 1, 10), event='Styczeń')
+
+        assert len(self.get_calendar(client, start='2025-01-01', end='2025-02-01').json()) == 1
+        assert self.get_calendar(client, start='2025-02-01', end='2025-03-01').json() == []
+
+    def test_statistics_are_invalidated_by_new_entries(self, authenticated_client):
+        """
+        Test that the statistics page reflects an entry saved after it was cached.
+        """
+        client, user = authenticated_client
+        assert client.get(reverse('statistics')).context['chart_data']['symptoms']['labels'] == []
+
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user.userprofile,
+            daily_symptoms=['Ból głowy'],
+            recorded_at=timezone.now()
+        )
+
+        assert client.get(reverse('statistics')).context['chart_data']['symptoms']['labels'] == ['Ból głowy']
@@ -0,0 +1,88 @@
+"""
+This file contains the tests for the cached cycle state.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, StatisticsCycleInfo
+
+
+@pytest.mark.django_db
+class TestStatisticsCycleInfo:
+    """
+    Tests for keeping StatisticsCycleInfo in sync with the entries.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    def test_follows_latest_entry(self, user_profile):
+        """
+        Test that the cached state tracks the entry with the latest menstruation start.
+        """
+        today = timezone.localdate()
+        older = HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=today - timedelta(days=40),
+            cycle_length=30
+        )
+        latest = HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=today - timedelta(days=10),
+            menstruation_phase_end=today - timedelta(days=6),
+            cycle_length=32,
+            period_length=5
+        )
+        HealthAndCycleFormModel.objects.create(user_profile=user_profile, event='No cycle data')
+
+        cycle_info = StatisticsCycleInfo.objects.get(user_profile=user_profile)
+        assert cycle_info.menstruation_phase_start == latest.menstruation_phase_start
+        assert cycle_info.cycle_length == 32
+        assert cycle_info.period_length == 5
+        assert cycle_info.predicted_next_period == today + timedelta(days=22)
+
+        latest.delete()
+        cycle_info.refresh_from_db()
+        assert cycle_info.menstruation_phase_start == older.menstruation_phase_start
+        assert cycle_info.period_length == 6
+
+        older.delete()
+        cycle_info.refresh_from_db()
+        assert cycle_info.menstruation_phase_start is None
+
+    def test_profile_deletion_cascades(self, user_profile):
+        """
+        Test that deleting a profile with entries does not recreate its cached state.
+        """
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=timezone.localdate(),
+            cycle_length=28
+        )
+        user_profile.user.delete()
+        assert not StatisticsCycleInfo.objects.exists()
+
+    def test_home_backfills_missing_state(self, user_profile):
+        """
+        Test that the home page computes the cached state for users without one.
+        """
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=timezone.localdate(),
+            cycle_length=28
+        )
+        StatisticsCycleInfo.objects.all().delete()
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+
+        response = client.get(reverse('home'))
+
+        assert response.status_code == 200
+        assert response.context['cycle_info']['cycle_day'] == 1
+        assert StatisticsCycleInfo.objects.filter(user_profile=user_profile).exists()
@@ -0,0 +1,102 @@
+"""
+This file contains the tests for the streaming export of cycle entries.
+"""
+
+import csv
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from period_app.importers import import_entries, read_rows
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, HealthProfile
+
+
+@pytest.mark.django_db
+class TestExportEntries:
+    """
+    Tests for exporting the raw entry history.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        user_profile = UserProfile.objects.create(user=user)
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            date=date(2024, 1, 2),
+            event='Okres',
+            average_pain_level=4,
+            menstruation_phase_start=date(2024, 1, 2),
+            menstruation_phase_end=date(2024, 1, 6),
+            daily_symptoms=['Ból brzucha', 'Zmęczenie'],
+            daily_mood=['Smutek'],
+        )
+        HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=date(2024, 1, 1), event='Notatka')
+        HealthProfile.objects.create(user_profile=user_profile, allergies='Pyłki')
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    def test_csv_export(self, authenticated_client):
+        """
+        Test that the CSV export streams every entry of the user in date order.
+        """
+        client, _ = authenticated_client
+        other = CustomUser.objects.create_user(username='other', password='testpassword123')
+        HealthAndCycleFormModel.objects.create(user_profile=UserProfile.objects.create(user=other), event='Obcy')
+
+        response = client.get(reverse('export_entries'), {'format': 'csv'})
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        assert [row['event'] for row in rows] == ['Notatka', 'Okres']
+        assert rows[1]['daily_symptoms'] == 'Ból brzucha;Zmęczenie'
+        assert rows[1]['menstruation_phase_start'] == '2024-01-02'
+        assert rows[0]['average_pain_level'] == ''
+        assert [row['allergies'] for row in rows] == ['Pyłki', 'Pyłki']
+
+    def test_ndjson_export(self, authenticated_client):
+        """
+        Test that the NDJSON export writes one JSON object per line.
+        """
+        client, _ = authenticated_client
+
+        response = client.get(reverse('export_entries'), {'format': 'ndjson'})
+
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        entries = [json.loads(line) for line in lines]
+        assert entries[1]['daily_mood'] == ['Smutek']
+        assert entries[1]['date'] == '2024-01-02'
+
+    def test_unknown_format(self, authenticated_client):
+        """
+        Test that an unsupported format is rejected.
+        """
+        client, _ = authenticated_client
+        response = client.get(reverse('export_entries'), {'format': 'xml'})
+        assert response.status_code == 400
+
+    def test_export_command_round_trip(self, authenticated_client):
+        """
+        Test that a dump written by the command can be imported again.
+        """
+        _, user = authenticated_client
+        out = StringIO()
+
+        call_command('export_cycles', 'testuser', '--chunk-size', '1', stdout=out)
+
+        target = UserProfile.objects.create(user=CustomUser.objects.create_user(username='copy', password='x'))
+        result = import_entries(target, read_rows(StringIO(out.getvalue()), 'csv'))
+        assert result.errors == []
+        assert result.created == 2
+        copied = HealthAndCycleFormModel.objects.get(user_profile=target, event='Okres')
+        original = HealthAndCycleFormModel.objects.get(user_profile__user=user, event='Okres')
+        assert copied.daily_symptoms == original.daily_symptoms
+        assert copied.menstruation_phase_end == original.menstruation_phase_end
+        assert HealthProfile.objects.get(user_profile=target).allergies == 'Pyłki'
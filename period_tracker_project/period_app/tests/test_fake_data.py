@@ -0,0 +1,107 @@
+"""
+This file contains the tests for the synthetic cycle history generator.
+"""
+
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from period_app.fake_data import MAX_FAKE_CYCLE_LENGTH, MIN_FAKE_CYCLE_LENGTH, fake_entries, user_rng
+from period_app.models import (
+    CustomUser,
+    CyclePrediction,
+    DailyStatisticsRollup,
+    HealthAndCycleFormModel,
+    StatisticsCycleInfo,
+    UserProfile,
+)
+
+TODAY = date(2024, 6, 30)
+
+
+def _history(seed):
+    return [
+        (entry.date, entry.menstruation_phase_start, entry.daily_symptoms, entry.daily_mood, entry.average_pain_level)
+        for entry in fake_entries(None, user_rng(seed, 1), date(2022, 1, 1), TODAY)
+    ]
+
+
+class TestFakeEntries:
+    """
+    Tests for the generated histories.
+    """
+    def test_deterministic(self):
+        assert _history(7) == _history(7)
+        assert _history(7) != _history(8)
+
+    def test_plausible_history(self):
+        entries = list(fake_entries(None, user_rng(0, 1), date(2022, 1, 1), TODAY))
+        dates = [entry.date for entry in entries]
+        assert dates == sorted(dates)
+        assert len(set(dates)) == len(dates)
+        assert date(2022, 1, 1) <= dates[0] and dates[-1] <= TODAY
+
+        starts = [entry.menstruation_phase_start for entry in entries if entry.menstruation_phase_start]
+        gaps = [(later - earlier).days for earlier, later in zip(starts, starts[1:])]
+        assert len(starts) > 20
+        assert all(MIN_FAKE_CYCLE_LENGTH <= gap <= MAX_FAKE_CYCLE_LENGTH for gap in gaps)
+        assert len(set(gaps)) > 1
+
+        symptoms = {symptom for entry in entries for symptom in entry.daily_symptoms}
+        moods = {mood for entry in entries for mood in entry.daily_mood}
+        assert symptoms <= {choice for choice, _ in HealthAndCycleFormModel.SYMPTOM_CHOICES}
+        assert moods <= {choice for choice, _ in HealthAndCycleFormModel.MOOD_CHOICES}
+        assert all(entry.average_pain_level in (None, *range(1, 11)) for entry in entries)
+
+
+@pytest.mark.django_db
+class TestGenerateFakeCyclesCommand:
+    """
+    Tests for the generate_fake_cycles management command.
+    """
+    def test_generates_users_and_derived_data(self):
+        out = StringIO()
+        call_command('generate_fake_cycles', '5', '--years', '1', '--users-per-transaction', '2',
+                     '--batch-size', '100', '--workers', '0', '--today', TODAY.isoformat(), stdout=out)
+
+        assert UserProfile.objects.count() == 5
+        assert HealthAndCycleFormModel.objects.count() > 5 * 150
+        assert CyclePrediction.objects.filter(cycle_count__gt=5).count() == 5
+        assert StatisticsCycleInfo.objects.count() == 5
+        assert DailyStatisticsRollup.objects.exists()
+        assert not UserProfile.objects.filter(data_version=0).exists()
+        assert not CustomUser.objects.get(username='fake_user_0000001').has_usable_password()
+        assert 'Generated 5 users' in out.getvalue()
+
+    def test_same_seed_same_data(self):
+        call_command('generate_fake_cycles', '2', '--years', '1', '--seed', '3', '--workers', '0', '--today', TODAY.isoformat(),
+                     stdout=StringIO())
+        call_command('generate_fake_cycles', '2', '--years', '1', '--seed', '3', '--workers', '0', '--today', TODAY.isoformat(),
+                     '--username-prefix', 'again_', stdout=StringIO())
+
+        def rows(prefix):
+            return list(HealthAndCycleFormModel.objects
+                        .filter(user_profile__user__username__startswith=prefix)
+                        .order_by('user_profile__user__username', 'date')
+                        .values_list('date', 'daily_symptoms', 'daily_mood', 'average_pain_level', 'recorded_at'))
+
+        assert rows('fake_user_') == rows('again_')
+
+    def test_existing_prefix(self):
+        call_command('generate_fake_cycles', '1', '--years', '0.1', '--workers', '0', stdout=StringIO())
+        with pytest.raises(CommandError):
+            call_command('generate_fake_cycles', '1', stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generate_in_worker_processes():
+    call_command('generate_fake_cycles', '4', '--years', '0.5', '--users-per-transaction', '1', '--workers', '2',
+                 '--today', TODAY.isoformat(), stdout=StringIO())
+
+    assert UserProfile.objects.count() == 4
+    assert CyclePrediction.objects.count() == 4
+    assert set(HealthAndCycleFormModel.objects.values_list('user_profile_id', flat=True)) == \
+        set(UserProfile.objects.values_list('pk', flat=True))
@@ -0,0 +1,109 @@
+"""
+This file contains the tests for the bulk import of cycle entries.
+"""
+
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, DailyStatisticsRollup
+
+CSV_DATA = """date,event,daily_symptoms,daily_mood,average_pain_level,cycle_length,menstruation_phase_start,menstruation_phase_end
+2024-01-01,Okres,Ból brzucha;Zmęczenie,Smutek,4,28,2024-01-01,2024-01-05
+2024-01-02,Okres,Ból brzucha,,3,28,2024-01-01,2024-01-05
+,Bez daty,,,,,,
+2024-01-03,Zły objaw,Katar,,,,,
+"""
+
+
+@pytest.mark.django_db
+class TestBulkImport:
+    """
+    Tests for importing entries from files.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        UserProfile.objects.create(user=user)
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    def test_csv_upload(self, authenticated_client):
+        """
+        Test that valid rows are imported and invalid rows reported with their numbers.
+        """
+        client, user = authenticated_client
+        upload = SimpleUploadedFile('history.csv', CSV_DATA.encode('utf-8'), content_type='text/csv')
+
+        response = client.post(reverse('bulk_import'), {'file': upload})
+
+        assert response.status_code == 200
+        result = response.context['result']
+        assert result.created == 2
+        assert [row_number for row_number, _ in result.errors] == [3, 4]
+        assert 'date' in result.errors[0][1]
+        assert 'daily_symptoms' in result.errors[1][1]
+
+        entries = HealthAndCycleFormModel.objects.filter(user_profile__user=user).order_by('date')
+        assert entries[0].daily_symptoms == ['Ból brzucha', 'Zmęczenie']
+        assert entries[0].recorded_at.date().isoformat() == '2024-01-01'
+        assert DailyStatisticsRollup.objects.filter(user_profile__user=user).count() == 2
+        assert user.userprofile.cycle_info.menstruation_phase_start.isoformat() == '2024-01-01'
+
+    def test_strict_upload_imports_nothing(self, authenticated_client):
+        """
+        Test that a strict import is rolled back when any row is invalid.
+        """
+        client, _ = authenticated_client
+        upload = SimpleUploadedFile('history.csv', CSV_DATA.encode('utf-8'), content_type='text/csv')
+
+        response = client.post(reverse('bulk_import'), {'file': upload, 'strict': 'on'})
+
+        assert response.context['result'].created == 0
+        assert not HealthAndCycleFormModel.objects.exists()
+
+    def test_impossible_recorded_at_is_a_row_error(self, authenticated_client):
+        """
+        Test that a well-formed but impossible recorded_at is reported for its row instead of failing the import.
+        """
+        client, _ = authenticated_client
+        rows = [
+            {'date': '2025-02-27', 'event': 'Wpis', 'recorded_at': '2025-02-30 10:00'},
+            {'date': '2025-02-28', 'event': 'Wpis', 'recorded_at': '2025-02-28 10:00'},
+        ]
+        upload = SimpleUploadedFile('history.json', json.dumps(rows).encode('utf-8'), content_type='application/json')
+
+        response = client.post(reverse('bulk_import'), {'file': upload})
+
+        result = response.context['result']
+        assert result.created == 1
+        assert result.errors == [(1, {'recorded_at': ['Enter a valid date and time.']})]
+
+    def test_invalid_json_upload(self, authenticated_client):
+        """
+        Test that an unparsable file is reported as a form error.
+        """
+        client, _ = authenticated_client
+        upload = SimpleUploadedFile('history.json', b'{not json', content_type='application/json')
+
+        response = client.post(reverse('bulk_import'), {'file': upload})
+
+        assert response.context['form'].errors['file']
+
+    def test_import_cycles_command(self, authenticated_client, tmp_path):
+        """
+        Test importing a JSON file with the management command in small batches.
+        """
+        path = tmp_path / 'history.json'
+        path.write_text(json.dumps([
+            {'date': f'2024-02-{day:02d}', 'event': 'Wpis', 'daily_mood': ['Radość']} for day in range(1, 8)
+        ]), encoding='utf-8')
+
+        call_command('import_cycles', 'testuser', str(path), '--batch-size', '3')
+
+        assert HealthAndCycleFormModel.objects.count() == 7
@@ -0,0 +1,169 @@
+"""
+This file contains the tests for the background PDF report jobs.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.jobs import enqueue_report, find_report, run_report_job, store_report
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, StatisticsReportJob
+from period_app.stats import StatisticsWindow
+
+
+@pytest.mark.django_db
+class TestStatisticsReportJobs:
+    """
+    Tests for queueing, generating and serving PDF reports.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        user_profile = UserProfile.objects.create(user=user)
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            date=timezone.now().date(),
+            daily_symptoms=['Ból głowy'],
+            average_pain_level=3,
+            recorded_at=timezone.now()
+        )
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    def test_job_lifecycle(self, authenticated_client, django_capture_on_commit_callbacks):
+        """
+        Test queueing a report, generating it and downloading the stored PDF.
+        """
+        client, user = authenticated_client
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(reverse('export_statistics_pdf_jobs'))
+        assert response.status_code == 202
+        job_data = response.json()
+        assert job_data['status'] == StatisticsReportJob.STATUS_PENDING
+        assert len(callbacks) == 1
+
+        run_report_job(job_data['id'])
+
+        status = client.get(job_data['status_url']).json()
+        assert status['status'] == StatisticsReportJob.STATUS_DONE
+        download = client.get(status['download_url'])
+        assert download.status_code == 200
+        assert download['Content-Type'] == 'application/pdf'
+        assert b''.join(download.streaming_content).startswith(b'%PDF')
+
+        assert client.post(reverse('export_statistics_pdf_jobs')).json()['id'] == job_data['id']
+
+    def test_new_data_invalidates_report(self, authenticated_client):
+        """
+        Test that saving an entry makes the next request generate a new report.
+        """
+        _, user = authenticated_client
+        user_profile = UserProfile.objects.get(user=user)
+        first = enqueue_report(user_profile, background=False)
+
+        HealthAndCycleFormModel.objects.create(user_profile=user_profile, recorded_at=timezone.now())
+        user_profile.refresh_from_db()
+
+        assert enqueue_report(user_profile, background=False).pk != first.pk
+
+    def test_sync_export_reuses_stored_report(self, authenticated_client):
+        """
+        Test that repeated synchronous downloads are served from the stored artifact.
+        """
+        client, _ = authenticated_client
+        first = client.get(reverse('export_statistics_pdf'))
+        second = client.get(reverse('export_statistics_pdf'))
+        assert b''.join(first.streaming_content) == b''.join(second.streaming_content)
+        assert StatisticsReportJob.objects.filter(status=StatisticsReportJob.STATUS_DONE).count() == 1
+
+    def test_report_of_an_earlier_window_is_not_served(self, authenticated_client):
+        """
+        Test that a report stored for yesterday's rolling window is not reused today, although no data changed.
+        """
+        _, user = authenticated_client
+        user_profile = UserProfile.objects.get(user=user)
+        today = timezone.localdate()
+        yesterday_window = StatisticsWindow.preset(today=today - timedelta(days=1))
+        store_report(user_profile, b'%PDF-yesterday', yesterday_window)
+
+        assert find_report(user_profile, yesterday_window) is not None
+        assert find_report(user_profile, StatisticsWindow.preset(today=today)) is None
+        assert enqueue_report(user_profile, background=False).window_end == today + timedelta(days=1)
+
+    def test_store_report_deletes_older_versions(self, authenticated_client):
+        """
+        Test that storing a report drops the stored PDFs of older data versions.
+        """
+        _, user = authenticated_client
+        user_profile = UserProfile.objects.get(user=user)
+        window = StatisticsWindow.preset()
+        store_report(user_profile, b'%PDF-old', window)
+
+        HealthAndCycleFormModel.objects.create(user_profile=user_profile, recorded_at=timezone.now())
+        user_profile.refresh_from_db()
+        newest = store_report(user_profile, b'%PDF-new', window)
+
+        assert list(StatisticsReportJob.objects.filter(user_profile=user_profile)) == [newest]
+
+    def test_worker_command(self, authenticated_client):
+        """
+        Test that the worker command drains pending jobs.
+        """
+        _, user = authenticated_client
+        job = enqueue_report(UserProfile.objects.get(user=user), background=False)
+
+        call_command('run_report_worker', '--once')
+
+        job.refresh_from_db()
+        assert job.status == StatisticsReportJob.STATUS_DONE
+        assert bytes(job.pdf).startswith(b'%PDF')
+
+    def test_job_abandoned_by_a_dead_worker_is_requeued(self, authenticated_client, settings,
+                                                       django_capture_on_commit_callbacks):
+        """
+        Test that a job left running past REPORT_JOB_TIMEOUT is queued again instead of being polled forever.
+        """
+        client, user = authenticated_client
+        settings.REPORT_JOB_TIMEOUT = 60
+        user_profile = UserProfile.objects.get(user=user)
+        job = enqueue_report(user_profile, background=False)
+        StatisticsReportJob.objects.filter(pk=job.pk).update(
+            status=StatisticsReportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(seconds=30)
+        )
+        status_url = reverse('export_statistics_pdf_job', args=[job.pk])
+        assert client.get(status_url).json()['status'] == StatisticsReportJob.STATUS_RUNNING
+        assert enqueue_report(user_profile, background=False).status == StatisticsReportJob.STATUS_RUNNING
+
+        StatisticsReportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(seconds=90))
+        with django_capture_on_commit_callbacks() as callbacks:
+            assert client.get(status_url).json()['status'] == StatisticsReportJob.STATUS_PENDING
+        assert len(callbacks) == 1
+
+        StatisticsReportJob.objects.filter(pk=job.pk).update(
+            status=StatisticsReportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(seconds=90)
+        )
+        call_command('run_report_worker', '--once')
+        job.refresh_from_db()
+        assert job.status == StatisticsReportJob.STATUS_DONE
+
+        StatisticsReportJob.objects.filter(pk=job.pk).update(
+            status=StatisticsReportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(seconds=90)
+        )
+        resumed = enqueue_report(user_profile, background=False)
+        assert (resumed.pk, resumed.status) == (job.pk, StatisticsReportJob.STATUS_PENDING)
+
+    def test_other_users_job_is_hidden(self, authenticated_client):
+        """
+        Test that a user cannot poll or download another user's report.
+        """
+        client, _ = authenticated_client
+        other = CustomUser.objects.create_user(username='other', password='testpassword123')
+        job = enqueue_report(UserProfile.objects.create(user=other), background=False)
+
+        assert client.get(reverse('export_statistics_pdf_job', args=[job.pk])).status_code == 404
+        assert client.get(reverse('export_statistics_pdf_job_download', args=[job.pk])).status_code == 404
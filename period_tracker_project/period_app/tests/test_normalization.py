@@ -0,0 +1,164 @@
+"""
+This file contains the tests for the normalized copies of the entries.
+"""
+
+import importlib
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from period_app.models import Cycle, CustomUser, DailyLog, HealthAndCycleFormModel, HealthProfile, UserProfile
+from period_app.normalization import rebuild_normalized, save_health_profile
+from period_app.signals import entries_bulk_changed
+
+backfill_migration = importlib.import_module('period_app.migrations.0010_normalized_entries')
+# Tables whose backfill no longer applies: CalendarEvent was dropped, and HealthProfile was filled again by 0017
+# from entry columns removed since.
+DROPPED_TABLES = ('period_app_calendarevent', 'period_app_healthprofile')
+
+
+def _snapshot(user_profile):
+    return {
+        'logs': list(DailyLog.objects.filter(user_profile=user_profile).order_by('entry_id').values_list(
+            'entry_id', 'date', 'recorded_at', 'daily_symptoms', 'daily_mood', 'average_pain_level')),
+        'cycles': list(Cycle.objects.filter(user_profile=user_profile).order_by('start_date').values_list(
+            'start_date', 'end_date', 'cycle_length', 'period_length')),
+    }
+
+
+@pytest.mark.django_db
+class TestNormalizedEntries:
+    """
+    Tests for keeping Cycle and DailyLog in step with the entries, and for the HealthProfile.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    @staticmethod
+    def _entry(user_profile, day, **fields):
+        return HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            date=day,
+            event=fields.pop('event', 'Wpis'),
+            recorded_at=timezone.make_aware(datetime.combine(day, datetime.min.time())),
+            **fields
+        )
+
+    def _history(self, user_profile):
+        self._entry(user_profile, date(2024, 1, 1), menstruation_phase_start=date(2024, 1, 1),
+                    menstruation_phase_end=date(2024, 1, 4), cycle_length=28, period_length=4,
+                    daily_symptoms=['Ból brzucha'], average_pain_level=6)
+        self._entry(user_profile, date(2024, 1, 3), menstruation_phase_start=date(2024, 1, 1),
+                    menstruation_phase_end=date(2024, 1, 5), period_length=5, daily_mood=['Smutek'])
+        self._entry(user_profile, date(2024, 1, 29), menstruation_phase_start=date(2024, 1, 29))
+        self._entry(user_profile, date(2024, 2, 2), event='Lekarz')
+
+    def test_entries_are_split(self, user_profile):
+        self._history(user_profile)
+
+        assert DailyLog.objects.filter(user_profile=user_profile).count() == 4
+        assert list(Cycle.objects.filter(user_profile=user_profile).order_by('start_date').values_list(
+            'start_date', 'end_date', 'cycle_length', 'period_length')) == [
+            (date(2024, 1, 1), date(2024, 1, 5), 28, 5),
+            (date(2024, 1, 29), None, None, None),
+        ]
+
+    def test_edits_and_deletes(self, user_profile):
+        self._history(user_profile)
+        latest = HealthAndCycleFormModel.objects.get(user_profile=user_profile, event='Lekarz')
+        latest.date = date(2024, 2, 3)
+        latest.save()
+        moved = HealthAndCycleFormModel.objects.get(
+            user_profile=user_profile,
+            menstruation_phase_start=date(2024, 1, 29)
+        )
+        moved.menstruation_phase_start = date(2024, 1, 30)
+        moved.save()
+
+        assert DailyLog.objects.get(entry=latest).date == date(2024, 2, 3)
+        assert list(Cycle.objects.filter(user_profile=user_profile).values_list('start_date', flat=True)
+                    .order_by('start_date')) == [date(2024, 1, 1), date(2024, 1, 30)]
+
+        moved.delete()
+        HealthAndCycleFormModel.objects.filter(user_profile=user_profile, date=date(2024, 1, 1)).delete()
+
+        assert not DailyLog.objects.filter(entry_id=moved.pk).exists()
+        assert list(Cycle.objects.filter(user_profile=user_profile).values_list('start_date', 'end_date')) == [
+            (date(2024, 1, 1), date(2024, 1, 5))
+        ]
+
+    def test_edits_update_only_their_cycles(self, user_profile):
+        self._history(user_profile)
+        entry = HealthAndCycleFormModel.objects.get(user_profile=user_profile, event='Lekarz')
+        entry.daily_symptoms = ['Zmęczenie']
+        with CaptureQueriesContext(connection) as queries:
+            entry.save()
+        assert not [query for query in queries if 'period_app_cycle' in query['sql']]
+
+        entry = HealthAndCycleFormModel.objects.get(user_profile=user_profile,
+                                                    menstruation_phase_start=date(2024, 1, 29))
+        entry.menstruation_phase_end = date(2024, 2, 1)
+        with CaptureQueriesContext(connection) as queries:
+            entry.save()
+        # Only the edited cycle is merged again, not the whole history.
+        merges = [query['sql'] for query in queries if 'GROUP BY' in query['sql']]
+        assert merges and all("'2024-01-29'::date" in sql for sql in merges)
+        assert Cycle.objects.get(user_profile=user_profile, start_date=date(2024, 1, 29)).end_date == date(2024, 2, 1)
+
+    def test_moving_an_entry_to_another_user(self, user_profile):
+        self._history(user_profile)
+        other = UserProfile.objects.create(user=CustomUser.objects.create_user(username='other', password='x'))
+        entry = HealthAndCycleFormModel.objects.get(user_profile=user_profile,
+                                                    menstruation_phase_start=date(2024, 1, 29))
+
+        entry.user_profile = other
+        entry.save()
+
+        assert DailyLog.objects.get(entry=entry).user_profile_id == other.pk
+        assert list(Cycle.objects.filter(user_profile=user_profile).values_list('start_date', flat=True)) == [
+            date(2024, 1, 1)
+        ]
+        assert list(Cycle.objects.filter(user_profile=other).values_list('start_date', flat=True)) == [
+            date(2024, 1, 29)
+        ]
+
+    def test_bulk_rebuild_matches_incremental_updates(self, user_profile):
+        self._history(user_profile)
+        expected = _snapshot(user_profile)
+
+        DailyLog.objects.all().delete()
+        Cycle.objects.all().delete()
+        entries_bulk_changed.send(sender=HealthAndCycleFormModel, user_profile_ids=[user_profile.pk])
+        assert _snapshot(user_profile) == expected
+
+        rebuild_normalized([user_profile.pk])
+        assert _snapshot(user_profile) == expected
+
+    def test_migration_backfill_matches_incremental_updates(self, user_profile):
+        self._history(user_profile)
+        expected = _snapshot(user_profile)
+
+        for model in (DailyLog, Cycle):
+            model.objects.all().delete()
+        with connection.cursor() as cursor:
+            for statement in backfill_migration.BACKFILL_SQL:
+                if not any(table in statement for table in DROPPED_TABLES):
+                    cursor.execute(statement)
+        assert _snapshot(user_profile) == expected
+
+    def test_health_profile_is_stored_once_per_user(self, user_profile):
+        save_health_profile(user_profile.pk, {'allergies': 'Pyłki', 'medications': 'Ibuprofen'})
+        save_health_profile(user_profile.pk, {'allergies': 'Pyłki, orzechy', 'health_condition': ''})
+        save_health_profile(user_profile.pk, {})
+
+        assert list(HealthProfile.objects.values_list(
+            'user_profile_id', 'allergies', 'medications', 'health_condition'
+        )) == [(user_profile.pk, 'Pyłki, orzechy', 'Ibuprofen', '')]
+        assert not {'allergies', 'medications', 'health_condition'} & {
+            field.name for field in HealthAndCycleFormModel._meta.get_fields()
+        }
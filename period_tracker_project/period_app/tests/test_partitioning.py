@@ -0,0 +1,213 @@
+"""
+This file contains the tests for the optional date partitioning of the entry table.
+"""
+
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+
+from period_app.models import CustomUser, DailyLog, HealthAndCycleFormModel, HealthEntryTombstone, UserProfile
+from period_app.partitioning import (
+    archive_partitions,
+    create_partitions,
+    existing_partitions,
+    is_partitioned,
+    next_interval_start,
+    partition_default_rows,
+    partition_table,
+    unpartition_table,
+)
+
+TABLE = HealthAndCycleFormModel._meta.db_table
+TODAY = date(2025, 6, 30)
+
+
+def partition_of(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT tableoid::regclass::text FROM {TABLE} WHERE id = %s', [entry.pk])
+        return cursor.fetchone()[0]
+
+
+def scanned_relations(queryset):
+    def relations(plan):
+        if 'Relation Name' in plan:
+            yield plan['Relation Name']
+        for child in plan.get('Plans', ()):
+            yield from relations(child)
+
+    plan = json.loads(queryset.explain(format='json'))
+    return set(relations(plan[0]['Plan']))
+
+
+def foreign_keys_to_entries():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT conrelid::regclass::text FROM pg_constraint WHERE confrelid = %s::regclass", [TABLE])
+        return {row[0] for row in cursor.fetchall()}
+
+
+def primary_key_columns():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, TABLE)
+    return [constraint['columns'] for constraint in constraints.values() if constraint['primary_key']]
+
+
+class TestPartitionIntervals:
+    """
+    Tests for the partition bounds.
+    """
+    @pytest.mark.parametrize('start, interval, expected', [
+        (date(2025, 1, 1), 'year', date(2026, 1, 1)),
+        (date(2025, 6, 1), 'month', date(2025, 7, 1)),
+        (date(2025, 12, 1), 'month', date(2026, 1, 1)),
+    ])
+    def test_next_interval_start(self, start, interval, expected):
+        assert next_interval_start(start, interval) == expected
+
+
+@pytest.mark.django_db
+class TestEntryPartitioning:
+    """
+    Tests for converting the entry table and maintaining its partitions.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    @pytest.fixture
+    def entries(self, user_profile):
+        return [
+            HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=day, event=f'Wpis {number}')
+            for number, day in enumerate([date(2023, 3, 1), date(2025, 6, 1), date(2025, 6, 15), date(2025, 7, 2)])
+        ]
+
+    def test_partition_table_keeps_entries_and_routes_new_ones(self, user_profile, entries):
+        last_id = max(entry.pk for entry in entries)
+        entries[-2].delete()
+
+        partition_table('year', today=TODAY, ahead=1)
+
+        assert is_partitioned()
+        partitions, interval = existing_partitions()
+        assert interval == 'year'
+        assert sorted(partitions) == [date(2023, 1, 1), date(2024, 1, 1), date(2025, 1, 1), date(2026, 1, 1)]
+        assert list(HealthAndCycleFormModel.objects.order_by('id').values_list('event', flat=True)) == [
+            'Wpis 0', 'Wpis 1', 'Wpis 3'
+        ]
+        assert partition_of(entries[0]) == f'{TABLE}_p2023'
+        assert primary_key_columns() == [['id', 'date']]
+
+        entry = HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=date(2025, 7, 1))
+        # Ids of deleted entries are not reused.
+        assert entry.pk == last_id + 1
+        assert partition_of(entry) == f'{TABLE}_p2025'
+        assert DailyLog.objects.filter(entry=entry).exists()
+
+    def test_undated_entries_block_the_conversion(self, user_profile, entries):
+        HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=None)
+
+        with pytest.raises(ValueError, match='no date'):
+            partition_table('year', today=TODAY)
+        assert not is_partitioned()
+
+    def test_daily_logs_keep_their_foreign_key(self, entries):
+        partition_table('year', today=TODAY)
+        assert foreign_keys_to_entries() == {'period_app_dailylog'}
+
+        # Moving an entry to another partition carries its daily log along.
+        entry = HealthAndCycleFormModel.objects.get(pk=entries[1].pk)
+        entry.date = date(2023, 5, 1)
+        entry.save()
+        assert partition_of(entry) == f'{TABLE}_p2023'
+        assert DailyLog.objects.get(entry=entry).date == date(2023, 5, 1)
+
+        entry.delete()
+        assert not DailyLog.objects.filter(entry_id=entries[1].pk).exists()
+        with pytest.raises(IntegrityError), transaction.atomic():
+            DailyLog.objects.create(entry_id=entries[1].pk, user_profile_id=entries[0].user_profile_id,
+                                    date=date(2025, 6, 1))
+
+    def test_date_window_is_pruned_to_its_partition(self, user_profile, entries):
+        partition_table('month', today=TODAY)
+
+        queryset = HealthAndCycleFormModel.objects.filter(
+            user_profile=user_profile, date__gte=date(2025, 6, 2), date__lt=date(2025, 6, 30)
+        )
+        assert scanned_relations(queryset) == {f'{TABLE}_p2025_06'}
+        assert list(queryset.values_list('event', flat=True)) == ['Wpis 2']
+
+    def test_new_partition_takes_over_rows_of_the_default_partition(self, user_profile, entries):
+        partition_table('month', today=TODAY, ahead=0)
+        entry = HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=date(2030, 1, 5))
+        assert partition_of(entry) == f'{TABLE}_default'
+
+        assert create_partitions(date(2030, 1, 1), date(2030, 1, 31)) == [f'{TABLE}_p2030_01']
+        assert partition_of(entry) == f'{TABLE}_p2030_01'
+        assert create_partitions(date(2030, 1, 1), date(2030, 1, 31)) == []
+
+    def test_partition_default_rows(self, user_profile, entries):
+        partition_table('year', today=TODAY, ahead=0)
+        imported = HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=date(2020, 5, 1))
+        assert partition_of(imported) == f'{TABLE}_default'
+
+        assert partition_default_rows() == [f'{TABLE}_p2020']
+        assert partition_of(imported) == f'{TABLE}_p2020'
+        assert partition_default_rows() == []
+
+    def test_archive_partitions(self, user_profile, entries):
+        partition_table('year', today=TODAY)
+        data_version = UserProfile.objects.get(pk=user_profile.pk).data_version
+
+        assert archive_partitions(date(2025, 1, 1)) == [f'archived_{TABLE}_p2023', f'archived_{TABLE}_p2024']
+
+        assert sorted(existing_partitions()[0]) == [date(2025, 1, 1), date(2026, 1, 1), date(2027, 1, 1)]
+        assert not HealthAndCycleFormModel.objects.filter(pk=entries[0].pk).exists()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT event FROM archived_{TABLE}_p2023')
+            assert cursor.fetchall() == [('Wpis 0',)]
+        # Archived entries leave like deleted ones.
+        assert list(HealthEntryTombstone.objects.values_list('user_profile_id', 'entry_id')) == [
+            (user_profile.pk, entries[0].pk)
+        ]
+        assert list(DailyLog.objects.order_by('entry_id').values_list('entry_id', flat=True)) == [
+            entry.pk for entry in entries[1:]
+        ]
+        assert UserProfile.objects.get(pk=user_profile.pk).data_version > data_version
+
+    def test_unpartition_table_restores_primary_and_foreign_keys(self, user_profile, entries):
+        partition_table('year', today=TODAY)
+        last_id = HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=TODAY).pk
+
+        unpartition_table()
+
+        assert not is_partitioned()
+        assert foreign_keys_to_entries() == {'period_app_dailylog'}
+        assert HealthAndCycleFormModel.objects.count() == 5
+        assert HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=TODAY).pk == last_id + 1
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, TABLE)
+        assert any(constraint['primary_key'] for constraint in constraints.values())
+        assert 'healthform_profile_date_idx' in constraints
+
+    def test_manage_entry_partitions_command(self, entries):
+        # Migrations leave the table alone, partitioning is opted into with the command.
+        assert not is_partitioned()
+        with pytest.raises(CommandError, match='--partition'):
+            call_command('manage_entry_partitions', stdout=StringIO())
+        output = StringIO()
+
+        call_command('manage_entry_partitions', '--partition', 'year', '--ahead', '3',
+                     '--archive-before', '2024-01-01', stdout=output)
+
+        assert is_partitioned()
+        assert f'archived_{TABLE}_p2023' in output.getvalue()
+        assert max(existing_partitions()[0]).year >= date.today().year + 3
+        with pytest.raises(CommandError, match='already partitioned by year'):
+            call_command('manage_entry_partitions', '--partition', 'month', stdout=StringIO())
+
+        call_command('manage_entry_partitions', '--unpartition', stdout=StringIO())
+        assert not is_partitioned()
@@ -0,0 +1,262 @@
+"""
+This file contains the tests for the cycle prediction engine.
+"""
+
+import statistics
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from period_app.models import CustomUser, CyclePrediction, UserProfile, HealthAndCycleFormModel
+from period_app.predictions import (
+    add_period,
+    cycle_length_stddev,
+    fit_prediction,
+    forecast_histories,
+    load_histories,
+    load_prediction_states,
+    predicted_cycle_length,
+    record_period,
+    save_forecasts,
+    update_forecast,
+)
+
+CYCLE_LENGTHS = [27, 30, 29, 31, 28, 90, 26]
+
+
+def period_starts(first=date(2024, 1, 1)):
+    starts = [first]
+    for length in CYCLE_LENGTHS:
+        starts.append(starts[-1] + timedelta(days=length))
+    return starts
+
+
+class TestPredictionMath:
+    """
+    Tests for the statistics and forecast computed from a history of periods.
+    """
+    def test_incremental_statistics_match_a_full_fit(self):
+        """
+        Test that the online mean and variance match the batch values, skipping the 90 day gap.
+        """
+        prediction = CyclePrediction()
+        fit_prediction(prediction, [(start, start + timedelta(days=4), None) for start in period_starts()])
+
+        observed = [length for length in CYCLE_LENGTHS if length != 90]
+        assert prediction.cycle_count == len(observed)
+        assert prediction.cycle_length_mean == pytest.approx(statistics.mean(observed))
+        assert prediction.cycle_length_m2 / (prediction.cycle_count - 1) == pytest.approx(
+            statistics.variance(observed)
+        )
+        assert predicted_cycle_length(prediction) == round(statistics.median(observed))
+        assert prediction.recent_period_lengths[-1] == 5
+
+    def test_older_period_needs_refit(self):
+        """
+        Test that a period older than the latest one is not folded in incrementally.
+        """
+        prediction = CyclePrediction()
+        assert add_period(prediction, date(2024, 2, 1))
+        assert not add_period(prediction, date(2024, 1, 1))
+        assert prediction.last_period_start == date(2024, 2, 1)
+
+    def test_forecast_windows(self):
+        """
+        Test that the next period range is centred on the median and the ovulation window precedes it.
+        """
+        prediction = CyclePrediction()
+        for start in (date(2024, 1, 1), date(2024, 1, 29), date(2024, 2, 28), date(2024, 3, 27)):
+            add_period(prediction, start)
+
+        update_forecast(prediction, today=date(2024, 4, 1))
+
+        assert prediction.next_period_start == date(2024, 3, 27) + timedelta(days=28)
+        assert prediction.next_period_earliest < prediction.next_period_start < prediction.next_period_latest
+        assert prediction.ovulation_window_end == prediction.next_period_latest - timedelta(days=14)
+
+    def test_forecast_skips_missed_cycles(self):
+        """
+        Test that an overdue prediction is moved forward by whole cycles with a wider range.
+        """
+        prediction = CyclePrediction()
+        for start in (date(2024, 1, 1), date(2024, 1, 29), date(2024, 2, 28)):
+            add_period(prediction, start)
+        update_forecast(prediction, today=date(2024, 3, 1))
+        on_time_margin = prediction.next_period_latest - prediction.next_period_start
+
+        update_forecast(prediction, today=date(2024, 5, 1))
+
+        assert prediction.next_period_start >= date(2024, 5, 1)
+        assert prediction.next_period_latest - prediction.next_period_start > on_time_margin
+        assert cycle_length_stddev(prediction) > 0
+
+
+@pytest.mark.django_db
+class TestPredictionUpdates:
+    """
+    Tests for keeping CyclePrediction in sync with the entries.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    @staticmethod
+    def log_period(user_profile, start):
+        return HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=start,
+            menstruation_phase_end=start + timedelta(days=4),
+            cycle_length=28,
+        )
+
+    def test_new_periods_update_the_prediction(self, user_profile):
+        """
+        Test that logging periods in order updates the stored statistics without reading the history.
+        """
+        starts = period_starts()
+        for start in starts[:-1]:
+            self.log_period(user_profile, start)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.log_period(user_profile, starts[-1])
+
+        assert not [query for query in queries if '"menstruation_phase_start" ASC' in query['sql']]
+
+        prediction = CyclePrediction.objects.get(user_profile=user_profile)
+        assert prediction.last_period_start == starts[-1]
+        assert prediction.cycle_count == len(CYCLE_LENGTHS) - 1
+
+    def test_deleting_a_period_refits(self, user_profile):
+        """
+        Test that deleting an older period removes its cycle from the statistics.
+        """
+        starts = period_starts()[:3]
+        entries = [self.log_period(user_profile, start) for start in starts]
+
+        entries[1].delete()
+
+        prediction = CyclePrediction.objects.get(user_profile=user_profile)
+        assert prediction.recent_cycle_lengths == [57]
+        assert prediction.cycle_count == 1
+
+    def test_only_period_edits_refit(self, user_profile):
+        """
+        Test that editing symptoms keeps the prediction, while moving a period start refits it.
+        """
+        starts = period_starts()[:3]
+        entries = [self.log_period(user_profile, start) for start in starts]
+
+        entries[1].daily_symptoms = ['Ból głowy']
+        with CaptureQueriesContext(connection) as queries:
+            entries[1].save()
+        assert not [query for query in queries if 'period_app_cycleprediction' in query['sql']]
+
+        entries[1].menstruation_phase_start += timedelta(days=2)
+        entries[1].save()
+        prediction = CyclePrediction.objects.get(user_profile=user_profile)
+        assert prediction.recent_cycle_lengths == [CYCLE_LENGTHS[0] + 2, CYCLE_LENGTHS[1] - 2]
+
+    def test_history_imported_out_of_order(self, user_profile):
+        """
+        Test that an older period logged after a newer one is placed correctly.
+        """
+        starts = period_starts()[:3]
+        self.log_period(user_profile, starts[2])
+        self.log_period(user_profile, starts[0])
+        self.log_period(user_profile, starts[1])
+
+        prediction = CyclePrediction.objects.get(user_profile=user_profile)
+        assert prediction.recent_cycle_lengths == CYCLE_LENGTHS[:2]
+
+    def test_deleting_the_user(self, user_profile):
+        """
+        Test that the prediction is removed together with the user.
+        """
+        self.log_period(user_profile, date(2024, 1, 1))
+
+        user_profile.user.delete()
+
+        assert not CyclePrediction.objects.exists()
+
+    def test_prediction_endpoint(self, user_profile):
+        """
+        Test that the API reports the observed cycles and the prediction ranges.
+        """
+        for start in period_starts()[:4]:
+            self.log_period(user_profile, start)
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+
+        data = client.get(reverse('api_predictions', kwargs={'version': 'v1'})).json()
+
+        assert data['observed_cycles'] == 3
+        assert data['cycle_length'] == 29
+        assert data['next_period_earliest'] <= data['next_period'] <= data['next_period_latest']
+        assert data['ovulation_window_start'] < data['next_period_earliest']
+
+
+@pytest.mark.django_db
+class TestPredictCyclesCommand:
+    """
+    Tests for the batch prediction command.
+    """
+    @pytest.fixture
+    def user_profiles(self):
+        profiles = []
+        for number in range(5):
+            user = CustomUser.objects.create_user(username=f'user{number}', password='testpassword123')
+            profiles.append(UserProfile.objects.create(user=user))
+        entries = []
+        for profile in profiles[:4]:
+            for start in period_starts()[:3]:
+                entries.append(HealthAndCycleFormModel(user_profile=profile, menstruation_phase_start=start))
+        # bulk_create sends no signals, so no prediction exists before the command runs.
+        HealthAndCycleFormModel.objects.bulk_create(entries)
+        return profiles
+
+    @pytest.mark.parametrize('workers', ['0', '2'])
+    def test_predicts_every_user(self, user_profiles, workers):
+        """
+        Test that predictions are written for users with periods, in process and with a process pool.
+        """
+        out = StringIO()
+        stale = CyclePrediction.objects.create(user_profile=user_profiles[0], cycle_count=99)
+
+        call_command('predict_cycles', '--chunk-size', '2', '--workers', workers, '--today', '2024-03-01', stdout=out)
+
+        predictions = CyclePrediction.objects.order_by('user_profile_id')
+        assert [prediction.user_profile_id for prediction in predictions] == [
+            profile.pk for profile in user_profiles[:4]
+        ]
+        stale.refresh_from_db()
+        assert stale.cycle_count == 2
+        assert stale.next_period_start == date(2024, 2, 27) + timedelta(days=28)
+        assert 'Updated predictions of 5 profiles' in out.getvalue()
+
+    def test_keeps_predictions_updated_after_loading(self, user_profiles):
+        """
+        Test that a period logged while a chunk is being fitted is not overwritten by the older forecast.
+        """
+        ids = [profile.pk for profile in user_profiles]
+        for profile in user_profiles[:2]:
+            CyclePrediction.objects.create(user_profile=profile)
+        loaded_states = load_prediction_states(ids)
+        results = forecast_histories(load_histories(ids), date(2024, 3, 1))
+
+        logged = period_starts()[3]
+        record_period(user_profiles[0].pk, logged)
+        record_period(user_profiles[2].pk, logged)
+
+        assert save_forecasts(results, loaded_states) == 5
+        predictions = {prediction.user_profile_id: prediction for prediction in CyclePrediction.objects.all()}
+        assert predictions[user_profiles[0].pk].last_period_start == logged
+        assert predictions[user_profiles[1].pk].cycle_count == 2
+        assert predictions[user_profiles[2].pk].last_period_start == logged
+        assert predictions[user_profiles[3].pk].cycle_count == 2
@@ -0,0 +1,108 @@
+"""
+This file contains query-count guards for the views, so N+1 queries and per-request lookups do not creep back.
+
+Every authenticated request costs two queries before the view runs: the session and the user joined with
+the profile.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel
+
+ENTRY_COUNT = 20
+
+
+@pytest.mark.django_db
+class TestViewQueryCounts:
+    """
+    Tests that the number of queries of every view does not depend on the number of entries.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        cache.clear()
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123', is_staff=True,
+                                              is_superuser=True)
+        user_profile = UserProfile.objects.create(user=user)
+        today = timezone.localdate()
+        for number in range(ENTRY_COUNT):
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user_profile,
+                date=today - timedelta(days=number),
+                event=f'Wpis {number}',
+                menstruation_phase_start=today - timedelta(days=number),
+                menstruation_phase_end=today - timedelta(days=number - 4),
+                cycle_length=28,
+                daily_symptoms=['Ból głowy'],
+                daily_mood=['Radość'],
+                average_pain_level=3,
+                recorded_at=timezone.now() - timedelta(days=number),
+            )
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client
+
+    @pytest.mark.parametrize('url_name, params, headers, queries', [
+        # session, user; profile joined with its cycle info and prediction
+        ('home', {}, {}, 3),
+        # session, user; health profile
+        ('calendar', {}, {}, 3),
+        # session, user; entries in the window
+        ('calendar', {'start': '2020-01-01', 'end': '2030-01-01'}, {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}, 3),
+        # session, user; cycles around the range
+        ('calendar_day_colors', {'start': '2024-12-29', 'end': '2025-02-09'}, {}, 3),
+        # session, user; daily rollups
+        ('statistics', {}, {}, 3),
+        # session, user; health profile
+        ('form', {}, {}, 3),
+        ('bulk_import', {}, {}, 2),
+        ('knowledge_base', {}, {}, 2),
+        # session, user; stored report, rollups, report insert, older reports
+        ('export_statistics_pdf', {}, {}, 6),
+        # session, user; entries through a server-side cursor
+        ('export_entries', {'format': 'csv'}, {}, 3),
+    ])
+    def test_get_views(self, authenticated_client, django_assert_num_queries, url_name, params, headers, queries):
+        """
+        Test the query count of the pages and feeds.
+        """
+        with django_assert_num_queries(queries):
+            response = authenticated_client.get(reverse(url_name), params, **headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code == 200
+
+    def test_api_entry_list(self, authenticated_client, django_assert_num_queries):
+        """
+        Test that listing entries through the API is a single query after authentication.
+        """
+        with django_assert_num_queries(3):
+            response = authenticated_client.get(reverse('api_entries', kwargs={'version': 'v1'}))
+        assert len(response.json()['results']) == ENTRY_COUNT
+
+    def test_admin_changelist(self, authenticated_client, django_assert_num_queries):
+        """
+        Test that the entry changelist does not query the user of every row.
+        """
+        url = reverse(f'{site.name}:period_app_healthandcycleformmodel_changelist')
+        # session, user; date hierarchy, filtered and total counts, rows joined with profiles and users
+        with django_assert_num_queries(7):
+            response = authenticated_client.get(url)
+        assert response.status_code == 200
+
+    def test_form_post(self, authenticated_client, django_assert_num_queries):
+        """
+        Test that saving an entry keeps a fixed number of queries for the derived data.
+        """
+        data = {'date': date(2025, 1, 1).isoformat(), 'event': 'Nowy wpis', 'daily_symptoms': ['Ból głowy']}
+        # session, user; the insert, the daily log upsert, the daily rollup upsert, the data version bump and the
+        # sync version stamp, with their savepoints
+        with django_assert_num_queries(13):
+            response = authenticated_client.post(reverse('form'), data)
+        assert response.status_code == 302
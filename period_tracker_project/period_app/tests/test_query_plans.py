@@ -0,0 +1,126 @@
+"""
+This file contains the tests checking that the queries of the main views use the indexes on a seeded dataset.
+"""
+
+import json
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from period_app.fake_data import generate_fake_cycles
+from period_app.models import CustomUser, StatisticsCycleInfo
+from period_app.rollups import refresh_daily_rollup
+
+TODAY = date(2025, 6, 30)
+# Tables large enough on a real installation that a sequential scan of them is a regression.
+LARGE_TABLES = {
+    'period_app_healthandcycleformmodel',
+    'period_app_dailylog',
+    'period_app_cycle',
+    'period_app_dailystatisticsrollup',
+}
+
+
+def _scans(plan):
+    """
+    Yields (node type, table, index) for every scan node of an EXPLAIN (FORMAT JSON) plan.
+    """
+    if 'Relation Name' in plan or 'Index Name' in plan:
+        yield plan['Node Type'], plan.get('Relation Name'), plan.get('Index Name')
+    for child in plan.get('Plans', ()):
+        yield from _scans(child)
+
+
+def explain(sql):
+    """
+    Returns the scans the planner chose for an SQL statement, without running it.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(_scans(plan[0]['Plan']))
+
+
+def captured_scans(client, url, params=None, **headers):
+    """
+    Requests ``url`` and returns the scans of every SELECT it ran.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {}, **headers)
+    assert response.status_code == 200
+    return [
+        scan
+        for query in queries.captured_queries if query['sql'].startswith('SELECT')
+        for scan in explain(query['sql'])
+    ]
+
+
+@pytest.fixture(scope='class')
+def seeded_dataset(django_db_setup, django_db_blocker):
+    """
+    Commits a few thousand entries of many users and refreshes the planner statistics.
+    """
+    with django_db_blocker.unblock():
+        generate_fake_cycles(40, seed=1, years=1, workers=0, username_prefix='plan_', today=TODAY)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        yield
+        call_command('flush', interactive=False, verbosity=0)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('seeded_dataset')
+class TestQueryPlans:
+    """
+    Tests that the hot queries of Home, CalendarView and StatisticsView are answered from indexes.
+    """
+    @pytest.fixture
+    def client(self):
+        cache.clear()
+        client = Client()
+        client.force_login(CustomUser.objects.get(username='plan_0000007'))
+        return client
+
+    @staticmethod
+    def _assert_no_large_seq_scans(scans):
+        seq_scans = [table for node, table, _ in scans if node == 'Seq Scan' and table in LARGE_TABLES]
+        assert not seq_scans, scans
+
+    def test_home(self, client):
+        # Without a stored cycle state Home reads the latest period of the user.
+        StatisticsCycleInfo.objects.filter(user_profile__user__username='plan_0000007').delete()
+        scans = captured_scans(client, reverse('home'))
+        self._assert_no_large_seq_scans(scans)
+        assert 'healthform_profile_period_idx' in {index for _, _, index in scans}
+
+    def test_calendar(self, client):
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        window = {'start': '2025-05-26', 'end': '2025-07-07'}
+        scans = captured_scans(client, reverse('calendar'), window, **headers)
+        scans += captured_scans(client, reverse('calendar_day_colors'), window)
+        self._assert_no_large_seq_scans(scans)
+        indexes = {index for _, _, index in scans}
+        assert 'healthform_profile_date_idx' in indexes
+        assert 'unique_cycle_profile_start' in indexes
+
+    def test_statistics(self, client):
+        scans = captured_scans(client, reverse('statistics'))
+        self._assert_no_large_seq_scans(scans)
+        assert 'unique_rollup_profile_day' in {index for _, _, index in scans}
+
+    def test_daily_rollup_range_scan(self):
+        # Refreshing a rollup reads the day's recorded_at timestamps from the (user_profile, recorded_at) index.
+        user_profile = CustomUser.objects.get(username='plan_0000007').userprofile
+        with CaptureQueriesContext(connection) as queries:
+            refresh_daily_rollup(user_profile.pk, TODAY)
+        scans = explain(queries.captured_queries[0]['sql'])
+        self._assert_no_large_seq_scans(scans)
+        assert 'dailylog_profile_recorded_idx' in {index for _, _, index in scans}
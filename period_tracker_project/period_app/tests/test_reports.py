@@ -0,0 +1,36 @@
+"""
+This file contains the tests for the PDF report rendering.
+"""
+
+from io import BytesIO
+
+from period_app.reports import compact_date_ranges, render_statistics_pdf
+from period_app.stats import StatisticsResult
+
+
+class TestReports:
+    """
+    Tests for the statistics PDF helpers.
+    """
+    def test_compact_date_ranges(self):
+        """
+        Test that consecutive and repeated days collapse into ranges.
+        """
+        dates = ['2025-01-03', '2025-01-01', '2025-01-02', '2025-01-02', '2025-01-07', '2025-02-28', '2025-03-01']
+        assert compact_date_ranges(dates) == '2025-01-01 – 2025-01-03, 2025-01-07, 2025-02-28 – 2025-03-01'
+        assert compact_date_ranges([]) == ''
+
+    def test_render_long_history(self):
+        """
+        Test rendering a report with a year of daily dates into a file object.
+        """
+        statistics = StatisticsResult()
+        statistics.symptoms['Ból głowy'] = [
+            f'2025-{month:02d}-{day:02d}' for month in range(1, 13) for day in range(1, 29)
+        ]
+        statistics.pain_levels[3] = ['2025-01-01']
+        output = BytesIO()
+
+        render_statistics_pdf('testuser', statistics, output)
+
+        assert output.getvalue().startswith(b'%PDF')
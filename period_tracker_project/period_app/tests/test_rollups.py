@@ -0,0 +1,141 @@
+"""
+This file contains the tests for the daily statistics rollups.
+"""
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, DailyStatisticsRollup
+from period_app.rollups import refresh_daily_rollup, rollup_buckets
+from period_app.stats import rollup_statistics
+
+
+@pytest.mark.django_db
+class TestDailyStatisticsRollup:
+    """
+    Tests for the incrementally maintained rollups.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    @pytest.fixture
+    def entries(self, user_profile):
+        start = timezone.now() - timedelta(days=20)
+        rows = [
+            (start, ['Ból głowy', 'Zmęczenie'], ['Szczęście'], 3),
+            (start + timedelta(hours=1), ['Ból głowy'], [], 5),
+            (start + timedelta(days=2), ['Zmęczenie'], ['Smutek'], 3),
+            (start + timedelta(days=10), [], ['Smutek'], None),
+        ]
+        return [
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user_profile,
+                daily_symptoms=symptoms,
+                daily_mood=moods,
+                average_pain_level=pain,
+                recorded_at=recorded_at
+            )
+            for recorded_at, symptoms, moods, pain in rows
+        ]
+
+    @staticmethod
+    def _as_counts(result):
+        return {
+            name: {label: sorted(dates) for label, dates in getattr(result, name).items()}
+            for name in ('symptoms', 'moods', 'pain_levels')
+        }
+
+    def test_rollups_follow_saves_and_deletes(self, user_profile, entries):
+        """
+        Test that the rollups are kept in sync with the raw entries.
+        """
+        assert DailyStatisticsRollup.objects.filter(user_profile=user_profile).count() == 3
+        first_day = DailyStatisticsRollup.objects.get(
+            user_profile=user_profile,
+            day=timezone.localdate(entries[0].recorded_at)
+        )
+        assert first_day.entries == 2
+        assert first_day.symptom_counts == {'Ból głowy': 2, 'Zmęczenie': 1}
+        assert first_day.pain_counts == {'3': 1, '5': 1}
+
+        entries[3].delete()
+        assert DailyStatisticsRollup.objects.filter(user_profile=user_profile).count() == 2
+        first, third = (timezone.localdate(entry.recorded_at).isoformat() for entry in (entries[0], entries[2]))
+        assert self._as_counts(rollup_statistics(user_profile)) == {
+            'symptoms': {'Ból głowy': [first, first], 'Zmęczenie': [first, third]},
+            'moods': {'Szczęście': [first], 'Smutek': [third]},
+            'pain_levels': {3: [first, third], 5: [first]},
+        }
+
+    def test_day_is_a_half_open_local_timestamp_range(self, user_profile):
+        """
+        Test that a day's rollup counts the entries from its local midnight up to, but excluding, the next one.
+        """
+        recorded = [
+            datetime(2025, 3, 29, 22, 59, tzinfo=dt_timezone.utc),  # 23:59 of Mar 29 in Warsaw
+            datetime(2025, 3, 29, 23, 0, tzinfo=dt_timezone.utc),   # midnight of Mar 30
+            datetime(2025, 3, 30, 21, 59, tzinfo=dt_timezone.utc),  # 23:59 of Mar 30, after the DST change
+            datetime(2025, 3, 30, 22, 0, tzinfo=dt_timezone.utc),   # midnight of Mar 31
+        ]
+        for recorded_at in recorded:
+            HealthAndCycleFormModel.objects.create(user_profile=user_profile, recorded_at=recorded_at)
+        DailyStatisticsRollup.objects.all().delete()
+
+        with timezone.override('Europe/Warsaw'), CaptureQueriesContext(connection) as queries:
+            rollup = refresh_daily_rollup(user_profile.pk, date(2025, 3, 30))
+
+        assert rollup.entries == 2
+        # recorded_at is compared as it is, so the (user_profile, recorded_at) index can be range-scanned.
+        sql = queries.captured_queries[0]['sql']
+        assert '"recorded_at" >=' in sql and '"recorded_at" <' in sql
+        assert '::date' not in sql and 'AT TIME ZONE' not in sql
+
+    def test_moving_an_entry_refreshes_the_old_day(self, user_profile, entries):
+        """
+        Test that an entry moved to another day stops counting in the rollup of the old day.
+        """
+        old_day = timezone.localdate(entries[3].recorded_at)
+        entries[3].recorded_at += timedelta(days=1)
+        entries[3].save()
+        assert not DailyStatisticsRollup.objects.filter(user_profile=user_profile, day=old_day).exists()
+        assert DailyStatisticsRollup.objects.get(user_profile=user_profile, day=old_day + timedelta(days=1)).entries == 1
+
+    def test_moving_an_entry_to_another_user(self, user_profile, entries):
+        """
+        Test that an entry moved to another user is counted in their rollup instead.
+        """
+        other = UserProfile.objects.create(user=CustomUser.objects.create_user(username='other', password='x'))
+        day = timezone.localdate(entries[3].recorded_at)
+        entries[3].user_profile = other
+        entries[3].save()
+        assert not DailyStatisticsRollup.objects.filter(user_profile=user_profile, day=day).exists()
+        assert DailyStatisticsRollup.objects.get(user_profile=other, day=day).mood_counts == {'Smutek': 1}
+
+    def test_rebuild_command(self, user_profile, entries):
+        """
+        Test that the management command rebuilds identical rollups.
+        """
+        expected = self._as_counts(rollup_statistics(user_profile))
+        DailyStatisticsRollup.objects.all().delete()
+
+        call_command('rebuild_statistics_rollups')
+
+        assert DailyStatisticsRollup.objects.filter(user_profile=user_profile).count() == 3
+        assert self._as_counts(rollup_statistics(user_profile)) == expected
+
+    def test_month_buckets(self, user_profile, entries):
+        """
+        Test grouping the daily rollups into larger buckets.
+        """
+        buckets = rollup_buckets(user_profile, timezone.localdate() - timedelta(days=365), period='month')
+        assert sum(bucket['entries'] for bucket in buckets) == 4
+        assert sum(bucket['symptoms']['Ból głowy'] for bucket in buckets) == 2
+        with pytest.raises(ValueError):
+            rollup_buckets(user_profile, timezone.localdate(), period='year')
@@ -0,0 +1,120 @@
+"""
+This file contains the tests for the statistics aggregation.
+"""
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel
+from period_app.stats import StatisticsWindow, rollup_statistics, statistics_window
+
+
+@pytest.mark.django_db
+class TestRollupStatistics:
+    """
+    Tests for the statistics built from the daily rollups.
+    """
+    @pytest.fixture
+    def user_profile(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        return UserProfile.objects.create(user=user)
+
+    def test_aggregates_symptoms_moods_and_pain(self, user_profile):
+        """
+        Test counts and dates for every series, including rows outside the window.
+        """
+        day = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=3)
+        rows = [
+            (day, ['Ból głowy', 'Zmęczenie'], ['Szczęście'], 3),
+            (day + timedelta(hours=2), ['Ból głowy'], [], None),
+            (day + timedelta(days=1), ['Zmęczenie'], ['Smutek'], 3),
+            (day - timedelta(days=400), ['Ból nóg'], ['Lęk'], 8),
+        ]
+        for recorded_at, symptoms, moods, pain in rows:
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user_profile,
+                daily_symptoms=symptoms,
+                daily_mood=moods,
+                average_pain_level=pain,
+                recorded_at=recorded_at
+            )
+
+        first, second = day.date().isoformat(), (day + timedelta(days=1)).date().isoformat()
+        statistics = rollup_statistics(user_profile)
+
+        # Labels of a day come back in the key order of the JSONB counts, so the series are compared as dicts.
+        assert dict(statistics.symptoms) == {'Ból głowy': [first, first], 'Zmęczenie': [first, second]}
+        assert dict(statistics.moods) == {'Szczęście': [first], 'Smutek': [second]}
+        assert statistics.chart_data()['pain_levels'] == {'labels': ['3'], 'data': [2], 'dates': [[first, second]]}
+
+    def test_statistics_are_one_query(self, user_profile, django_assert_num_queries):
+        """
+        Test that the statistics of a window are read in a single query.
+        """
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            daily_symptoms=['Zgaga'],
+            daily_mood=['Lęk'],
+            average_pain_level=2,
+            recorded_at=timezone.now()
+        )
+        with django_assert_num_queries(1):
+            statistics = rollup_statistics(user_profile)
+        assert statistics.chart_data()['pain_levels']['labels'] == ['2']
+
+    def test_window_includes_the_first_and_excludes_the_end_day(self, user_profile):
+        """
+        Test that the window covers the local days from its start up to, but excluding, its end.
+        """
+        recorded = [
+            datetime(2025, 2, 28, 22, 59, tzinfo=dt_timezone.utc),  # 23:59 of Feb 28 in Warsaw
+            datetime(2025, 2, 28, 23, 0, tzinfo=dt_timezone.utc),   # midnight of Mar 1 in Warsaw
+            datetime(2025, 3, 30, 21, 59, tzinfo=dt_timezone.utc),  # 23:59 of Mar 30, after the DST change
+            datetime(2025, 3, 30, 22, 0, tzinfo=dt_timezone.utc),   # midnight of Mar 31
+        ]
+        with timezone.override('Europe/Warsaw'):
+            for number, recorded_at in enumerate(recorded):
+                HealthAndCycleFormModel.objects.create(
+                    user_profile=user_profile, daily_symptoms=[f'Objaw {number}'], recorded_at=recorded_at
+                )
+            statistics = rollup_statistics(user_profile, StatisticsWindow(date(2025, 3, 1), date(2025, 3, 31)))
+
+        assert dict(statistics.symptoms) == {'Objaw 1': ['2025-03-01'], 'Objaw 2': ['2025-03-30']}
+
+
+class TestStatisticsWindow:
+    """
+    Tests for the selection of the statistics window.
+    """
+    today = date(2025, 6, 30)
+
+    @pytest.mark.parametrize('name, start', [
+        ('30d', date(2025, 6, 1)),
+        ('90d', date(2025, 4, 2)),
+        ('1y', date(2024, 7, 1)),
+        (None, date(2024, 7, 1)),
+    ])
+    def test_presets_end_with_today(self, name, start):
+        window = statistics_window(name, today=self.today)
+        assert (window.start, window.end, window.last_day) == (start, date(2025, 7, 1), self.today)
+        assert window.name == (name or '1y')
+
+    def test_custom_range_includes_both_days(self):
+        window = statistics_window('custom', date(2025, 1, 1), date(2025, 1, 31), today=self.today)
+        assert (window.name, window.start, window.end) == ('custom', date(2025, 1, 1), date(2025, 2, 1))
+
+    def test_custom_range_defaults(self):
+        assert statistics_window(since=date(2025, 6, 1), today=self.today).end == date(2025, 7, 1)
+        assert statistics_window(until=date(2024, 12, 31), today=self.today).start == date(2024, 1, 2)
+        assert statistics_window('custom', today=self.today).start == date(2024, 7, 1)
+
+    @pytest.mark.parametrize('name, since, until', [
+        ('2w', None, None),
+        ('30d', date(2025, 6, 1), None),
+        (None, date(2025, 6, 2), date(2025, 6, 1)),
+    ])
+    def test_invalid_windows(self, name, since, until):
+        with pytest.raises(ValueError):
+            statistics_window(name, since, until, today=self.today)
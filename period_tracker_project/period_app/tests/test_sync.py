@@ -0,0 +1,161 @@
+"""
+This file contains the tests for the incremental sync of entries.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, HealthEntryTombstone
+from period_app.signals import entries_bulk_changed
+from period_app.sync import TOMBSTONE_RETENTION, changes_since, make_token, prune_tombstones
+
+
+@pytest.mark.django_db
+class TestSync:
+    """
+    Tests for the sync protocol and the sync endpoint.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        UserProfile.objects.create(user=user)
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user
+
+    @staticmethod
+    def create_entry(user_profile, day):
+        return HealthAndCycleFormModel.objects.create(user_profile=user_profile, date=day, event=str(day))
+
+    def test_only_changes_are_returned(self, authenticated_client):
+        """
+        Test that a sync returns updated entries and ids of deleted ones, but not unchanged entries.
+        """
+        _, user = authenticated_client
+        user_profile = user.userprofile
+        unchanged = self.create_entry(user_profile, date(2024, 1, 1))
+        updated = self.create_entry(user_profile, date(2024, 1, 2))
+        deleted = self.create_entry(user_profile, date(2024, 1, 3))
+        token = changes_since(user_profile).token
+
+        updated.event = 'Zmieniony'
+        updated.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        changes = changes_since(user_profile, token)
+        assert not changes.reset
+        assert [entry.pk for entry in changes.changed] == [updated.pk]
+        assert changes.deleted == [deleted_id]
+        assert unchanged.pk not in [entry.pk for entry in changes.changed]
+
+    def test_first_and_expired_sync_reset(self, authenticated_client):
+        """
+        Test that a client without a token or with a too old one receives everything.
+        """
+        _, user = authenticated_client
+        self.create_entry(user.userprofile, date(2024, 1, 1))
+
+        assert changes_since(user.userprofile).reset
+        expired = make_token(0, timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1))
+        changes = changes_since(user.userprofile, expired)
+        assert changes.reset
+        assert changes.changed.count() == 1
+        # A timestamp token issued before sync versions existed
+        assert changes_since(user.userprofile, str(int(timezone.now().timestamp() * 1_000_000))).reset
+
+    def test_late_commit_is_not_missed(self, authenticated_client):
+        """
+        Test that rows written by a long transaction are sent by the next sync however old their timestamps are.
+        """
+        _, user = authenticated_client
+        user_profile = user.userprofile
+        self.create_entry(user_profile, date(2024, 1, 1))
+        token = changes_since(user_profile).token
+
+        # A bulk writer that started long before the token was issued commits only now.
+        late = HealthAndCycleFormModel.objects.bulk_create([
+            HealthAndCycleFormModel(user_profile=user_profile, date=date(2024, 1, 2), event='Import')
+        ])[0]
+        HealthAndCycleFormModel.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        pending = changes_since(user_profile, token)
+        assert [entry.pk for entry in pending.changed] == [late.pk]
+
+        entries_bulk_changed.send(sender=HealthAndCycleFormModel, user_profile_ids=[user_profile.pk])
+        changes = changes_since(user_profile, token)
+        assert [entry.pk for entry in changes.changed] == [late.pk]
+        assert not changes_since(user_profile, changes.token).changed.exists()
+
+    def test_sync_endpoint(self, authenticated_client):
+        """
+        Test the sync endpoint round trip.
+        """
+        client, user = authenticated_client
+        entry = self.create_entry(user.userprofile, date(2024, 1, 1))
+        url = reverse('api_sync', kwargs={'version': 'v1'})
+
+        first = client.get(url, {'fields': 'id,date'}).json()
+        assert first['reset'] is True
+        assert first['changed'] == [{'id': entry.pk, 'date': '2024-01-01'}]
+
+        client.delete(reverse('api_entry', kwargs={'version': 'v1', 'pk': entry.pk}))
+        second = client.get(url, {'since': first['token']}).json()
+        assert second['reset'] is False
+        assert second['changed'] == []
+        assert second['deleted'] == [entry.pk]
+
+        assert client.get(url, {'since': 'wczoraj'}).status_code == 400
+
+    def test_reset_is_paginated(self, authenticated_client):
+        """
+        Test that a reset is returned in pages which all hand out the token of the first one.
+        """
+        client, user = authenticated_client
+        entries = [self.create_entry(user.userprofile, date(2024, 1, day)) for day in range(1, 6)]
+        url = reverse('api_sync', kwargs={'version': 'v1'})
+
+        first = client.get(url, {'fields': 'id', 'page_size': 2}).json()
+        assert first['reset'] is True
+        assert first['changed'] == [{'id': entry.pk} for entry in entries[:2]]
+        self.create_entry(user.userprofile, date(2024, 1, 6))
+
+        pages, next_link = [first], first['next']
+        while next_link:
+            pages.append(client.get(next_link).json())
+            next_link = pages[-1]['next']
+        assert [row['id'] for page in pages for row in page['changed']][:5] == [entry.pk for entry in entries]
+        assert {page['token'] for page in pages} == {first['token']}
+
+        follow_up = client.get(url, {'since': first['token'], 'fields': 'id'}).json()
+        assert follow_up['reset'] is False
+        assert follow_up['changed'] == [{'id': HealthAndCycleFormModel.objects.latest('id').pk}]
+        assert client.get(url, {'token': 'wczoraj'}).status_code == 400
+
+    def test_profile_deletion_leaves_no_tombstones(self, authenticated_client):
+        """
+        Test that entries removed together with their user do not produce tombstones.
+        """
+        _, user = authenticated_client
+        self.create_entry(user.userprofile, date(2024, 1, 1))
+
+        user.delete()
+
+        assert not HealthEntryTombstone.objects.exists()
+
+    def test_prune_tombstones(self, authenticated_client):
+        """
+        Test that only tombstones past the retention period are pruned.
+        """
+        _, user = authenticated_client
+        self.create_entry(user.userprofile, date(2024, 1, 1)).delete()
+        self.create_entry(user.userprofile, date(2024, 1, 2)).delete()
+        HealthEntryTombstone.objects.filter(entry_id__in=HealthEntryTombstone.objects.values('entry_id')[:1]).update(
+            deleted_at=timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1)
+        )
+
+        assert prune_tombstones() == 1
+        assert HealthEntryTombstone.objects.count() == 1
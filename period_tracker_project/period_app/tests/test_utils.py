@@ -0,0 +1,213 @@
+"""
+This file contains the tests for the cycle phase utilities.
+"""
+
+from datetime import date, timedelta
+from itertools import islice
+
+import pytest
+
+from period_app import utils
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel
+from period_app.utils import (
+    CyclePhaseClassifier,
+    NO_PHASE,
+    PHASE_COLORS,
+    PhaseTimelineCache,
+    classify_days,
+    classify_phases,
+    iter_cycle_phases,
+    phase_timeline_cache,
+)
+
+
+def _color_from_phase_dicts(phases, day):
+    """
+    Reference implementation: the linear scan the calendar used before the classifier existed.
+    """
+    color = None
+    for phase_set in phases:
+        for phase_info in phase_set.values():
+            if phase_info['start'] <= day <= phase_info['end']:
+                color = phase_info['color']
+                break
+    return color
+
+
+class TestCyclePhaseClassifier:
+    """
+    Tests for the modular arithmetic phase lookup.
+    """
+    @pytest.mark.parametrize('cycle_length, period_length', [(28, 6), (21, 4), (35, 7), (30, 5)])
+    def test_matches_iter_cycle_phases(self, cycle_length, period_length):
+        """
+        Test that every day of the predicted year gets the same color as the projected phases.
+        """
+        start = date(2025, 1, 3)
+        end = start + timedelta(days=period_length - 1)
+        phases = list(islice(iter_cycle_phases(start, end, cycle_length), 12))
+        classifier = CyclePhaseClassifier.from_menstruation(start, end, cycle_length)
+
+        for offset in range(-5, cycle_length * 12 + 5):
+            day = start + timedelta(days=offset)
+            assert classifier.color_for(day) == _color_from_phase_dicts(phases, day)
+
+    def test_incomplete_data(self):
+        """
+        Test that incomplete cycle data yields no classifier.
+        """
+        assert CyclePhaseClassifier.from_menstruation(date(2025, 1, 1), None, 28) is None
+        assert CyclePhaseClassifier.from_menstruation(date(2025, 1, 5), date(2025, 1, 1), 28) is None
+
+    def test_cycle_day_and_next_cycle_start(self):
+        """
+        Test cycle day numbering and next period prediction.
+        """
+        classifier = CyclePhaseClassifier(date(2025, 1, 1), 5, 28)
+        assert classifier.cycle_day(date(2025, 1, 1)) == 1
+        assert classifier.cycle_day(date(2025, 1, 29)) == 1
+        assert classifier.cycle_day(date(2024, 12, 31)) is None
+        assert classifier.next_cycle_start(date(2025, 1, 1)) == date(2025, 1, 29)
+        assert classifier.next_cycle_start(date(2025, 2, 10)) == date(2025, 2, 26)
+
+
+class TestClassifyPhases:
+    """
+    Tests for the batch classification used by the calendar feed.
+    """
+    @pytest.fixture(params=['numpy', 'python'])
+    def backend(self, request, monkeypatch):
+        if request.param == 'python':
+            monkeypatch.setattr(utils, 'np', None)
+        elif utils.np is None:
+            pytest.skip('numpy is not installed')
+        return request.param
+
+    def test_mixed_rows(self, backend):
+        """
+        Test a batch mixing different anchors, missing data and out-of-horizon days.
+        """
+        anchor = date(2025, 1, 1).toordinal()
+        ordinals = [anchor, anchor + 10, anchor + 15, anchor + 20, anchor - 1, anchor + 28 * 12, anchor]
+        result = classify_phases(
+            ordinals,
+            [anchor, anchor, anchor, anchor, anchor, anchor, 0],
+            [6, 6, 6, 6, 6, 6, 0],
+            [28, 28, 28, 28, 28, 28, 0]
+        )
+        assert [PHASE_COLORS[i] if i != NO_PHASE else None for i in result] == [
+            'red', 'green', 'orange', 'purple', None, None, None
+        ]
+
+
+class TestIterCyclePhases:
+    """
+    Tests for the lazy cycle phase projection.
+    """
+    def test_phase_layout(self):
+        second = list(islice(iter_cycle_phases(date(2025, 1, 1), date(2025, 1, 6), 28), 2))[1]
+        assert second == {
+            'Menstruation': {'start': date(2025, 1, 29), 'end': date(2025, 2, 3), 'color': 'red'},
+            'Follicular': {'start': date(2025, 2, 4), 'end': date(2025, 2, 12), 'color': 'green'},
+            'Ovulation': {'start': date(2025, 2, 13), 'end': date(2025, 2, 13), 'color': 'orange'},
+            'Luteal': {'start': date(2025, 2, 14), 'end': date(2025, 2, 25), 'color': 'purple'},
+        }
+
+    def test_seeks_to_the_cycle_of_a_date(self):
+        projection = iter_cycle_phases(date(2024, 1, 1), date(2024, 1, 5), 28, since=date(2034, 6, 15))
+        cycle = next(projection)
+        assert cycle['Menstruation']['start'] <= date(2034, 6, 15) <= cycle['Luteal']['end']
+        assert (cycle['Menstruation']['start'] - date(2024, 1, 1)).days % 28 == 0
+        assert next(projection)['Menstruation']['start'] == cycle['Luteal']['end'] + timedelta(days=1)
+
+    def test_long_projection(self):
+        cycles = list(iter_cycle_phases(date(2024, 1, 1), date(2024, 1, 5), 28, until=date(2033, 12, 31)))
+        assert len(cycles) == 131
+        assert cycles[-1]['Menstruation']['start'] <= date(2033, 12, 31) < cycles[-1]['Luteal']['end']
+        assert next(iter_cycle_phases(date(2024, 1, 1), date(2024, 1, 5), 28, since=date(2020, 1, 1))) == cycles[0]
+
+    def test_incomplete_data(self):
+        assert not list(iter_cycle_phases(date(2024, 1, 1), None, 28))
+        assert not list(iter_cycle_phases(date(2024, 1, 5), date(2024, 1, 1), 28))
+
+    def test_classify_days_beyond_a_year(self):
+        first_day, last_day = date(2030, 1, 1), date(2030, 3, 31)
+        classifier = CyclePhaseClassifier(date(2024, 1, 1), 5, 28, cycles=None)
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+        assert classify_days(first_day, last_day, [(date(2024, 1, 1), date(2024, 1, 5), 28)]) == \
+            [classifier.phase_index(day) for day in days]
+
+
+class TestPhaseTimelineCache:
+    """
+    Tests for the memoized phase timelines.
+    """
+    def test_hits_misses_and_lru_eviction(self):
+        """
+        Test the counters and that the least recently used timeline is evicted first.
+        """
+        cache = PhaseTimelineCache(maxsize=2)
+        first = cache.get(date(2025, 1, 1), date(2025, 1, 5), 28)
+        assert cache.get(date(2025, 1, 1), date(2025, 1, 5), '28') is first
+        cache.get(date(2025, 2, 1), date(2025, 2, 5), 28)
+        cache.get(date(2025, 1, 1), date(2025, 1, 5), 28)
+        cache.get(date(2025, 3, 1), date(2025, 3, 5), 28)
+
+        assert cache.info() == {'hits': 2, 'misses': 3, 'size': 2, 'maxsize': 2}
+        assert cache.get(date(2025, 1, 1), date(2025, 1, 5), 28) is first
+        assert cache.get(date(2025, 1, 1), None, 28) is None
+        assert cache.get(date(2025, 1, 5), date(2025, 1, 1), 28) is None
+
+    def test_timeline_extends_past_its_stored_cycles(self):
+        """
+        Test that cycles after the stored ones continue the same layout.
+        """
+        timeline = PhaseTimelineCache().get(date(2025, 1, 1), date(2025, 1, 6), 28)
+        stored = len(timeline)
+        cycles = list(islice(timeline.iter_bounds(), stored + 2))
+        assert cycles[:stored] == list(timeline.cycles)
+        assert [cycle[0] - cycles[index][0] for index, cycle in enumerate(cycles[1:])] == [28] * (stored + 1)
+        assert timeline.color_for(date(2025, 2, 13)) == 'orange'
+        assert timeline.color_for(date(2024, 12, 31)) is None
+
+    def test_projections_share_the_cache(self):
+        """
+        Test that iter_cycle_phases reuses the timeline of a cycle.
+        """
+        phase_timeline_cache.clear()
+        start, end = date(2025, 1, 1), date(2025, 1, 5)
+        first = list(iter_cycle_phases(start, end, 28, until=date(2025, 6, 1)))
+        assert list(iter_cycle_phases(start, end, 28, until=date(2025, 6, 1))) == first
+        assert phase_timeline_cache.info()['misses'] == 1
+        assert phase_timeline_cache.info()['hits'] == 1
+
+    @pytest.mark.django_db
+    def test_saving_entry_evicts_timeline(self):
+        """
+        Test that saving, moving and deleting an entry evicts the timelines of its cycles.
+        """
+        user = CustomUser.objects.create_user(username='testuser', password='testpassword123')
+        user_profile = UserProfile.objects.create(user=user)
+        start, end = date(2025, 1, 1), date(2025, 1, 5)
+
+        def cached_starts():
+            return {key[0] for key in phase_timeline_cache._entries}
+
+        phase_timeline_cache.get(start, end, 28)
+        phase_timeline_cache.get(start, end, 30)
+        entry = HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            menstruation_phase_start=start,
+            menstruation_phase_end=end,
+            cycle_length=28
+        )
+        assert start not in cached_starts()
+
+        phase_timeline_cache.get(start, end, 28)
+        entry.menstruation_phase_start = date(2025, 1, 2)
+        entry.save()
+        assert start not in cached_starts()
+
+        phase_timeline_cache.get(date(2025, 1, 2), end, 28)
+        entry.delete()
+        assert date(2025, 1, 2) not in cached_starts()
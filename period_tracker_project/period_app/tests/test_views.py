@@ -2,14 +2,15 @@
 This file contains the views for the application period_app.
 """
 
-from datetime import timedelta
+from datetime import date, timedelta
 
 import pytest
 from django.test import Client
 from django.urls import reverse
 from django.utils import timezone
 
-from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel
+from period_app.models import CustomUser, UserProfile, HealthAndCycleFormModel, HealthProfile, StatisticsReportJob
+from period_app.utils import iter_cycle_phases, phase_timeline_cache
 
 
 @pytest.mark.django_db
@@ -178,6 +179,43 @@ class TestCalendarView:
         assert response.status_code == 200
         assert len(response.json()) > 0
 
+    def test_get_events_ajax_date_window(self, authenticated_client):
+        """
+        Test that only events inside the requested [start, end) window are returned.
+        """
+        client, user = authenticated_client
+        user_profile = UserProfile.objects.get(user=user)
+        today = timezone.now().date()
+        for offset in (-40, 0, 40):
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user_profile,
+                date=today + timedelta(days=offset),
+                event=f"Event {offset}"
+            )
+
+        response = client.get(
+            reverse('calendar'),
+            {
+                'start': (today - timedelta(days=7)).isoformat() + 'T00:00:00+01:00',
+                'end': (today + timedelta(days=7)).isoformat() + 'T00:00:00+01:00',
+            },
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        assert response.status_code == 200
+        assert [event['title'] for event in response.json()] == ['Event 0']
+
+    def test_get_events_ajax_invalid_window(self, authenticated_client):
+        """
+        Test that a malformed window is rejected.
+        """
+        client, _ = authenticated_client
+        response = client.get(
+            reverse('calendar'),
+            {'start': 'yesterday'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        assert response.status_code == 400
+
     def test_delete_event(self, authenticated_client):
         """
         Test event deletion.
@@ -197,6 +235,118 @@ class TestCalendarView:
         assert not HealthAndCycleFormModel.objects.filter(id=event.id).exists()
 
 
+@pytest.mark.django_db
+class TestCalendarDayColorsView:
+    """
+    Tests for the per-day phase colors of the calendar.
+    """
+    @pytest.fixture
+    def authenticated_client(self):
+        user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword123'
+        )
+        user_profile = UserProfile.objects.create(user=user)
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            date=date(2024, 1, 1),
+            event="Okres",
+            menstruation_phase_start=date(2024, 1, 1),
+            menstruation_phase_end=date(2024, 1, 5),
+            cycle_length=28
+        )
+        client = Client()
+        client.login(username='testuser', password='testpassword123')
+        return client, user_profile
+
+    @staticmethod
+    def _colors(client, start, end):
+        response = client.get(reverse('calendar_day_colors'), {'start': start, 'end': end})
+        assert response.status_code == 200
+        data = response.json()
+        first_day = date.fromisoformat(data['start'])
+        return {
+            first_day + timedelta(days=offset): data['colors'][phase] if phase is not None else None
+            for offset, phase in enumerate(data['phases'])
+        }
+
+    def test_matches_iter_cycle_phases(self, authenticated_client):
+        """
+        Test that the colors follow the phases laid out by iter_cycle_phases.
+        """
+        client, _ = authenticated_client
+        expected = {}
+        for cycle in iter_cycle_phases(date(2024, 1, 1), date(2024, 1, 5), 28, until=date(2024, 5, 6)):
+            for phase in cycle.values():
+                day = phase['start']
+                while day <= phase['end']:
+                    expected[day] = phase['color']
+                    day += timedelta(days=1)
+
+        colors = self._colors(client, '2023-12-25T00:00:00+01:00', '2024-05-06T00:00:00+02:00')
+        assert len(colors) == 133
+        assert colors == {day: expected.get(day) for day in colors}
+        assert colors[date(2024, 1, 29)] == 'red'
+
+    def test_logged_periods_reanchor_the_timeline(self, authenticated_client):
+        """
+        Test that a newer period moves the predicted phases and that its logged days are menstruation.
+        """
+        client, user_profile = authenticated_client
+        HealthAndCycleFormModel.objects.create(
+            user_profile=user_profile,
+            date=date(2024, 2, 2),
+            event="Okres",
+            menstruation_phase_start=date(2024, 2, 2),
+            menstruation_phase_end=date(2024, 2, 8),
+            cycle_length=30
+        )
+
+        colors = self._colors(client, '2024-03-01', '2024-04-01')
+        # Ovulation 13 days before the end of the 30-day cycle that started on 2024-03-03.
+        assert colors[date(2024, 3, 1)] == 'purple'
+        assert colors[date(2024, 3, 3)] == 'red'
+        assert colors[date(2024, 3, 19)] == 'green'
+        assert colors[date(2024, 3, 20)] == 'orange'
+        assert self._colors(client, '2024-02-01', '2024-02-10')[date(2024, 2, 8)] == 'red'
+
+    def test_ranges_share_the_phase_timeline(self, authenticated_client):
+        """
+        Test that the projection of a cycle is built once and reused by later ranges.
+        """
+        client, _ = authenticated_client
+        phase_timeline_cache.clear()
+        self._colors(client, '2024-03-01', '2024-04-01')
+        self._colors(client, '2024-04-01', '2024-05-01')
+        assert phase_timeline_cache.info()['misses'] == 1
+        assert phase_timeline_cache.info()['hits'] == 1
+
+    def test_long_range_far_ahead(self, authenticated_client):
+        """
+        Test that years after the last logged cycle are still projected.
+        """
+        client, _ = authenticated_client
+        colors = self._colors(client, '2030-01-01', '2039-12-31')
+        assert len(colors) == 3651
+        assert None not in colors.values()
+        assert colors[date(2024, 1, 1) + timedelta(days=28 * 200)] == 'red'
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'start': '2024-01-01'},
+        {'start': 'yesterday', 'end': '2024-02-01'},
+        {'start': '2024-02-01', 'end': '2024-01-01'},
+        {'start': '2020-01-01', 'end': '2034-01-01'},
+    ])
+    def test_invalid_range(self, authenticated_client, params):
+        """
+        Test that missing, malformed, reversed and too long ranges are rejected.
+        """
+        client, _ = authenticated_client
+        response = client.get(reverse('calendar_day_colors'), params)
+        assert response.status_code == 400
+
+
 @pytest.mark.django_db
 class TestCycleHealthFormView:
     """
@@ -241,6 +391,23 @@ class TestCycleHealthFormView:
             event='Test Event'
         ).exists()
 
+    def test_health_profile_is_stored_once(self, authenticated_client):
+        """
+        Test that allergies, medications and the health condition go to the user's health profile,
+        which prefills the form and is shown by the calendar.
+        """
+        client, user = authenticated_client
+        form_data = {'date': timezone.now().date(), 'event': 'Lekarz', 'allergies': 'Pyłki',
+                     'medications': 'Ibuprofen', 'health_condition': ''}
+
+        assert client.post(reverse('form'), form_data).status_code == 302
+        assert client.post(reverse('form'), {'date': timezone.now().date(), 'event': 'Notatka'}).status_code == 302
+
+        health_profile = HealthProfile.objects.get(user_profile__user=user)
+        assert (health_profile.allergies, health_profile.medications) == ('Pyłki', 'Ibuprofen')
+        assert client.get(reverse('form')).context['form'].initial['allergies'] == 'Pyłki'
+        assert client.get(reverse('calendar')).context['health_profile']['medications'] == 'Ibuprofen'
+
 
 @pytest.mark.django_db
 class TestStatisticsView:
@@ -299,3 +466,53 @@ class TestStatisticsView:
         response = client.get(reverse('export_statistics_pdf'))
         assert response.status_code == 200
         assert response['Content-Type'] == 'application/pdf'
+
+    def test_statistics_window(self, authenticated_client):
+        """
+        Test that the statistics cover the selected preset or custom window only.
+        """
+        client, user = authenticated_client
+        today = timezone.localdate()
+        for days_ago, symptom in ((2, 'Ból głowy'), (60, 'Zmęczenie')):
+            HealthAndCycleFormModel.objects.create(
+                user_profile=user.userprofile,
+                daily_symptoms=[symptom],
+                recorded_at=timezone.now() - timedelta(days=days_ago)
+            )
+
+        def labels(response):
+            return response.context['chart_data']['symptoms']['labels']
+
+        assert labels(client.get(reverse('statistics'))) == ['Zmęczenie', 'Ból głowy']
+        response = client.get(reverse('statistics'), {'window': '30d'})
+        assert labels(response) == ['Ból głowy']
+        assert response.context['window'].start == today - timedelta(days=29)
+        custom = {'window': 'custom', 'since': (today - timedelta(days=90)).isoformat(),
+                  'until': (today - timedelta(days=30)).isoformat()}
+        assert labels(client.get(reverse('statistics'), custom)) == ['Zmęczenie']
+
+    @pytest.mark.parametrize('params', [
+        {'window': '2w'},
+        {'since': 'wczoraj'},
+        {'since': '2025-02-01', 'until': '2025-01-01'},
+    ])
+    def test_invalid_statistics_window(self, authenticated_client, params):
+        """
+        Test that invalid windows are rejected by the page and the PDF export.
+        """
+        client, _ = authenticated_client
+        assert client.get(reverse('statistics'), params).status_code == 400
+        assert client.get(reverse('export_statistics_pdf'), params).status_code == 400
+
+    def test_pdf_export_is_stored_per_window(self, authenticated_client):
+        """
+        Test that reports of different windows are stored and served separately.
+        """
+        client, user = authenticated_client
+        client.get(reverse('export_statistics_pdf'), {'window': '30d'})
+        client.get(reverse('export_statistics_pdf'))
+        client.get(reverse('export_statistics_pdf'), {'window': '30d'})
+
+        today = timezone.localdate()
+        windows = StatisticsReportJob.objects.filter(user_profile=user.userprofile).values_list('window_start', flat=True)
+        assert sorted(windows) == [today - timedelta(days=364), today - timedelta(days=29)]
@@ -2,59 +2,385 @@
 This module contains utility functions for calculating menstrual cycle phases.
 """
 
-from datetime import timedelta
-
-def calculate_cycle_phases(menstruation_phase_start, menstruation_phase_end, cycle_length, months_to_predict=12):
-    """Calculate cycle phases with null safety checks."""
-    if not all((
-        menstruation_phase_start,
-        menstruation_phase_end,
-        cycle_length
-    )):
-        return []
-
-    try:
-        cycle_length = int(cycle_length)
-        menstruation_duration = (menstruation_phase_end - menstruation_phase_start).days + 1
-        phases = []
-
-        for month in range(months_to_predict):
-            cycle_start = menstruation_phase_start + timedelta(days=cycle_length * month)
-
-            current_menstruation_start = cycle_start
-            current_menstruation_end = current_menstruation_start + timedelta(days=menstruation_duration - 1)
-
-            follicular_start = current_menstruation_end + timedelta(days=1)
-            follicular_end = follicular_start + timedelta(days=(cycle_length - menstruation_duration - 14))
-
-            ovulation_start = follicular_end + timedelta(days=1)
-            ovulation_end = ovulation_start
-
-            luteal_start = ovulation_end + timedelta(days=1)
-            luteal_end = cycle_start + timedelta(days=cycle_length - 1)
-
-            phases.append({
-                'Menstruation': {
-                    'start': current_menstruation_start,
-                    'end': current_menstruation_end,
-                    'color': 'red'
-                },
-                'Follicular': {
-                    'start': follicular_start,
-                    'end': follicular_end,
-                    'color': 'green'
-                },
-                'Ovulation': {
-                    'start': ovulation_start,
-                    'end': ovulation_end,
-                    'color': 'orange'
-                },
-                'Luteal': {
-                    'start': luteal_start,
-                    'end': luteal_end,
-                    'color': 'purple'
-                }
-            })
-        return phases
-    except (TypeError, ValueError):
-        return []
+from collections import OrderedDict
+from datetime import date, timedelta
+from threading import Lock
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, the pure Python path gives the same results
+    np = None
+
+PHASE_NAMES = ('Menstruation', 'Follicular', 'Ovulation', 'Luteal')
+PHASE_COLORS = ('red', 'green', 'orange', 'purple')
+NO_PHASE = -1
+DEFAULT_PREDICTED_CYCLES = 12
+# Cycles a PhaseTimeline lays out when it is built, about two years; later ones are computed when asked for.
+PHASE_TIMELINE_CYCLES = 26
+
+
+def phase_index_for_offset(offset, menstruation_duration, cycle_length):
+    """
+    Return the index in PHASE_NAMES of the day ``offset`` days after the start of a cycle.
+
+    The layout matches iter_cycle_phases: menstruation lasts ``menstruation_duration`` days,
+    ovulation falls 13 days before the end of the cycle, follicular fills the gap before it
+    and luteal the days after it.
+    """
+    if offset < menstruation_duration:
+        return 0
+    if offset <= cycle_length - 14:
+        return 1
+    if offset == cycle_length - 13:
+        return 2
+    return 3
+
+
+def _classify_python(ordinals, anchors, durations, cycle_lengths, cycles):
+    """Pure Python fallback of classify_phases."""
+    result = []
+    for ordinal, anchor, duration, cycle_length in zip(ordinals, anchors, durations, cycle_lengths):
+        if not (anchor and duration > 0 and cycle_length > 0):
+            result.append(NO_PHASE)
+            continue
+        days = ordinal - anchor
+        if days < 0 or (cycles is not None and days // cycle_length >= cycles):
+            result.append(NO_PHASE)
+            continue
+        result.append(phase_index_for_offset(days % cycle_length, duration, cycle_length))
+    return result
+
+
+def classify_phases(ordinals, anchors, durations, cycle_lengths, cycles=DEFAULT_PREDICTED_CYCLES):
+    """
+    Classify many days in one pass.
+
+    All arguments are equally long sequences of integers: the day ordinal to classify, the ordinal
+    of the first day of the anchor cycle, the menstruation duration and the cycle length. Rows with
+    missing cycle data (zero anchor, duration or length) and days outside the ``cycles`` predicted
+    cycles get NO_PHASE. Returns a list of PHASE_NAMES indexes.
+    """
+    if np is None:
+        return _classify_python(ordinals, anchors, durations, cycle_lengths, cycles)
+
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    anchors = np.asarray(anchors, dtype=np.int64)
+    durations = np.asarray(durations, dtype=np.int64)
+    cycle_lengths = np.asarray(cycle_lengths, dtype=np.int64)
+
+    valid = (anchors > 0) & (durations > 0) & (cycle_lengths > 0)
+    safe_lengths = np.where(valid, cycle_lengths, 1)
+    days = ordinals - anchors
+    valid &= days >= 0
+    if cycles is not None:
+        valid &= days // safe_lengths < cycles
+    offsets = days % safe_lengths
+
+    phases = np.select(
+        [offsets < durations, offsets <= cycle_lengths - 14, offsets == cycle_lengths - 13],
+        [0, 1, 2],
+        default=3
+    )
+    return np.where(valid, phases, NO_PHASE).tolist()
+
+
+class CyclePhaseClassifier:
+    """
+    Answers "which phase is this day in" for a single cycle anchor by modular arithmetic.
+    """
+    __slots__ = ('anchor', 'menstruation_duration', 'cycle_length', 'cycles')
+
+    def __init__(self, anchor, menstruation_duration, cycle_length, cycles=DEFAULT_PREDICTED_CYCLES):
+        self.anchor = anchor
+        self.menstruation_duration = menstruation_duration
+        self.cycle_length = cycle_length
+        self.cycles = cycles
+
+    @classmethod
+    def from_menstruation(cls, menstruation_phase_start, menstruation_phase_end, cycle_length,
+                          cycles=DEFAULT_PREDICTED_CYCLES):
+        """
+        Build a classifier from the menstruation boundaries, or return None when the data is incomplete.
+        """
+        if not all((menstruation_phase_start, menstruation_phase_end, cycle_length)):
+            return None
+        try:
+            cycle_length = int(cycle_length)
+            menstruation_duration = (menstruation_phase_end - menstruation_phase_start).days + 1
+        except (TypeError, ValueError):
+            return None
+        if cycle_length < 1 or menstruation_duration < 1:
+            return None
+        return cls(menstruation_phase_start, menstruation_duration, cycle_length, cycles)
+
+    def _days_since_anchor(self, day: date):
+        days = (day - self.anchor).days
+        if days < 0 or (self.cycles is not None and days // self.cycle_length >= self.cycles):
+            return None
+        return days
+
+    def phase_index(self, day: date) -> int:
+        """Return the PHASE_NAMES index for ``day`` or NO_PHASE."""
+        days = self._days_since_anchor(day)
+        if days is None:
+            return NO_PHASE
+        return phase_index_for_offset(days % self.cycle_length, self.menstruation_duration, self.cycle_length)
+
+    def phase_for(self, day: date) -> str | None:
+        """Return the phase name for ``day``."""
+        index = self.phase_index(day)
+        return PHASE_NAMES[index] if index != NO_PHASE else None
+
+    def color_for(self, day: date) -> str | None:
+        """Return the calendar color for ``day``."""
+        index = self.phase_index(day)
+        return PHASE_COLORS[index] if index != NO_PHASE else None
+
+    def phase_indexes(self, days):
+        """Classify an iterable of dates in a single vectorized pass."""
+        ordinals = [day.toordinal() for day in days]
+        count = len(ordinals)
+        return classify_phases(
+            ordinals,
+            [self.anchor.toordinal()] * count,
+            [self.menstruation_duration] * count,
+            [self.cycle_length] * count,
+            self.cycles
+        )
+
+    def cycle_day(self, day: date) -> int | None:
+        """Return the 1-based day of the cycle ``day`` falls in."""
+        days = (day - self.anchor).days
+        if days < 0:
+            return None
+        return days % self.cycle_length + 1
+
+    def next_cycle_start(self, day: date) -> date:
+        """Return the first cycle start strictly after ``day``."""
+        days = (day - self.anchor).days
+        completed_cycles = days // self.cycle_length
+        return self.anchor + timedelta(days=(completed_cycles + 1) * self.cycle_length)
+
+
+def _cycle_bounds(anchor, menstruation_duration, cycle_length, cycle):
+    """
+    Return the eight boundary ordinals of the ``cycle``-th cycle after the one starting on ordinal ``anchor``.
+    """
+    cycle_start = anchor + cycle_length * cycle
+    menstruation_end = cycle_start + menstruation_duration - 1
+    follicular_end = menstruation_end + 1 + cycle_length - menstruation_duration - 14
+    ovulation = follicular_end + 1
+    return (
+        cycle_start, menstruation_end,
+        menstruation_end + 1, follicular_end,
+        ovulation, ovulation,
+        ovulation + 1, cycle_start + cycle_length - 1,
+    )
+
+
+def _phase_dict(bounds):
+    from_ordinal = date.fromordinal
+    return {
+        name: {
+            'start': from_ordinal(bounds[2 * index]),
+            'end': from_ordinal(bounds[2 * index + 1]),
+            'color': PHASE_COLORS[index]
+        }
+        for index, name in enumerate(PHASE_NAMES)
+    }
+
+
+class PhaseTimeline:
+    """
+    Phase layout of consecutive cycles from one anchor, stored as day ordinals.
+
+    Every cycle is one tuple of eight ordinals: start and end of menstruation, follicular, ovulation and luteal
+    phases, in PHASE_NAMES order. The first ``cycles`` tuples are built once, the ones after them on demand.
+    """
+    __slots__ = ('anchor', 'menstruation_duration', 'cycle_length', 'cycles')
+
+    def __init__(self, anchor, menstruation_duration, cycle_length, cycles=PHASE_TIMELINE_CYCLES):
+        start = anchor.toordinal()
+        self.anchor = start
+        self.menstruation_duration = menstruation_duration
+        self.cycle_length = cycle_length
+        self.cycles = tuple(
+            _cycle_bounds(start, menstruation_duration, cycle_length, cycle) for cycle in range(cycles)
+        )
+
+    def __len__(self):
+        return len(self.cycles)
+
+    def bounds(self, cycle):
+        """Return the eight boundary ordinals of the ``cycle``-th cycle."""
+        if cycle < len(self.cycles):
+            return self.cycles[cycle]
+        return _cycle_bounds(self.anchor, self.menstruation_duration, self.cycle_length, cycle)
+
+    def iter_bounds(self, since=None, until=None):
+        """
+        Yield the boundaries of consecutive cycles, from the one containing ordinal ``since`` to the one
+        containing ordinal ``until``. Cycles before the anchor are never projected.
+        """
+        cycle = 0 if since is None else max(0, (since - self.anchor) // self.cycle_length)
+        while True:
+            bounds = self.bounds(cycle)
+            if until is not None and bounds[0] > until:
+                return
+            yield bounds
+            cycle += 1
+
+    def phase_index(self, day: date) -> int:
+        """Return the PHASE_NAMES index for ``day`` or NO_PHASE before the anchor."""
+        days = day.toordinal() - self.anchor
+        if days < 0:
+            return NO_PHASE
+        return phase_index_for_offset(days % self.cycle_length, self.menstruation_duration, self.cycle_length)
+
+    def color_for(self, day: date) -> str | None:
+        """Return the calendar color for ``day``."""
+        index = self.phase_index(day)
+        return PHASE_COLORS[index] if index != NO_PHASE else None
+
+
+class PhaseTimelineCache:
+    """
+    Bounded LRU cache of PhaseTimeline objects keyed on the menstruation start, end and cycle length.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(menstruation_phase_start, menstruation_phase_end, cycle_length):
+        """Normalize the arguments into a cache key, or return None when they cannot form a timeline."""
+        if not all((menstruation_phase_start, menstruation_phase_end, cycle_length)):
+            return None
+        try:
+            cycle_length = int(cycle_length)
+            menstruation_duration = (menstruation_phase_end - menstruation_phase_start).days + 1
+        except (TypeError, ValueError):
+            return None
+        if cycle_length < 1 or menstruation_duration < 1:
+            return None
+        return menstruation_phase_start, menstruation_phase_end, cycle_length
+
+    def get(self, menstruation_phase_start, menstruation_phase_end, cycle_length):
+        """Return the cached timeline, building it on a miss."""
+        key = self.make_key(menstruation_phase_start, menstruation_phase_end, cycle_length)
+        if key is None:
+            return None
+        with self._lock:
+            timeline = self._entries.get(key)
+            if timeline is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return timeline
+            self.misses += 1
+
+        start, end, cycle_length = key
+        try:
+            timeline = PhaseTimeline(start, (end - start).days + 1, cycle_length)
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+        with self._lock:
+            self._entries[key] = timeline
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return timeline
+
+    def discard(self, menstruation_phase_start):
+        """
+        Evict every timeline anchored on ``menstruation_phase_start``, whatever its end and cycle length, since
+        the cycles of several entries starting that day are merged.
+        """
+        if not menstruation_phase_start:
+            return 0
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == menstruation_phase_start]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+phase_timeline_cache = PhaseTimelineCache()
+
+
+def get_phase_timeline(menstruation_phase_start, menstruation_phase_end, cycle_length):
+    """Return the shared cached PhaseTimeline for a cycle, or None when the data is incomplete."""
+    return phase_timeline_cache.get(menstruation_phase_start, menstruation_phase_end, cycle_length)
+
+
+def iter_cycle_phases(menstruation_phase_start, menstruation_phase_end, cycle_length, since=None, until=None):
+    """
+    Lazily yield the phases of consecutive cycles as ``{phase name: {'start', 'end', 'color'}}`` dicts.
+
+    Seeks directly to the cycle containing the date ``since`` (the first cycle by default) and stops after the
+    cycle containing ``until``. Without ``until`` the projection never ends: take what is needed with
+    itertools.islice or stop iterating. Yields nothing when the cycle data is incomplete. The layout comes from the
+    shared phase_timeline_cache.
+    """
+    timeline = get_phase_timeline(menstruation_phase_start, menstruation_phase_end, cycle_length)
+    if timeline is None:
+        return
+    since = since.toordinal() if since else None
+    until = until.toordinal() if until else None
+    for bounds in timeline.iter_bounds(since, until):
+        yield _phase_dict(bounds)
+
+
+def classify_days(first_day, last_day, cycles):
+    """
+    Return the PHASE_NAMES index (or NO_PHASE) of every day from ``first_day`` to ``last_day`` inclusive.
+
+    ``cycles`` are (menstruation_phase_start, menstruation_phase_end, cycle_length) tuples sorted by start.
+    Logged menstruation days are always Menstruation; any other day is classified on the projection of the latest
+    complete cycle started before it, taken from iter_cycle_phases. Projections seek to the first cycle of the
+    range, so a range years after the last logged cycle costs as much as a near one.
+    """
+    first, last = first_day.toordinal(), last_day.toordinal()
+    phases = [NO_PHASE] * (last - first + 1)
+    cycles = list(cycles)
+    complete = [cycle for cycle in cycles if PhaseTimelineCache.make_key(*cycle) is not None]
+
+    for index, cycle in enumerate(complete):
+        segment_start = max(cycle[0].toordinal(), first)
+        segment_end = min(complete[index + 1][0].toordinal() - 1, last) if index + 1 < len(complete) else last
+        if segment_start > segment_end:
+            continue
+        projection = iter_cycle_phases(*cycle, since=date.fromordinal(segment_start),
+                                       until=date.fromordinal(segment_end))
+        for cycle_phases in projection:
+            # Later phases first, so that an earlier phase wins where a short cycle makes them overlap,
+            # like in phase_index_for_offset.
+            for phase in reversed(range(len(PHASE_NAMES))):
+                window = cycle_phases[PHASE_NAMES[phase]]
+                for ordinal in range(max(window['start'].toordinal(), segment_start),
+                                     min(window['end'].toordinal(), segment_end) + 1):
+                    phases[ordinal - first] = phase
+
+    for start, end, _ in cycles:
+        end = max(end or start, start)
+        for ordinal in range(max(start.toordinal(), first), min(end.toordinal(), last) + 1):
+            phases[ordinal - first] = 0
+    return phases
@@ -2,33 +2,112 @@
 This file contains the views for the application period_app.
 """
 
+import csv
+import json
 from datetime import datetime, timedelta
+from io import BytesIO, TextIOWrapper
 from typing import Dict, Any
-from io import BytesIO
-from collections import defaultdict
 
 from django.views import View
 from django.views.generic.edit import FormView
 from django.views.generic import CreateView, TemplateView
 from django.contrib.auth.views import LogoutView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponseBadRequest, HttpResponse
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.utils import timezone
-from django.utils.timezone import now
+from django.utils.dateparse import parse_date
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import Q, Subquery
+
+from .caching import get_or_compute
+from .forms import UserLoginForm, HealthAndCycleForm, CustomUserCreationForm, BulkImportForm
+from .exporters import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, export_queryset, stream_export
+from .importers import ImportFormatError, detect_format, import_entries, read_rows
+from .cycle_info import DEFAULT_PERIOD_LENGTH, refresh_cycle_info
+from .jobs import enqueue_report, find_report, resume_stale_job, store_report
+from .models import (
+    Cycle,
+    HealthAndCycleFormModel,
+    HealthProfile,
+    StatisticsReportJob,
+    UserProfile,
+)
+from .normalization import HEALTH_PROFILE_FIELDS, save_health_profile
+from .predictions import predicted_cycle_length, predicted_period_length, update_forecast
+from .reports import render_statistics_pdf
+from .stats import rollup_statistics, statistics_window
+from .utils import (
+    CyclePhaseClassifier,
+    PHASE_COLORS,
+    PHASE_NAMES,
+    NO_PHASE,
+    classify_days,
+    classify_phases,
+    phase_index_for_offset,
+)
+
+
+CALENDAR_EVENT_FIELDS = (
+    'id', 'event', 'date', 'cycle_length', 'period_length', 'last_period_start',
+    'menstruation_phase_start', 'menstruation_phase_end', 'average_pain_level',
+    'daily_mood', 'daily_symptoms',
+)
+# Ten years, for long-term planning views; the projections behind the colors are generated lazily.
+MAX_DAY_COLORS_RANGE = 3653
+
+
+def _health_profile(user_profile):
+    """
+    Returns the user's allergies, medications and health condition, empty when they never gave any.
+    """
+    return (HealthProfile.objects
+            .filter(user_profile=user_profile)
+            .values(*HEALTH_PROFILE_FIELDS)
+            .first()) or {}
+
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.units import inch
+def _parse_window_date(value):
+    """
+    Parses a FullCalendar range boundary (``2025-01-26`` or ``2025-01-26T00:00:00+01:00``) into a date.
+    """
+    if not value:
+        return None
+    parsed = parse_date(value[:10])
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value}")
+    return parsed
 
-from .forms import UserLoginForm, HealthAndCycleForm, CustomUserCreationForm
-from .models import HealthAndCycleFormModel, UserProfile
-from .utils import calculate_cycle_phases
+
+def _statistics_window(params):
+    """
+    Returns the StatisticsWindow selected by the ``window``, ``since`` and ``until`` query parameters.
+
+    Raises ValueError for malformed dates, unknown presets and empty ranges.
+    """
+    return statistics_window(
+        params.get('window') or None,
+        _parse_window_date(params.get('since')),
+        _parse_window_date(params.get('until'))
+    )
+
+
+def _isoformat(value):
+    """
+    Returns the ISO representation of a date or None.
+    """
+    return value.isoformat() if value else None
 
 
 class RegisterView(CreateView):
@@ -88,14 +167,27 @@ class Home(LoginRequiredMixin, View):
         """Handle GET request and display cycle information."""
         try:
             user_profile = request.user.userprofile
-            cycle_info = self._get_current_cycle_info(user_profile)
         except AttributeError:
             return render(request, self.template_name, {'error': 'User profile not found'})
 
+        # The cached cycle state and the prediction in one primary key lookup joined with both.
+        summary = (UserProfile.objects
+                   .select_related('cycle_info', 'cycle_prediction')
+                   .get(pk=user_profile.pk))
+        cycle_state = self._related_or_none(summary, 'cycle_info')
+        if cycle_state is None:
+            cycle_state = refresh_cycle_info(user_profile.pk)
+
+        prediction = self._related_or_none(summary, 'cycle_prediction')
+        cycle_info = self._get_current_cycle_info(cycle_state, prediction)
         if not cycle_info:
             return render(request, self.template_name, {'error': 'Brak danych o cyklu'})
 
-        current_phase = self._get_phase_for_day(cycle_info['cycle_day'], cycle_info['cycle_length'])
+        current_phase = self._get_phase_for_day(
+            cycle_info['cycle_day'],
+            cycle_info['cycle_length'],
+            cycle_info['period_length']
+        )
         hormone_levels = self._get_hormone_levels(current_phase)
         phase_info = self._get_phase_description(current_phase)
         next_period = self._predict_next_period(cycle_info)
@@ -105,64 +197,77 @@ class Home(LoginRequiredMixin, View):
             'current_phase': current_phase,
             'hormone_levels': hormone_levels,
             'phase_info': phase_info,
-            'next_period': next_period
+            'next_period': next_period,
+            'next_period_range': cycle_info.get('next_period_range'),
+            'ovulation_window': cycle_info.get('ovulation_window'),
         }
 
         return render(request, self.template_name, context)
 
     @staticmethod
-    def _get_current_cycle_info(user_profile) -> Dict[str, Any] | None:
+    def _related_or_none(user_profile, name):
+        """Return the one-to-one row of the profile loaded by select_related, or None when it does not exist."""
+        try:
+            return getattr(user_profile, name)
+        except ObjectDoesNotExist:
+            return None
+
+    @staticmethod
+    def _get_current_cycle_info(cycle_state, prediction=None) -> Dict[str, Any] | None:
         """
         Retrieve the current cycle information.
-        """
-        latest_period_entry = (HealthAndCycleFormModel.objects
-                               .filter(
-            user_profile=user_profile,
-            menstruation_phase_start__isnull=False
-        )
-                               .order_by('-menstruation_phase_start')
-                               .first())
 
-        if not latest_period_entry:
+        The user's observed cycle history (CyclePrediction) is preferred; without it the values of the
+        latest entry cached in StatisticsCycleInfo are used.
+        """
+        if prediction is not None and prediction.last_period_start:
+            update_forecast(prediction)
+            cycle_length = predicted_cycle_length(prediction)
+            period_length = (predicted_period_length(prediction)
+                             or (cycle_state and cycle_state.period_length)
+                             or DEFAULT_PERIOD_LENGTH)
+            classifier = CyclePhaseClassifier(prediction.last_period_start, period_length, cycle_length)
+            current_cycle_day = classifier.cycle_day(datetime.now().date())
+            if current_cycle_day is None:
+                return None
+            return {
+                'cycle_day': current_cycle_day,
+                'cycle_length': cycle_length,
+                'first_day': prediction.last_period_start,
+                'period_length': period_length,
+                'next_period': prediction.next_period_start,
+                'next_period_range': (prediction.next_period_earliest, prediction.next_period_latest),
+                'ovulation_window': (prediction.ovulation_window_start, prediction.ovulation_window_end),
+            }
+
+        if not cycle_state or not cycle_state.menstruation_phase_start:
             return None
 
-        today = datetime.now().date()
-        start_date = latest_period_entry.menstruation_phase_start
-        cycle_length = latest_period_entry.cycle_length or 28
-        days_since_start = (today - start_date).days
+        classifier = CyclePhaseClassifier(
+            cycle_state.menstruation_phase_start,
+            cycle_state.period_length,
+            cycle_state.cycle_length
+        )
+        current_cycle_day = classifier.cycle_day(datetime.now().date())
 
-        if days_since_start < 0:
+        if current_cycle_day is None:
             return None
 
-        current_cycle_day = (days_since_start % cycle_length) + 1
-        first_day = latest_period_entry.first_day_of_cycle or start_date
-
         return {
             'cycle_day': current_cycle_day,
-            'cycle_length': cycle_length,
-            'first_day': first_day,
-            'period_length': latest_period_entry.period_length or 6,
+            'cycle_length': cycle_state.cycle_length,
+            'first_day': cycle_state.first_day_of_cycle,
+            'period_length': cycle_state.period_length,
+            'next_period': cycle_state.predicted_next_period,
         }
 
     @staticmethod
-    def _get_phase_for_day(cycle_day: int, cycle_length: int) -> str:
+    def _get_phase_for_day(cycle_day: int, cycle_length: int, period_length: int = 6) -> str:
         """
-        Determine cycle phase for given day.
+        Determine cycle phase for given day using the same layout as the calendar.
         """
-        phase_lengths = {
-            'menstruation': 6,
-            'follicular': 9,
-            'ovulation': 1,
-            'luteal': cycle_length - 19
-        }
-
-        if cycle_day <= phase_lengths['menstruation']:
-            return 'menstruation'
-        if cycle_day <= phase_lengths['menstruation'] + phase_lengths['follicular']:
-            return 'follicular'
-        if cycle_day <= phase_lengths['menstruation'] + phase_lengths['follicular'] + phase_lengths['ovulation']:
-            return 'ovulation'
-        return 'luteal'
+        phase_index = phase_index_for_offset(cycle_day - 1, period_length, cycle_length)
+        return PHASE_NAMES[phase_index].lower()
 
     @staticmethod
     def _get_hormone_levels(phase: str) -> Dict[str, float]:
@@ -242,13 +347,16 @@ class Home(LoginRequiredMixin, View):
         if not cycle_info or not cycle_info.get('first_day'):
             return None
 
-        first_day = cycle_info['first_day']
-        cycle_length = cycle_info['cycle_length']
-        days_since_start = (datetime.now().date() - first_day).days
-        completed_cycles = days_since_start // cycle_length
-        next_period = first_day + timedelta(days=(completed_cycles + 1) * cycle_length)
+        today = datetime.now().date()
+        if cycle_info.get('next_period') and cycle_info['next_period'] > today:
+            return cycle_info['next_period']
 
-        return next_period
+        classifier = CyclePhaseClassifier(
+            cycle_info['first_day'],
+            cycle_info['period_length'],
+            cycle_info['cycle_length']
+        )
+        return classifier.next_cycle_start(today)
 
 
 class CalendarView(LoginRequiredMixin, TemplateView):
@@ -264,7 +372,8 @@ class CalendarView(LoginRequiredMixin, TemplateView):
         """
         if request.headers.get('x-requested-with') == 'XMLHttpRequest': #aktualny zalecany sposob sprawdzania żądań AJAX, to samo mam w js
             return self.get_events(request)
-        return render(request, self.template_name)
+        # Shown with every event, but stored and sent once per user.
+        return render(request, self.template_name, {'health_profile': _health_profile(request.user.userprofile)})
 
     def post(self, request):
         """
@@ -278,54 +387,71 @@ class CalendarView(LoginRequiredMixin, TemplateView):
     @staticmethod
     def get_events(request):
         """
-        Retrieves and processes menstrual cycle events.
+        Retrieves and processes menstrual cycle events for the requested date window.
+
+        FullCalendar sends ``start`` (inclusive) and ``end`` (exclusive) with every fetch, so only
+        the visible range is loaded from the database. Without the parameters the whole history is returned.
+        The serialized feed is cached per user and window until the user's entries change.
         """
         try:
             user_profile = request.user.userprofile
-            events = HealthAndCycleFormModel.objects.filter(user_profile=user_profile)
         except AttributeError:
             return JsonResponse({"error": "User profile not found"}, status=400)
-        events_data = []
 
+        try:
+            window_start = _parse_window_date(request.GET.get('start'))
+            window_end = _parse_window_date(request.GET.get('end'))
+        except ValueError:
+            return JsonResponse({"error": "Invalid date range"}, status=400)
+
+        payload = get_or_compute(
+            'calendar', user_profile, (window_start, window_end),
+            lambda: json.dumps(CalendarView._build_events(user_profile, window_start, window_end),
+                               cls=DjangoJSONEncoder)
+        )
+        return HttpResponse(payload, content_type='application/json')
+
+    @staticmethod
+    def _build_events(user_profile, window_start, window_end):
+        """
+        Loads the user's entries in the window and converts them into FullCalendar events.
+        """
+        events = HealthAndCycleFormModel.objects.filter(user_profile=user_profile, date__isnull=False)
+        if window_start:
+            events = events.filter(date__gte=window_start)
+        if window_end:
+            events = events.filter(date__lt=window_end)
+        events = events.order_by('date', 'id').values(*CALENDAR_EVENT_FIELDS)
+
+        events = list(events)
+        ordinals, anchors, durations, cycle_lengths = [], [], [], []
         for event in events:
-            phases = calculate_cycle_phases(event.menstruation_phase_start, event.menstruation_phase_end,
-                                            event.cycle_length)
-            event_date = datetime.combine(event.date, datetime.min.time())
-            event_color = None
-            _menstruation_start = datetime.combine(event.menstruation_phase_start,
-                                                  datetime.min.time()) if event.menstruation_phase_start else None
-            _menstruation_end = datetime.combine(event.menstruation_phase_end,
-                                                datetime.min.time()) if event.menstruation_phase_end else None
-            for phase_set in phases:
-                for phase_name, phase_info in phase_set.items():
-                    if phase_info['start'] <= event_date.date() <= phase_info['end']:
-                        event_color = phase_info['color']
-                        break
+            start = event['menstruation_phase_start']
+            end = event['menstruation_phase_end']
+            ordinals.append(event['date'].toordinal())
+            anchors.append(start.toordinal() if start and end else 0)
+            durations.append((end - start).days + 1 if start and end else 0)
+            cycle_lengths.append(event['cycle_length'] or 0)
+        phase_indexes = classify_phases(ordinals, anchors, durations, cycle_lengths)
 
+        events_data = []
+        for event, phase_index in zip(events, phase_indexes):
             events_data.append({
-                "id": event.id,
-                "title": event.event,
-                "start": event.date.strftime('%Y-%m-%d'),
-                "color": event_color,
-                "first_day_of_cycle": event.first_day_of_cycle.strftime(
-                    '%Y-%m-%d') if event.first_day_of_cycle else None,
-                "cycle_length": event.cycle_length,
-                "period_length": event.period_length,
-                "last_period_start": event.last_period_start.strftime('%Y-%m-%d') if event.last_period_start else None,
-                "menstruation_phase_start": event.menstruation_phase_start.strftime(
-                    '%Y-%m-%d') if event.menstruation_phase_start else None,
-                "menstruation_phase_end": event.menstruation_phase_end.strftime(
-                    '%Y-%m-%d') if event.menstruation_phase_end else None,
-                "average_pain_level": event.average_pain_level,
-                "daily_mood": event.daily_mood,
-                "daily_symptoms": event.daily_symptoms,
-                "allergies": event.allergies,
-                "medications": event.medications,
-                "health_condition": event.health_condition,
+                "id": event['id'],
+                "title": event['event'],
+                "start": event['date'].isoformat(),
+                "color": PHASE_COLORS[phase_index] if phase_index != NO_PHASE else None,
+                "cycle_length": event['cycle_length'],
+                "period_length": event['period_length'],
+                "last_period_start": _isoformat(event['last_period_start']),
+                "menstruation_phase_start": _isoformat(event['menstruation_phase_start']),
+                "menstruation_phase_end": _isoformat(event['menstruation_phase_end']),
+                "average_pain_level": event['average_pain_level'],
+                "daily_mood": event['daily_mood'],
+                "daily_symptoms": event['daily_symptoms'],
             })
 
-        return JsonResponse(events_data, safe=False)
-
+        return events_data
 
     @staticmethod
     def delete_event(request):
@@ -334,16 +460,69 @@ class CalendarView(LoginRequiredMixin, TemplateView):
         """
         event_id = request.POST.get('event_id')
         try:
-            event = HealthAndCycleFormModel.objects.get(
-                id=event_id,
-                user_profile=request.user.userprofile
-            )
-            event.delete()
+            with transaction.atomic():
+                event = HealthAndCycleFormModel.objects.get(
+                    id=event_id,
+                    user_profile=request.user.userprofile
+                )
+                event.delete()
             return JsonResponse({"message": "Event deleted"})
         except HealthAndCycleFormModel.DoesNotExist:
             return JsonResponse({"error": "Event not found"}, status=404)
 
 
+class CalendarDayColorsView(LoginRequiredMixin, View):
+    """
+    Returns the cycle phase of every day in a date range, so the calendar colors a whole view with one request.
+    """
+    redirect_field_name = 'next'
+
+    def get(self, request):
+        """
+        Responds with ``{"start": ..., "phases": [...], "names": [...], "colors": [...]}``.
+
+        ``start`` (inclusive) and ``end`` (exclusive) are required, as sent by FullCalendar. ``phases`` holds
+        one index into ``names`` and ``colors`` per day from ``start``, or null for days without a phase.
+        """
+        try:
+            start = _parse_window_date(request.GET.get('start'))
+            end = _parse_window_date(request.GET.get('end'))
+        except ValueError:
+            return JsonResponse({"error": "Invalid date range"}, status=400)
+        if start is None or end is None or not 0 < (end - start).days <= MAX_DAY_COLORS_RANGE:
+            return JsonResponse({"error": "Invalid date range"}, status=400)
+
+        user_profile = request.user.userprofile
+        payload = get_or_compute(
+            'day_colors', user_profile, (start, end),
+            lambda: json.dumps(self._build_day_colors(user_profile, start, end))
+        )
+        return HttpResponse(payload, content_type='application/json')
+
+    @staticmethod
+    def _build_day_colors(user_profile, start, end):
+        """
+        Classifies the days of the range from the cycles overlapping it and the latest complete cycle before it.
+        """
+        latest_complete = (Cycle.objects
+                           .filter(user_profile=user_profile, start_date__lt=start,
+                                   end_date__isnull=False, cycle_length__isnull=False)
+                           .order_by('-start_date')
+                           .values('pk')[:1])
+        cycles = (Cycle.objects
+                  .filter(user_profile=user_profile, start_date__lt=end)
+                  .filter(Q(start_date__gte=start) | Q(end_date__gte=start) | Q(pk__in=Subquery(latest_complete)))
+                  .order_by('start_date')
+                  .values_list('start_date', 'end_date', 'cycle_length'))
+        phases = classify_days(start, end - timedelta(days=1), cycles)
+        return {
+            "start": start.isoformat(),
+            "phases": [phase if phase != NO_PHASE else None for phase in phases],
+            "names": PHASE_NAMES,
+            "colors": PHASE_COLORS,
+        }
+
+
 class CycleHealthFormView(LoginRequiredMixin, View):
     """
     View for displaying and submitting the health and cycle form.
@@ -356,7 +535,7 @@ class CycleHealthFormView(LoginRequiredMixin, View):
         Handles GET requests to render the health and cycle form.
         """
         selected_date = timezone.now().date()
-        form = HealthAndCycleForm(initial={'date': selected_date})
+        form = HealthAndCycleForm(initial={'date': selected_date, **_health_profile(request.user.userprofile)})
         return render(request, self.template_name, {'form': form})
 
     def post(self, request):
@@ -368,7 +547,9 @@ class CycleHealthFormView(LoginRequiredMixin, View):
             try:
                 form.instance.user_profile = request.user.userprofile
                 form.instance.recorded_at = timezone.now()
-                form.save()
+                with transaction.atomic():
+                    form.save()
+                    save_health_profile(form.instance.user_profile_id, form.health_profile_values())
                 messages.success(request, "Form saved.")
                 return redirect('calendar')
             except Exception as e:
@@ -376,62 +557,71 @@ class CycleHealthFormView(LoginRequiredMixin, View):
         return render(request, self.template_name, {'form': form})
 
 
+class BulkImportView(LoginRequiredMixin, View):
+    """
+    View for importing historical cycle entries from a CSV or JSON file.
+    """
+    template_name = 'import.html'
+    redirect_field_name = 'next'
+
+    def get(self, request):
+        """
+        Handles GET requests to render the upload form.
+        """
+        return render(request, self.template_name, {'form': BulkImportForm()})
+
+    def post(self, request):
+        """
+        Handles POST requests to validate and save the uploaded entries.
+        """
+        form = BulkImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, self.template_name, {'form': form})
+
+        upload = form.cleaned_data['file']
+        import_format = form.cleaned_data['file_format'] or detect_format(upload.name)
+        try:
+            rows = read_rows(TextIOWrapper(upload, encoding='utf-8-sig'), import_format)
+            result = import_entries(request.user.userprofile, rows, strict=form.cleaned_data['strict'])
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            form.add_error('file', str(e))
+            return render(request, self.template_name, {'form': form})
+
+        if result.created:
+            messages.success(request, f"Imported {result.created} entries.")
+        return render(request, self.template_name, {'form': BulkImportForm(), 'result': result})
+
+
 class StatisticsView(LoginRequiredMixin, TemplateView):
     """
     View for displaying user statistics related to menstrual cycle tracking.
     """
     template_name = 'statistics.html'
+    window = None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handles GET requests, answering 400 for an invalid ``window``, ``since`` or ``until`` parameter.
+        """
+        try:
+            self.window = _statistics_window(request.GET)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return super().get(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         """
         Retrieves and processes menstrual cycle-related data for the authenticated user.
         """
         context = super().get_context_data(**kwargs)
-        user_profile = UserProfile.objects.get(user=self.request.user)
-        today = now().date()
-        one_year_ago = today - timedelta(days=365)
-
-        forms = HealthAndCycleFormModel.objects.filter(
-            user_profile=user_profile,
-            recorded_at__date__gte=one_year_ago
-        ).order_by('recorded_at')
-
-        symptom_data = defaultdict(list)
-        for form in forms:
-            date_str = form.recorded_at.strftime('%Y-%m-%d')
-            for symptom in form.daily_symptoms:
-                symptom_data[symptom].append(date_str)
-
-        mood_data = defaultdict(list)
-        for form in forms:
-            date_str = form.recorded_at.strftime('%Y-%m-%d')
-            for mood in form.daily_mood:
-                mood_data[mood].append(date_str)
-
-        pain_data = defaultdict(list)
-        for form in forms:
-            date_str = form.recorded_at.strftime('%Y-%m-%d')
-            if form.average_pain_level:
-                pain_level = int(form.average_pain_level)
-                pain_data[pain_level].append(date_str)
-
-        context['chart_data'] = {
-            'symptoms': {
-                'labels': list(symptom_data.keys()),
-                'data': [len(dates) for dates in symptom_data.values()],
-                'dates': list(symptom_data.values())
-            },
-            'moods': {
-                'labels': list(mood_data.keys()),
-                'data': [len(dates) for dates in mood_data.values()],
-                'dates': list(mood_data.values())
-            },
-            'pain_levels': {
-                'labels': list(map(str, pain_data.keys())),
-                'data': [len(dates) for dates in pain_data.values()],
-                'dates': list(pain_data.values())
-            }
-        }
+        user_profile = self.request.user.userprofile
+        window = self.window
+        context['chart_data'] = get_or_compute(
+            'statistics', user_profile, (window.start, window.end),
+            lambda: rollup_statistics(user_profile, window).chart_data()
+        )
+        context['window'] = window
+        context['window_query'] = self.request.GET.urlencode()
         return context
 
 
@@ -442,115 +632,138 @@ class ExportStatisticsPDFView(LoginRequiredMixin, View):
 
     def get(self, request):
         """
-        Handles GET requests to generate a PDF report of user statistics.
+        Handles GET requests to download a PDF report of user statistics.
+
+        The report covers the same ``window``, ``since`` and ``until`` parameters as the statistics page. A report
+        already generated for the current data and window is served as is, otherwise it is built and stored.
         """
+        try:
+            window = _statistics_window(request.GET)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
         user_profile = request.user.userprofile
-        today = now().date()
-        one_year_ago = today - timedelta(days=365)
-
-        forms = HealthAndCycleFormModel.objects.filter(
-            user_profile=user_profile,
-            recorded_at__date__gte=one_year_ago #filtr formularzy od roku w tyl do dzis
-        ).order_by('recorded_at')
-
-        symptom_data = defaultdict(list)
-        mood_data = defaultdict(list)
-        pain_data = defaultdict(list)
-
-        for form in forms:
-            date_str = form.recorded_at.strftime('%Y-%m-%d')
-            for symptom in form.daily_symptoms:
-                symptom_data[symptom].append(date_str)
-            for mood in form.daily_mood:
-                mood_data[mood].append(date_str)
-            if form.average_pain_level:
-                pain_level = int(form.average_pain_level)
-                pain_data[pain_level].append(date_str)
-
-        return self._generate_pdf(request, symptom_data, mood_data, pain_data)
+        report = find_report(user_profile, window)
+        if report is not None:
+            return self._pdf_response(BytesIO(report.pdf))
+
+        buffer = BytesIO()
+        render_statistics_pdf(request.user.username, rollup_statistics(user_profile, window), buffer, window)
+        with buffer.getbuffer() as pdf:
+            store_report(user_profile, pdf, window)
+        buffer.seek(0)
+        return self._pdf_response(buffer)
 
     @staticmethod
-    def _create_table(data, title):
-        """
-        Creates a formatted table for the PDF report.
-        """
-        styles = getSampleStyleSheet()
-
-        table_style = [ #tworzenie tabelki w ReportLab dla dokumentu pdf - style tabeli, kolor nagłówka, rozmiary czcionek i siatkę, zeby sie wszystko zmiscilo
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]
-
-        elements = [
-            Paragraph(title, styles['Heading1']),#tworzenie nagłowka tabelek
-            Spacer(1, 0.2 * inch)
-        ]
-
-        table_data = [['Type', 'Number of occurrences', 'Dates']] #definiowanienagłowka kolumny, dodanie wierszy
-        for item, dates in data.items():
-            table_data.append([
-                Paragraph(str(item), styles['Normal']),
-                Paragraph(str(len(dates)), styles['Normal']),
-                Paragraph(', '.join(dates), styles['Normal'])
-            ])
-
-        table = Table(table_data, colWidths=[2 * inch, 2 * inch, 4 * inch]) #szerokosc
-        table.setStyle(TableStyle(table_style))
-
-        elements.extend([
-            table,
-            Spacer(1, 0.3 * inch)
-        ])
-
-        return elements
-
-    def _generate_pdf(self, request, symptom_data, mood_data, pain_data):
-        """
-        Generates a PDF report containing menstrual cycle statistics.
-        """
-        buffer = BytesIO() # bufor pamięciowy dla pliku PDF
-        doc = SimpleDocTemplate( #uklad strony
-            buffer,
-            pagesize=letter,
-            rightMargin=0.5 * inch,
-            leftMargin=0.5 * inch,
-            topMargin=0.5 * inch,
-            bottomMargin=0.5 * inch
+    def _pdf_response(pdf_file):
+        """
+        Streams the PDF file object as a downloadable attachment.
+        """
+        return FileResponse(
+            pdf_file,
+            as_attachment=True,
+            filename='statistics.pdf',
+            content_type='application/pdf'
         )
 
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle( #tytul dokumentu
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=24,
-            spaceAfter=30
+
+class ExportEntriesView(LoginRequiredMixin, View):
+    """
+    View for downloading the full history of the user's entries as CSV or NDJSON.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests streaming every entry of the user in the format given by ``?format=``.
+        """
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({"error": "Unsupported export format"}, status=400)
+
+        entries = export_queryset(request.user.userprofile)
+        response = StreamingHttpResponse(
+            stream_export(entries, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format]
         )
+        response['Content-Disposition'] = f'attachment; filename="cycle-entries.{export_format}"'
+        return response
+
+
+def _report_job_data(job) -> Dict[str, Any]:
+    """
+    Serializes a report job for the polling client.
+    """
+    data = {
+        "id": job.pk,
+        "status": job.status,
+        "status_url": reverse('export_statistics_pdf_job', args=[job.pk]),
+        "download_url": None,
+    }
+    if job.status == StatisticsReportJob.STATUS_DONE:
+        data["download_url"] = reverse('export_statistics_pdf_job_download', args=[job.pk])
+    if job.status == StatisticsReportJob.STATUS_FAILED:
+        data["error"] = job.error
+    return data
+
+
+class StatisticsReportJobCreateView(LoginRequiredMixin, View):
+    """
+    View for queueing a PDF report to be generated in the background.
+    """
+
+    def post(self, request):
+        """
+        Handles POST requests to queue a report for the current data (or reuse an existing one).
+
+        The report covers the ``window``, ``since`` and ``until`` query parameters like the statistics page.
+        """
+        try:
+            window = _statistics_window(request.GET)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        job = enqueue_report(request.user.userprofile, window)
+        return JsonResponse(_report_job_data(job), status=202)
+
+
+class StatisticsReportJobStatusView(LoginRequiredMixin, View):
+    """
+    View for polling the status of a background PDF report.
+    """
 
-        elements = [
-            Paragraph(f"Statistics for user: {request.user.username}", title_style),
-            Paragraph(f"Date: {now().date().strftime('%Y-%m-%d')}", styles['Normal']),
-            Spacer(1, 0.4 * inch)
-        ]
+    def get(self, request, pk):
+        """
+        Handles GET requests returning the status of a report job.
+        """
+        try:
+            job = StatisticsReportJob.objects.only('id', 'status', 'error', 'started_at').get(
+                pk=pk,
+                user_profile=request.user.userprofile
+            )
+        except StatisticsReportJob.DoesNotExist:
+            return JsonResponse({"error": "Report not found"}, status=404)
+        # A poller waiting on a job whose worker died gets it generated again.
+        resume_stale_job(job)
+        return JsonResponse(_report_job_data(job))
 
-        elements.extend(self._create_table(symptom_data, "Symptoms"))
-        elements.extend(self._create_table(mood_data, "Moods"))
-        elements.extend(self._create_table(pain_data, "Average pain day level"))
 
-        doc.build(elements) #generowanie i zwracanie PDF
-        pdf = buffer.getvalue()
-        buffer.close()
+class StatisticsReportDownloadView(LoginRequiredMixin, View):
+    """
+    View for downloading the PDF of a finished report job.
+    """
 
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="statistics.pdf"'
-        response.write(pdf)
-        return response #pdf stworzony i gotowy do pobrania
+    def get(self, request, pk):
+        """
+        Handles GET requests serving the stored PDF.
+        """
+        try:
+            job = StatisticsReportJob.objects.get(
+                pk=pk,
+                user_profile=request.user.userprofile,
+                status=StatisticsReportJob.STATUS_DONE
+            )
+        except StatisticsReportJob.DoesNotExist:
+            return JsonResponse({"error": "Report not ready"}, status=404)
+        return ExportStatisticsPDFView._pdf_response(BytesIO(job.pdf))
 
 
 class KnowledgeBaseView(LoginRequiredMixin, TemplateView):
@@ -92,6 +92,11 @@ DATABASES = {
 
 AUTH_USER_MODEL = 'period_app.CustomUser'
 
+# Loads request.user together with its UserProfile (see period_app/backends.py)
+AUTHENTICATION_BACKENDS = [
+    'period_app.backends.UserProfileBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -139,4 +144,38 @@ LOGOUT_REDIRECT_URL = '/login/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'DEFAULT_VERSION': 'v1',
+    'ALLOWED_VERSIONS': ['v1'],
 }
+
+# Swap the backend (e.g. for django.core.cache.backends.redis.RedisCache) when running several processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'period-tracker',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Cached calendar feeds and statistics (see period_app/caching.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Threads generating statistics PDF reports in the background (see period_app/jobs.py)
+REPORT_WORKER_THREADS = 2
+# Seconds after which a running report job is considered abandoned by a dead worker and queued again
+REPORT_JOB_TIMEOUT = 10 * 60
+
+# Future partitions kept ready once the entry table was partitioned with ``manage.py manage_entry_partitions
+# --partition year|month`` (see period_app/partitioning.py)
+ENTRY_PARTITIONS_AHEAD = 2
@@ -4,11 +4,20 @@ URL configuration for the period_tracker_project.
 
 from django.contrib import admin
 from django.urls import path
+from period_app.api import (
+    EntryListView,
+    EntryDetailView,
+    SyncAPIView,
+    HealthProfileAPIView,
+    StatisticsAPIView,
+    PredictionAPIView,
+)
 from period_app.views import (
     RegisterView,
     LoginView,
     Home,
     CalendarView,
+    CalendarDayColorsView,
     StatisticsView,
     KnowledgeBaseView,
     CycleHealthFormView,
@@ -17,6 +26,11 @@ from period_app.views import (
     SelfCareDuringMenstruationView,
     HealthDuringPregnancyView,
     ExportStatisticsPDFView,
+    ExportEntriesView,
+    BulkImportView,
+    StatisticsReportJobCreateView,
+    StatisticsReportJobStatusView,
+    StatisticsReportDownloadView,
 )
 
 urlpatterns = [
@@ -25,12 +39,36 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('', Home.as_view(), name='home'),
     path('calendar/', CalendarView.as_view(), name='calendar'),
+    path('calendar/day-colors/', CalendarDayColorsView.as_view(), name='calendar_day_colors'),
     path('statistics/', StatisticsView.as_view(), name='statistics'),
     path(
         'statistics/export/pdf/',
         ExportStatisticsPDFView.as_view(),
         name='export_statistics_pdf'
     ),
+    path(
+        'statistics/export/pdf/jobs/',
+        StatisticsReportJobCreateView.as_view(),
+        name='export_statistics_pdf_jobs'
+    ),
+    path(
+        'statistics/export/pdf/jobs/<int:pk>/',
+        StatisticsReportJobStatusView.as_view(),
+        name='export_statistics_pdf_job'
+    ),
+    path(
+        'statistics/export/pdf/jobs/<int:pk>/download/',
+        StatisticsReportDownloadView.as_view(),
+        name='export_statistics_pdf_job_download'
+    ),
+    path('export/entries/', ExportEntriesView.as_view(), name='export_entries'),
+    path('import/', BulkImportView.as_view(), name='bulk_import'),
+    path('api/<str:version>/entries/', EntryListView.as_view(), name='api_entries'),
+    path('api/<str:version>/entries/<int:pk>/', EntryDetailView.as_view(), name='api_entry'),
+    path('api/<str:version>/sync/', SyncAPIView.as_view(), name='api_sync'),
+    path('api/<str:version>/health-profile/', HealthProfileAPIView.as_view(), name='api_health_profile'),
+    path('api/<str:version>/statistics/', StatisticsAPIView.as_view(), name='api_statistics'),
+    path('api/<str:version>/predictions/', PredictionAPIView.as_view(), name='api_predictions'),
     path('knowledge-base/', KnowledgeBaseView.as_view(), name='knowledge_base'),
     path(
         'cycle-health-form-view/',